@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from OpenGL.GL import *
+import glstate
+
+ASSET_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ASSET_ROOT, ".cache")
+CACHE_VERSION = 1
+IMAGE_CACHE_KIND = "rgba8"
+
+LOADER_WORKERS = min(4, os.cpu_count() or 1)
+# Tempo de GL por quadro para envios de textura, e tamanho de cada fatia enviada
+UPLOAD_BUDGET_MS = 4.0
+UPLOAD_SLICE_BYTES = 4 * 1024 * 1024
+
+_image_cache = {}
+# (caminho, wrap) -> [texture_id, referências]; o modo de repetição é estado da textura,
+# então o mesmo arquivo com wraps diferentes vira duas texturas
+_texture_cache = {}
+_texture_keys = {}
+_image_lock = threading.Lock()
+_image_locks = {}
+
+
+class ImageData:
+    # Pixels RGBA decodificados, linha 0 = topo da imagem (a ordem do PIL, usada pelo jogo
+    # e pelo menu desde sempre); com o cache em disco, `pixels` é um memmap somente leitura
+    __slots__ = ("path", "width", "height", "pixels")
+
+    def __init__(self, path, pixels):
+        self.path = path
+        self.height, self.width = pixels.shape[:2]
+        self.pixels = pixels
+
+
+def resolve_path(path):
+    if os.path.isabs(path):
+        return path
+    return os.path.join(ASSET_ROOT, path)
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_paths(path, kind):
+    name = os.path.splitext(os.path.basename(path))[0]
+    key = hashlib.sha1(f"{kind}:{path}".encode("utf-8")).hexdigest()[:12]
+    base = os.path.join(CACHE_DIR, f"{name}-{key}")
+    return base + ".npy", base + ".json"
+
+def load_cached_array(path, stat, kind):
+    # Array derivado de `path` gravado em .cache/; `kind` separa conversões diferentes do mesmo arquivo
+    data_path, meta_path = _cache_paths(path, kind)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION or meta.get("kind") != kind:
+        return None
+
+    if meta.get("mtime_ns") != stat.st_mtime_ns or meta.get("size") != stat.st_size:
+        # mtime mudou (ex.: checkout): só descarta se o conteúdo também mudou
+        if meta.get("sha1") != _file_hash(path):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns
+        meta["size"] = stat.st_size
+        _write_json(meta_path, meta)
+
+    try:
+        return np.load(data_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def store_cached_array(path, stat, kind, array):
+    data_path, meta_path = _cache_paths(path, kind)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = data_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, data_path)
+        _write_json(meta_path, {
+            "version": CACHE_VERSION,
+            "kind": kind,
+            "source": path,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": _file_hash(path),
+        })
+    except OSError as e:
+        print(f"AVISO: Não foi possível gravar o cache de '{path}': {e}")
+
+def _decode(path):
+    with Image.open(path) as img:
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        return np.asarray(img, dtype=np.uint8)
+
+def load_image(path):
+    # Decodifica uma vez por processo; nas execuções seguintes lê o RGBA já convertido de .cache/.
+    # Pode ser chamada das threads do AssetLoader
+    path = resolve_path(path)
+    image = _image_cache.get(path)
+    if image is not None:
+        return image
+
+    with _image_lock:
+        lock = _image_locks.setdefault(path, threading.Lock())
+    with lock:
+        image = _image_cache.get(path)
+        if image is None:
+            image = _load_image(path)
+        return image
+
+def _load_image(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo de textura '{path}' não encontrado. O objeto será desenhado sem textura.")
+        return None
+
+    pixels = load_cached_array(path, stat, IMAGE_CACHE_KIND)
+    if pixels is not None and (pixels.ndim != 3 or pixels.shape[2] != 4 or pixels.dtype != np.uint8):
+        pixels = None
+    if pixels is None:
+        try:
+            pixels = _decode(path)
+        except Exception as e:
+            print(f"ERRO ao carregar a textura '{path}': {e}")
+            return None
+        store_cached_array(path, stat, IMAGE_CACHE_KIND, pixels)
+
+    image = ImageData(path, pixels)
+    _image_cache[path] = image
+    return image
+
+def acquire_texture(path, wrap=GL_REPEAT):
+    # Uma textura GL por arquivo e wrap, compartilhada por contagem de referências; 0 se a imagem falhar
+    path = resolve_path(path)
+    entry = _texture_cache.get((path, wrap))
+    if entry is not None:
+        entry[1] += 1
+        return entry[0]
+
+    image = load_image(path)
+    if image is None:
+        return 0
+
+    texture_id = _create_texture(wrap)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image.width, image.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image.pixels)
+    glstate.bind_texture(0)
+
+    _register_texture((path, wrap), texture_id)
+    return texture_id
+
+def _create_texture(wrap):
+    texture_id = int(glGenTextures(1))
+    glstate.bind_texture(texture_id)
+
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, wrap)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, wrap)
+    return texture_id
+
+def _register_texture(key, texture_id):
+    _texture_cache[key] = [texture_id, 1]
+    _texture_keys[texture_id] = key
+
+def release_texture(texture_id):
+    key = _texture_keys.get(texture_id)
+    if key is None:
+        return
+    entry = _texture_cache[key]
+    entry[1] -= 1
+    if entry[1] <= 0:
+        glstate.delete_textures([texture_id])
+        del _texture_cache[key]
+        del _texture_keys[texture_id]
+
+def clear_texture_cache():
+    # Deve ser chamado antes de destruir o contexto GL (pygame.quit); as imagens decodificadas ficam
+    for texture_id, _ in _texture_cache.values():
+        glstate.delete_textures([texture_id])
+    _texture_cache.clear()
+    _texture_keys.clear()
+
+
+def _job_result(future, path, fallback):
+    # Exceção da thread de carregamento vira aviso e o valor de falha, como no carregamento síncrono
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"AVISO: Falha ao carregar '{path}' em segundo plano: {e}")
+        return fallback
+
+
+class _CallbackJob:
+    def __init__(self, future, path, on_ready):
+        self.future = future
+        self.path = path
+        self.on_ready = on_ready
+
+    def step(self):
+        if not self.future.done():
+            return False
+        self.on_ready(_job_result(self.future, self.path, None))
+        return True
+
+    def cancel(self):
+        self.future.cancel()
+
+
+class _TextureJob:
+    # Decodificada numa thread; o envio ao GL é feito aos pedaços, no máximo uma fatia por passo
+    def __init__(self, future, path, wrap, on_ready):
+        self.future = future
+        self.path = path
+        self.wrap = wrap
+        self.on_ready = on_ready
+        self.texture_id = None
+        self.row = 0
+
+    def step(self):
+        if self.texture_id is None:
+            if not self.future.done():
+                return False
+
+            entry = _texture_cache.get((self.path, self.wrap))
+            if entry is not None:
+                entry[1] += 1
+                self.on_ready(entry[0])
+                return True
+
+            image = _job_result(self.future, self.path, None)
+            if image is None:
+                self.on_ready(0)
+                return True
+
+            self.texture_id = _create_texture(self.wrap)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image.width, image.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        else:
+            glstate.bind_texture(self.texture_id)
+
+        image = self.future.result()
+        rows = max(1, UPLOAD_SLICE_BYTES // (image.width * 4))
+        end = min(image.height, self.row + rows)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, self.row, image.width, end - self.row,
+                        GL_RGBA, GL_UNSIGNED_BYTE, np.ascontiguousarray(image.pixels[self.row:end]))
+        glstate.bind_texture(0)
+        self.row = end
+
+        if self.row < image.height:
+            return False
+        # Só publica a textura completa: nada aparece meio enviado
+        _register_texture((self.path, self.wrap), self.texture_id)
+        self.on_ready(self.texture_id)
+        self.texture_id = None
+        return True
+
+    def cancel(self):
+        self.future.cancel()
+        if self.texture_id is not None:
+            glstate.delete_textures([self.texture_id])
+            self.texture_id = None
+
+
+class AssetLoader:
+    # Decodifica imagens (e o que vier por submit) em threads; pump() roda no laço principal e entrega os recursos
+    # prontos (envios de textura em fatias limitadas por tempo e callbacks na thread do GL)
+    def __init__(self, workers=LOADER_WORKERS, budget_ms=UPLOAD_BUDGET_MS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.budget = budget_ms / 1000.0
+        self.jobs = []
+        self.start_time = time.perf_counter()
+        self.finish_time = None
+
+    def image(self, path):
+        return self.executor.submit(load_image, path)
+
+    def texture(self, path, on_ready, wrap=GL_REPEAT):
+        path = resolve_path(path)
+        self.jobs.append(_TextureJob(self.image(path), path, wrap, on_ready))
+
+    def submit(self, load, path, on_ready):
+        # Qualquer carregamento sem GL (ex.: audio.load_sound); on_ready recebe o resultado em pump()
+        self.jobs.append(_CallbackJob(self.executor.submit(load, path), path, on_ready))
+
+    @property
+    def done(self):
+        return not self.jobs
+
+    def pump(self):
+        if not self.jobs:
+            return
+        deadline = time.perf_counter() + self.budget
+
+        # Pelo menos um passo por quadro, mesmo com o orçamento já estourado
+        while self.jobs:
+            progressed = False
+            for job in list(self.jobs):
+                if job.step():
+                    self.jobs.remove(job)
+                    progressed = True
+                elif job.future.done():
+                    progressed = True
+                if time.perf_counter() >= deadline:
+                    break
+            if not progressed or time.perf_counter() >= deadline:
+                break
+
+        if not self.jobs and self.finish_time is None:
+            self.finish_time = time.perf_counter()
+
+    @property
+    def load_seconds(self):
+        if self.finish_time is None:
+            return None
+        return self.finish_time - self.start_time
+
+    def shutdown(self):
+        # Antes de destruir o contexto GL: texturas ainda incompletas são apagadas
+        for job in self.jobs:
+            job.cancel()
+        self.jobs.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
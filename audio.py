@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+import numpy as np
+import pygame
+from assets import resolve_path, load_cached_array, store_cached_array
+
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+# Vozes simultâneas; acima disso um som novo rouba o canal de um de prioridade menor ou igual
+CHANNEL_POOL_SIZE = 16
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+
+_mixer_lock = threading.Lock()
+_mixer_failed = False
+_pool = None
+
+# PCM decodificado sobrevive ao mixer; os Sound precisam ser refeitos a cada init
+_pcm_cache = {}
+_sound_cache = {}
+
+
+class ChannelPool:
+    def __init__(self, size):
+        pygame.mixer.set_num_channels(size)
+        self.channels = [pygame.mixer.Channel(i) for i in range(size)]
+        self.priorities = [PRIORITY_LOW] * size
+        self.started = [0.0] * size
+        self.steals = 0
+
+    def _pick(self, priority):
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+            if self.priorities[i] > priority:
+                continue
+            # Entre as candidatas, a de menor prioridade e, no empate, a mais antiga
+            if victim is None or (self.priorities[i], self.started[i]) < (self.priorities[victim], self.started[victim]):
+                victim = i
+        if victim is not None:
+            self.channels[victim].stop()
+            self.steals += 1
+        return victim
+
+    def play(self, sound, priority=PRIORITY_NORMAL, loops=0, volume=1.0):
+        i = self._pick(priority)
+        if i is None:
+            return None
+        channel = self.channels[i]
+        channel.set_volume(volume)
+        channel.play(sound, loops=loops)
+        self.priorities[i] = priority
+        self.started[i] = time.perf_counter()
+        return channel
+
+    @property
+    def active_voices(self):
+        return sum(1 for channel in self.channels if channel.get_busy())
+
+
+def init_mixer():
+    # Chamado sob demanda pelo primeiro som; falhar (sem dispositivo de áudio) deixa o jogo mudo
+    global _pool, _mixer_failed
+    if _pool is not None:
+        return True
+    if _mixer_failed:
+        return False
+
+    with _mixer_lock:
+        if _pool is None and not _mixer_failed:
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+                _pool = ChannelPool(CHANNEL_POOL_SIZE)
+            except pygame.error as e:
+                print(f"AVISO: Não foi possível iniciar o áudio: {e}. O jogo seguirá sem som.")
+                _mixer_failed = True
+    return _pool is not None
+
+def _pcm_kind():
+    frequency, size, channels = pygame.mixer.get_init()
+    return f"pcm{frequency}_{size}_{channels}"
+
+def _decode_pcm(path):
+    # O próprio mixer decodifica e já converte para o formato de saída
+    return pygame.sndarray.array(pygame.mixer.Sound(path))
+
+def load_pcm(path):
+    path = resolve_path(path)
+    kind = _pcm_kind()
+    pcm = _pcm_cache.get((path, kind))
+    if pcm is not None:
+        return pcm
+
+    stat = os.stat(path)
+    pcm = load_cached_array(path, stat, kind)
+    if pcm is None:
+        pcm = _decode_pcm(path)
+        store_cached_array(path, stat, kind, pcm)
+    pcm = np.ascontiguousarray(pcm)
+    _pcm_cache[(path, kind)] = pcm
+    return pcm
+
+def load_sound(path):
+    # Um Sound por arquivo; pode ser chamada das threads do AssetLoader
+    if not init_mixer():
+        return None
+
+    path = resolve_path(path)
+    sound = _sound_cache.get(path)
+    if sound is not None:
+        return sound
+
+    try:
+        sound = pygame.sndarray.make_sound(load_pcm(path))
+    except (pygame.error, OSError, ValueError) as e:
+        print(f"AVISO: ERRO ao carregar o som '{path}': {e}")
+        return None
+    _sound_cache[path] = sound
+    return sound
+
+def play(sound, priority=PRIORITY_NORMAL, loops=0, volume=1.0):
+    if sound is None or _pool is None:
+        return None
+    return _pool.play(sound, priority, loops, volume)
+
+def load_music(path):
+    if not init_mixer():
+        return False
+    try:
+        pygame.mixer.music.load(resolve_path(path))
+        return True
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"ERRO ao carregar a música '{path}': {e}")
+        return False
+
+def play_music(loops=-1):
+    if _pool is not None:
+        pygame.mixer.music.play(loops)
+
+def stop_music():
+    if _pool is not None:
+        pygame.mixer.music.stop()
+
+def shutdown():
+    # Antes de pygame.quit; o PCM fica em memória para o próximo init
+    global _pool
+    if _pool is not None:
+        pygame.mixer.music.stop()
+        pygame.mixer.stop()
+    _sound_cache.clear()
+    _pool = None
+    if pygame.mixer.get_init():
+        pygame.mixer.quit()
@@ -0,0 +1,331 @@
+import math
+import random
+import struct
+import zlib
+import numpy as np
+from pygame.locals import K_w, K_a, K_s, K_d, K_LSHIFT
+from camera import Camera, GRID_LIMIT
+from collision import spheres_vs_sphere, spheres_vs_swept_segment
+from lightsaber import BLADE_GROW_SPEED, BLADE_LENGTH, BLADE_HIT_RADIUS, HAND_OFFSET, HILT_LENGTH
+from meteor_field import PLAYER_COLLISION_MARGIN, roll_meteor
+from simulation import (REFERENCE_TICK_RATE, SIM_TICK_RATE, MAX_GAME_TIME_SECONDS, EARTH_SURFACE_Y,
+                        MAX_HEALTH, IMPACT_PENALTY, SPAWN_INTERVAL)
+
+# Folga dos filtros por caixa: só decidem quem vai para o teste exato de collision.py
+_BOX_SLACK = 1e-6
+_SLOT_COLUMNS = ("x", "y", "z", "size", "speed", "active", "intercepted")
+_ROW_ARRAYS = ("sessions", "cam_x", "cam_z", "yaw", "pitch", "stamina", "saber_on", "blade_progress",
+               "has_previous_blade", "previous_base", "previous_tip", "score", "interceptions", "impacts",
+               "count") + _SLOT_COLUMNS
+
+
+class BatchTickInput:
+    # TickInput de várias sessões: cada campo é um array com uma posição por linha da BatchSimulation
+    __slots__ = ("keys", "mouse_dx", "mouse_dy", "toggle_saber")
+
+    def __init__(self, keys=None, mouse_dx=0.0, mouse_dy=0.0, toggle_saber=False):
+        self.keys = keys if keys is not None else {}
+        self.mouse_dx = mouse_dx
+        self.mouse_dy = mouse_dy
+        self.toggle_saber = toggle_saber
+
+
+def _normalized(x, y, z):
+    # Vec3.normalized em arrays, com as mesmas operações na mesma ordem
+    length = np.sqrt(x * x + y * y + z * z)
+    valid = length > 0.0
+    length = np.where(valid, length, 1.0)
+    return np.where(valid, x / length, 0.0), np.where(valid, y / length, 0.0), np.where(valid, z / length, 0.0)
+
+
+class BatchSimulation:
+    # Várias GameSimulation em passo único: uma linha por sessão, um array por campo. As regras são
+    # as de GameSimulation.tick, Camera e lightsaber operação por operação, então cada sessão termina
+    # no mesmo estado (e checksum) que teria sozinha. Senos e cossenos passam pelo módulo math, como lá.
+    # Só as políticas embutidas; gravações e roteiros continuam em GameSimulation
+    def __init__(self, seeds, tick_rate=SIM_TICK_RATE, capacity=32):
+        self.seeds = list(seeds)
+        self.tick_rate = tick_rate
+        self.tick_seconds = 1.0 / tick_rate
+        self.tick_scale = REFERENCE_TICK_RATE / tick_rate
+        self.rngs = [random.Random(seed) for seed in self.seeds]
+
+        self.camera = Camera()
+        rows = len(self.seeds)
+        self.sessions = np.arange(rows)
+        self.cam_x = np.full(rows, self.camera.position.x)
+        self.cam_z = np.full(rows, self.camera.position.z)
+        self.cam_y = self.camera.position.y
+        self.yaw = np.full(rows, self.camera.yaw)
+        self.pitch = np.full(rows, self.camera.pitch)
+        self.stamina = np.full(rows, self.camera.current_stamina)
+
+        self.saber_on = np.zeros(rows, dtype=bool)
+        self.blade_progress = np.zeros(rows)
+        self.has_previous_blade = np.zeros(rows, dtype=bool)
+        self.previous_base = np.zeros((rows, 3))
+        self.previous_tip = np.zeros((rows, 3))
+
+        self.score = np.full(rows, MAX_HEALTH, dtype=np.int64)
+        self.interceptions = np.zeros(rows, dtype=np.int64)
+        self.impacts = np.zeros(rows, dtype=np.int64)
+
+        # O relógio e o spawn não dependem da sessão: todas começaram juntas
+        self.game_timer_ms = MAX_GAME_TIME_SECONDS * 1000
+        self.spawn_timer = 0
+        self.ticks = 0
+
+        self.count = np.zeros(rows, dtype=np.intp)
+        self.capacity = capacity
+        for name in _SLOT_COLUMNS:
+            dtype = bool if name in ("active", "intercepted") else np.float64
+            setattr(self, name, np.zeros((rows, capacity), dtype=dtype))
+
+        self.results = []
+
+    @property
+    def rows(self):
+        return len(self.sessions)
+
+    @property
+    def finished(self):
+        return self.rows == 0
+
+    @property
+    def sensitivity(self):
+        return self.camera.sensitivity
+
+    def occupied_slots(self):
+        return np.arange(self.capacity) < self.count[:, None]
+
+    def apply_input(self, tick_input):
+        # apply_tick_input, sem os eventos de mouse um a um (as políticas não geram)
+        self.saber_on ^= np.asarray(tick_input.toggle_saber, dtype=bool)
+
+        dx = np.asarray(tick_input.mouse_dx, dtype=np.float64)
+        dy = np.asarray(tick_input.mouse_dy, dtype=np.float64)
+        moved = (dx != 0.0) | (dy != 0.0)
+        if not moved.any():
+            return
+        sensitivity = self.camera.sensitivity
+        self.yaw = np.where(moved, self.yaw + dx * sensitivity, self.yaw)
+        pitch = np.where(moved, self.pitch + (-dy) * sensitivity, self.pitch)
+        pitch = np.where(pitch > 89.0, 89.0, pitch)
+        self.pitch = np.where(pitch < -89.0, -89.0, pitch)
+
+    def _key(self, keys, key):
+        pressed = keys.get(key)
+        if pressed is None:
+            return np.zeros(self.rows, dtype=bool)
+        return np.asarray(pressed, dtype=bool)
+
+    def _basis(self):
+        # CameraBasis: forward, right e up de cada linha
+        yaw_rad = [math.radians(v) for v in self.yaw.tolist()]
+        pitch_rad = [math.radians(v) for v in self.pitch.tolist()]
+        cos_pitch = np.array([math.cos(v) for v in pitch_rad])
+        fx = np.array([math.cos(v) for v in yaw_rad]) * cos_pitch
+        fy = np.array([math.sin(v) for v in pitch_rad])
+        fz = np.array([math.sin(v) for v in yaw_rad]) * cos_pitch
+        fx, fy, fz = _normalized(fx, fy, fz)
+
+        # f.cross(WORLD_UP) e right.cross(f), termo a termo
+        rx, ry, rz = _normalized(fy * 0.0 - fz * 1.0, fz * 0.0 - fx * 0.0, fx * 1.0 - fy * 0.0)
+        ux = ry * fz - rz * fy
+        uy = rz * fx - rx * fz
+        uz = rx * fy - ry * fx
+        return (fx, fy, fz), (rx, ry, rz), (ux, uy, uz)
+
+    def _update_movement(self, keys, forward, right):
+        scale = self.tick_scale
+        camera = self.camera
+        w, s, a, d = (self._key(keys, key) for key in (K_w, K_s, K_a, K_d))
+        is_moving = w | s | a | d
+        is_sprinting = self._key(keys, K_LSHIFT) & is_moving & (self.stamina > 0.0)
+
+        drained = np.maximum(0.0, self.stamina - camera.stamina_drain_rate * scale)
+        recovered = np.minimum(camera.max_stamina, self.stamina + camera.stamina_recover_rate * scale)
+        self.stamina = np.where(is_sprinting, drained, recovered)
+        speed = np.where(is_sprinting & (self.stamina != 0.0), camera.sprint_speed, camera.base_speed)
+
+        fx, fz = _normalized(forward[0], 0.0, forward[2])[::2]
+        rx, rz = right[0], right[2]
+        x = self.cam_x
+        z = self.cam_z
+        step = speed * scale
+
+        x = np.where(w, x + fx * step, x)
+        z = np.where(w, z + fz * step, z)
+        x = np.where(s, x - fx * step, x)
+        z = np.where(s, z - fz * step, z)
+        x = np.where(a, x - rx * step, x)
+        z = np.where(a, z - rz * step, z)
+        x = np.where(d, x + rx * step, x)
+        z = np.where(d, z + rz * step, z)
+
+        self.cam_x = np.maximum(-GRID_LIMIT, np.minimum(GRID_LIMIT, x))
+        self.cam_z = np.maximum(-GRID_LIMIT, np.minimum(GRID_LIMIT, z))
+
+    def _update_blade(self, forward, right, up):
+        # update_saber e update_blade_sweep; devolve as linhas com lâmina e a varredura delas
+        dt = self.tick_seconds
+        grown = np.minimum(self.blade_progress + dt * BLADE_GROW_SPEED, 1.0)
+        shrunk = np.maximum(self.blade_progress - dt * BLADE_GROW_SPEED, 0.0)
+        self.blade_progress = np.where(self.saber_on, grown, shrunk)
+
+        has_blade = self.blade_progress > 0.001
+        hx, hy, hz = HAND_OFFSET
+        hy = hy + HILT_LENGTH * 0.5
+        # orientation.transform_vector: colunas right, up, -forward
+        position = (self.cam_x, self.cam_y, self.cam_z)
+        length = BLADE_LENGTH * self.blade_progress
+        base = np.empty((self.rows, 3))
+        tip = np.empty((self.rows, 3))
+        for axis in range(3):
+            offset = right[axis] * hx + up[axis] * hy + (-forward[axis]) * hz
+            base[:, axis] = position[axis] + offset
+            tip[:, axis] = base[:, axis] + up[axis] * length
+
+        previous_base = np.where(self.has_previous_blade[:, None], self.previous_base, base)
+        previous_tip = np.where(self.has_previous_blade[:, None], self.previous_tip, tip)
+        self.previous_base = base
+        self.previous_tip = tip
+        self.has_previous_blade = has_blade
+        return has_blade, (previous_base, previous_tip, base, tip)
+
+    def _intercept(self, row, slots):
+        slots = slots[self.active[row, slots]]
+        self.active[row, slots] = False
+        self.intercepted[row, slots] = True
+        self.interceptions[row] += len(slots)
+
+    def _gather(self, row, slots):
+        centers = np.empty((len(slots), 3))
+        centers[:, 0] = self.x[row, slots]
+        centers[:, 1] = self.y[row, slots]
+        centers[:, 2] = self.z[row, slots]
+        return centers, self.size[row, slots]
+
+    def _check_player_collision(self):
+        # Caixa em volta do jogador para todas as linhas de uma vez; o teste exato só nos poucos que passam
+        reach = self.size + (PLAYER_COLLISION_MARGIN + _BOX_SLACK)
+        near = (self.active & (np.abs(self.x - self.cam_x[:, None]) <= reach)
+                & (np.abs(self.y - self.cam_y) <= reach) & (np.abs(self.z - self.cam_z[:, None]) <= reach))
+        for row in np.flatnonzero(near.any(axis=1)).tolist():
+            slots = np.flatnonzero(near[row])
+            centers, radii = self._gather(row, slots)
+            player = (self.cam_x[row], self.cam_y, self.cam_z[row])
+            self._intercept(row, slots[spheres_vs_sphere(centers, radii, player, PLAYER_COLLISION_MARGIN)])
+
+    def _check_blade_collision(self, has_blade, sweep):
+        points = np.stack(sweep)
+        reach = self.size + (BLADE_HIT_RADIUS + _BOX_SLACK)
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        near = self.active & has_blade[:, None]
+        for axis, column in enumerate((self.x, self.y, self.z)):
+            near &= (column >= low[:, axis, None] - reach) & (column <= high[:, axis, None] + reach)
+        for row in np.flatnonzero(near.any(axis=1)).tolist():
+            slots = np.flatnonzero(near[row])
+            centers, radii = self._gather(row, slots)
+            a0, b0, a1, b1 = (p[row] for p in sweep)
+            self._intercept(row, slots[spheres_vs_swept_segment(centers, radii, a0, b0, a1, b1, BLADE_HIT_RADIUS)])
+
+    def _compact(self):
+        # Mesmo swap-remove de MeteorField.compact, linha a linha: a ordem dos meteoros entra no checksum
+        alive_counts = np.count_nonzero(self.active, axis=1)
+        for row in np.flatnonzero(alive_counts < self.count).tolist():
+            n = self.count[row]
+            alive = self.active[row, :n]
+            new_count = int(alive_counts[row])
+            holes = np.flatnonzero(~alive[:new_count])
+            fillers = np.flatnonzero(alive[new_count:]) + new_count
+            for name in _SLOT_COLUMNS:
+                column = getattr(self, name)[row]
+                column[holes] = column[fillers]
+            self.active[row, new_count:n] = False
+            self.count[row] = new_count
+
+    def _spawn(self):
+        if (self.count == self.capacity).any():
+            capacity = self.capacity * 2
+            for name in _SLOT_COLUMNS:
+                old = getattr(self, name)
+                column = np.zeros((self.rows, capacity), dtype=old.dtype)
+                column[:, :self.capacity] = old
+                setattr(self, name, column)
+            self.capacity = capacity
+
+        for row, session in enumerate(self.sessions.tolist()):
+            meteor = roll_meteor(self.rngs[session], GRID_LIMIT)
+            i = self.count[row]
+            self.x[row, i] = meteor["x"]
+            self.y[row, i] = meteor["y"]
+            self.z[row, i] = meteor["z"]
+            self.size[row, i] = meteor["size"]
+            self.speed[row, i] = meteor["speed"]
+            self.active[row, i] = True
+            self.intercepted[row, i] = False
+            self.count[row] = i + 1
+
+    def tick(self, keys):
+        self.ticks += 1
+
+        if self.game_timer_ms > 0:
+            self.game_timer_ms -= self.tick_seconds * 1000
+            if self.game_timer_ms < 0:
+                self.game_timer_ms = 0
+
+        forward, right, up = self._basis()
+        self._update_movement(keys, forward, right)
+        has_blade, sweep = self._update_blade(forward, right, up)
+
+        # MeteorField.step
+        scale = self.tick_scale
+        self.y -= self.speed * (self.active * scale)
+        self.active &= self.y > EARTH_SURFACE_Y
+
+        self._check_player_collision()
+        self._check_blade_collision(has_blade, sweep)
+
+        occupied = self.occupied_slots()
+        impacts = np.count_nonzero(occupied & ~self.active & ~self.intercepted, axis=1)
+        self.impacts += impacts
+        self.score -= IMPACT_PENALTY * impacts
+        self._compact()
+
+        self.spawn_timer += scale
+        if self.spawn_timer >= SPAWN_INTERVAL:
+            self._spawn()
+            self.spawn_timer = 0
+
+        game_over = self.score <= 0
+        finished = game_over | (self.game_timer_ms <= 0)
+        if finished.any():
+            self._finish(finished, game_over)
+
+    def _checksum(self, row):
+        # session_checksum de uma linha
+        n = self.count[row]
+        checksum = zlib.crc32(struct.pack("<3d4d4q", self.cam_x[row], self.cam_y, self.cam_z[row],
+                                          self.yaw[row], self.pitch[row], self.stamina[row], self.game_timer_ms,
+                                          self.score[row], self.ticks, self.interceptions[row], self.impacts[row]))
+        for column in (self.x, self.y, self.z, self.size, self.active):
+            checksum = zlib.crc32(column[row, :n].tobytes(), checksum)
+        return checksum
+
+    def _finish(self, finished, game_over):
+        for row in np.flatnonzero(finished).tolist():
+            self.results.append({
+                "seed": self.seeds[self.sessions[row]],
+                "outcome": "GAME_OVER" if game_over[row] else "WIN",
+                "score": int(self.score[row]),
+                "interceptions": int(self.interceptions[row]),
+                "impacts": int(self.impacts[row]),
+                "ticks": self.ticks,
+                "checksum": self._checksum(row),
+            })
+
+        keep = ~finished
+        for name in _ROW_ARRAYS:
+            setattr(self, name, getattr(self, name)[keep])
@@ -0,0 +1,98 @@
+import argparse
+import math
+import random
+import time
+import numpy as np
+from meteor_field import MeteorField, PLAYER_COLLISION_MARGIN
+
+GRID_LIMIT = 20.0
+EARTH_SURFACE_Y = -30.0
+
+
+def brute_force_python(field, player_pos):
+    # Mesmo caminho do antigo DroppingObject.check_collision, um meteoro por vez
+    hits = []
+    px, py, pz = player_pos
+    for i in range(field.count):
+        if not field.active[i]:
+            continue
+        distance_3d = math.sqrt((field.x[i] - px)**2 + (field.y[i] - py)**2 + (field.z[i] - pz)**2)
+        if distance_3d < field.size[i] + PLAYER_COLLISION_MARGIN:
+            hits.append(i)
+    return hits
+
+def brute_force_numpy(field, player_pos):
+    n = field.count
+    dx = field.x[:n] - player_pos[0]
+    dy = field.y[:n] - player_pos[1]
+    dz = field.z[:n] - player_pos[2]
+    radius = field.size[:n] + PLAYER_COLLISION_MARGIN
+    return np.flatnonzero(field.active[:n] & (dx * dx + dy * dy + dz * dz < radius * radius))
+
+def spatial_hash(field, player_pos):
+    field.broadphase.update(field)
+    return field.broadphase.query_sphere(player_pos, PLAYER_COLLISION_MARGIN)
+
+
+def make_field(count, seed):
+    field = MeteorField(GRID_LIMIT, EARTH_SURFACE_Y, capacity=count, rng=random.Random(seed))
+    for _ in range(count):
+        field.spawn()
+    # Espalha os meteoros em toda a altura da queda, como numa onda em andamento
+    field.y[:count] = np.random.default_rng(seed).uniform(EARTH_SURFACE_Y, 100.0, count)
+    field.broadphase.rebuild(field)
+    return field
+
+def time_queries(method, field, positions, budget_s):
+    start = time.perf_counter()
+    calls = 0
+    results = None
+    while True:
+        for pos in positions:
+            results = method(field, pos)
+        calls += len(positions)
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget_s:
+            break
+    return elapsed / calls * 1e6, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a colisão força bruta com o hash espacial.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--budget", type=float, default=0.5, help="segundos por método e contagem")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    positions = np.column_stack([
+        rng.uniform(-GRID_LIMIT, GRID_LIMIT, args.queries),
+        rng.uniform(EARTH_SURFACE_Y, 100.0, args.queries),
+        rng.uniform(-GRID_LIMIT, GRID_LIMIT, args.queries),
+    ])
+
+    methods = [
+        ("python", brute_force_python),
+        ("numpy", brute_force_numpy),
+        ("hash", spatial_hash),
+    ]
+
+    print(f"{'meteoros':>10} " + " ".join(f"{name + ' (us)':>14}" for name, _ in methods))
+    for count in args.counts:
+        field = make_field(count, args.seed)
+
+        reference = [sorted(brute_force_numpy(field, pos).tolist()) for pos in positions]
+        hashed = [sorted(spatial_hash(field, pos).tolist()) for pos in positions]
+        assert reference == hashed, "hash espacial divergiu da força bruta"
+
+        row = []
+        for name, method in methods:
+            if name == "python" and count > 10000:
+                row.append(f"{'-':>14}")
+                continue
+            per_query_us, _ = time_queries(method, field, positions, args.budget)
+            row.append(f"{per_query_us:>14.1f}")
+        print(f"{count:>10} " + " ".join(row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import numpy as np
+
+# Tempos de quadro de cenários fixos, sem GPU: contexto offscreen do Mesa (llvmpipe) via EGL,
+# ou uma tela X virtual (xvfb-run) com --backend x11.
+#
+#   python -m benchmarks.bench_render                    compara com benchmarks/baselines/render.json
+#   python -m benchmarks.bench_render --update-baseline  regrava o baseline (mesma máquina e renderer)
+#
+# O baseline do repositório foi medido no llvmpipe com o primeiro comando acima (egl, 300 quadros)
+BACKENDS = ("egl", "x11")
+METEOR_COUNTS = (100, 1000, 5000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "render.json")
+# Acima disso em relação ao baseline (p50 do quadro, chamadas de estado ou desenhos por quadro) é regressão
+DEFAULT_THRESHOLD = 0.10
+
+
+def configure_backend(backend):
+    # Antes de importar pygame e PyOpenGL
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    # O benchmark grava o próprio JSON; sem o dump do profiler na saída
+    os.environ.setdefault("GAME_PROFILE_DIR", "")
+    if backend == "egl":
+        os.environ["SDL_VIDEODRIVER"] = "offscreen"
+        os.environ["PYOPENGL_PLATFORM"] = "egl"
+    else:
+        os.environ.setdefault("PYOPENGL_PLATFORM", "glx")
+
+
+class Scenario:
+    def __init__(self, name, scene, setup, frame, frames=None):
+        self.name = name
+        self.scene = scene
+        self.setup = setup
+        self.frame = frame
+        # Fixo para cenários com duração própria (replay de uma gravação)
+        self.frames = frames
+
+
+def fill_field(field, count, seed):
+    # Onda em andamento: meteoros espalhados por toda a altura da queda, sempre os mesmos
+    field.clear()
+    for _ in range(count):
+        field.spawn()
+    field.y[:count] = np.random.default_rng(seed).uniform(field.surface_y, 100.0, count)
+    field.settle()
+
+def build_scenarios(manager, meteor_counts, seed, warmup):
+    from OpenGL.GL import glClear, glLoadIdentity, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT
+    import game
+    from game import draw_scene, draw_lightsaber
+    from lightsaber import update_saber, update_blade_sweep, reset_saber, toggle_saber
+    from simulation import MAX_GAME_TIME_SECONDS
+
+    game_scene = manager.scenes["game"]
+    menu_scene = manager.scenes["menu"]
+    display = game_scene.display
+
+    def aim(cam, frame):
+        # Meia volta lenta: cada quadro mostra uma parte diferente do céu e da onda
+        cam.yaw = -90.0 + frame * 0.5
+        cam.pitch = 10.0 * math.sin(frame * 0.05)
+
+    def view(cam, frame):
+        aim(cam, frame)
+        glLoadIdentity()
+        cam.update_view()
+
+    def meteors_setup(count):
+        def setup():
+            game_scene.session.field.rng = random.Random(seed)
+            fill_field(game_scene.session.field, count, seed)
+            game_scene.game_state = "RUNNING"
+        return setup
+
+    def meteors_frame(frame):
+        cam = game_scene.session.cam
+        view(cam, frame)
+        draw_scene(game_scene.session.field, game.skybox_texture_id, cam, 1.0)
+
+    def hud_setup():
+        # Mesmo ponto de partida rodando todos os cenários ou só este
+        session = game_scene.session
+        session.field.rng = random.Random(seed)
+        session.game_timer_ms = MAX_GAME_TIME_SECONDS * 1000
+        fill_field(session.field, 100, seed)
+        game_scene.game_state = "RUNNING"
+        reset_saber()
+        toggle_saber(play_sound=False)
+        update_saber(1.0)
+
+    def hud_frame(frame):
+        # Partida completa (cena, sabre e HUD); tempo e estamina mudam como num jogo de verdade
+        session = game_scene.session
+        session.game_timer_ms = max(0.0, session.game_timer_ms - 1000.0 / 60.0)
+        cam = session.cam
+        cam.current_stamina = cam.max_stamina * (0.5 + 0.5 * math.cos(frame * 0.02))
+        session.score = 100 - (frame // 30) % 100
+        aim(cam, frame)
+        game_scene.draw()
+
+    def saber_setup():
+        game_scene.game_state = "RUNNING"
+        reset_saber()
+        toggle_saber(play_sound=False)
+        update_saber(1.0)
+
+    def saber_frame(frame):
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        cam = game_scene.session.cam
+        view(cam, frame)
+        # Um tick por quadro: o rastro acompanha a meia volta da câmera
+        update_blade_sweep(cam)
+        draw_lightsaber(cam)
+
+    def crawl_setup():
+        game.release_star_wars_crawl()
+        game.crawl_y_offset = game.previous_crawl_y_offset = 0.0
+        # Como no começo de uma partida: nenhum meteoro ainda, seja qual for o cenário anterior
+        game_scene.session.field.clear()
+        aim(game_scene.session.cam, 0)
+        game_scene.game_state = "INTRO"
+
+    def crawl_frame(frame):
+        if game.update_star_wars_crawl(display, 4.0):
+            game.crawl_y_offset = game.previous_crawl_y_offset = 0.0
+        game_scene.draw()
+
+    def replay_setup():
+        # enter() volta a partida para o tick 0 com a semente da gravação
+        game_scene.enter()
+
+    def replay_frame(frame):
+        # lockstep: um tick gravado por quadro, a partida inteira como carga fixa
+        game_scene.update()
+        game_scene.draw()
+
+    def menu_setup():
+        random.seed(seed)
+
+    def menu_frame(frame):
+        menu_scene.update()
+        menu_scene.draw()
+
+    scenarios = [Scenario(f"cena_{count}", "game", meteors_setup(count), meteors_frame) for count in meteor_counts]
+    scenarios += [
+        Scenario("hud", "game", hud_setup, hud_frame),
+        Scenario("sabre", "game", saber_setup, saber_frame),
+        Scenario("abertura", "game", crawl_setup, crawl_frame),
+        Scenario("menu", "menu", menu_setup, menu_frame),
+    ]
+    if game_scene.recording is not None:
+        frames = max(1, len(game_scene.recording.inputs) - warmup)
+        scenarios.append(Scenario("replay", "game", replay_setup, replay_frame, frames))
+    return scenarios
+
+
+def distribution(values):
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+    }
+
+def run_scenario(manager, scenario, frames, warmup, screenshot_dir=None):
+    from OpenGL.GL import glFinish
+    import glstate
+    import profiler
+
+    if manager.current is not manager.scenes[scenario.scene]:
+        manager.activate(scenario.scene)
+    scenario.setup()
+    frames = scenario.frames or frames
+
+    times = np.zeros(frames)
+    gl = np.zeros((frames, 3))
+    for i in range(warmup + frames):
+        profiler.begin_frame()
+        start = time.perf_counter()
+        scenario.frame(i)
+        # No llvmpipe o desenho só termina de fato aqui: o quadro inclui a rasterização
+        glFinish()
+        elapsed = time.perf_counter() - start
+        counters = glstate.counters
+        glstate.end_frame()
+        profiler.end_frame()
+        if i >= warmup:
+            times[i - warmup] = elapsed * 1000.0
+            gl[i - warmup] = (counters.state_calls, counters.changes, counters.draws)
+
+    if screenshot_dir:
+        save_screenshot(os.path.join(screenshot_dir, f"{scenario.name}.png"), manager.display_size)
+
+    sections = {}
+    for name, entry in profiler.summary(frames)["sections"].items():
+        if name != profiler.FRAME_SECTION and entry["cpu_ms"] is not None:
+            sections[name] = entry["cpu_ms"]["mean"]
+
+    state_calls, changes, draws = gl.mean(axis=0)
+    return {
+        "frames": frames,
+        "frame_ms": distribution(times),
+        # Contagem do glstate: state_calls/changes/skipped só veem as funções de estado do módulo
+        # (glEnable, glBindTexture, glBlendFunc...); draws inclui todos os desenhos do quadro
+        "glstate": {"state_calls": float(state_calls), "changes": float(changes), "skipped": float(state_calls - changes), "draws": float(draws)},
+        "sections_ms": sections,
+    }
+
+def save_screenshot(path, size):
+    import pygame
+    from OpenGL.GL import glReadPixels, GL_RGB, GL_UNSIGNED_BYTE
+    width, height = size
+    data = glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pygame.image.save(pygame.image.fromstring(data, size, "RGB", True), path)
+
+
+def compare(results, baseline, threshold):
+    # Lista de (cenário, métrica, atual, baseline) que pioraram além do limite
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        checks = (
+            ("p50 ms", current["frame_ms"]["p50"], previous["frame_ms"]["p50"]),
+            ("chamadas de estado", current["glstate"]["state_calls"], previous["glstate"]["state_calls"]),
+            ("desenhos", current["glstate"]["draws"], previous["glstate"]["draws"]),
+        )
+        for metric, value, reference in checks:
+            if value > reference * (1.0 + threshold):
+                regressions.append((name, metric, value, reference))
+    return regressions
+
+def print_table(results, baseline):
+    print(f"{'cenário':<12} {'média':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'glstate':>9} {'evitadas':>9} {'desenhos':>9} {'vs base':>8}")
+    for name, entry in results["scenarios"].items():
+        frame = entry["frame_ms"]
+        gl = entry["glstate"]
+        delta = ""
+        previous = baseline.get("scenarios", {}).get(name) if baseline else None
+        if previous:
+            delta = f"{(frame['p50'] / previous['frame_ms']['p50'] - 1.0) * 100.0:+.1f}%"
+        print(f"{name:<12} {frame['mean']:>8.2f} {frame['p50']:>8.2f} {frame['p95']:>8.2f} {frame['p99']:>8.2f} "
+              f"{gl['state_calls']:>9.0f} {gl['skipped']:>9.0f} {gl['draws']:>9.0f} {delta:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o desenho de cenários fixos num contexto GL offscreen.")
+    parser.add_argument("--backend", choices=BACKENDS, default="egl",
+                        help="egl: offscreen do Mesa, sem servidor X; x11: $DISPLAY (ex.: dentro de xvfb-run)")
+    parser.add_argument("--scenarios", nargs="+", help="só estes cenários (ex.: cena_1000 menu)")
+    parser.add_argument("--meteors", type=int, nargs="+", default=list(METEOR_COUNTS))
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replay", help="gravação de partida (game.py --record) medida como o cenário 'replay'")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="resultados anteriores para comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true", help="grava estes resultados como o novo baseline")
+    parser.add_argument("--screenshots", help="salva o último quadro de cada cenário nesta pasta")
+    args = parser.parse_args()
+
+    configure_backend(args.backend)
+
+    from OpenGL.GL import glGetString, GL_RENDERER
+    from scenes import SceneManager
+    from menu import MenuScene
+    import game
+
+    manager = SceneManager()
+    manager.add("menu", MenuScene())
+    manager.add("game", game.GameScene(replay=args.replay, lockstep=True))
+    try:
+        manager.activate("game")
+        # Texturas e sons completos antes de medir
+        while not game.asset_loader.done:
+            game.asset_loader.pump()
+
+        scenarios = build_scenarios(manager, args.meteors, args.seed, args.warmup)
+        if args.scenarios:
+            unknown = set(args.scenarios) - {s.name for s in scenarios}
+            if unknown:
+                parser.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+            scenarios = [s for s in scenarios if s.name in args.scenarios]
+
+        results = {
+            "backend": args.backend,
+            "renderer": glGetString(GL_RENDERER).decode("utf-8", "replace"),
+            "display": list(manager.display_size),
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scenarios": {},
+        }
+        for scenario in scenarios:
+            results["scenarios"][scenario.name] = run_scenario(manager, scenario, args.frames, args.warmup, args.screenshots)
+    finally:
+        manager.shutdown()
+
+    baseline = None
+    if args.baseline and not args.update_baseline and not os.path.exists(args.baseline):
+        print(f"AVISO: baseline '{args.baseline}' não existe; nada será comparado. "
+              f"Grave um com --update-baseline")
+    elif args.baseline and not args.update_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("renderer") != results["renderer"] or baseline.get("display") != results["display"]:
+            print(f"AVISO: baseline medido em {baseline.get('renderer')} {baseline.get('display')}; "
+                  f"tempos podem não ser comparáveis")
+
+    print(f"{results['renderer']} | {results['display'][0]}x{results['display'][1]} | {args.frames} quadros por cenário (ms)")
+    print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Baseline gravado em {args.baseline}")
+        return
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, value, reference in regressions:
+            print(f"REGRESSÃO {name}: {metric} {value:.2f} (baseline {reference:.2f}, limite +{args.threshold * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"Sem regressões acima de {args.threshold * 100:.0f}% em relação ao baseline.")
+
+if __name__ == "__main__":
+    main()
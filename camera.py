@@ -0,0 +1,154 @@
+import math
+from pygame.locals import *
+from OpenGL.GLU import *
+from vecmath import Vec3, Mat4
+
+GRID_LIMIT = 20.0 
+
+WORLD_UP = Vec3(0.0, 1.0, 0.0)
+
+
+class CameraBasis:
+    # Tudo o que depende só de yaw/pitch; a Camera refaz só quando um dos dois muda
+    __slots__ = ("yaw", "pitch", "forward", "right", "up", "forward_xz", "view_rotation", "orientation")
+
+    def __init__(self, yaw, pitch):
+        self.yaw = yaw
+        self.pitch = pitch
+
+        yaw_rad = math.radians(yaw)
+        pitch_rad = math.radians(pitch)
+        cos_pitch = math.cos(pitch_rad)
+        self.forward = Vec3(math.cos(yaw_rad) * cos_pitch, math.sin(pitch_rad), math.sin(yaw_rad) * cos_pitch).normalized()
+
+        f = self.forward
+        self.right = f.cross(WORLD_UP).normalized()
+        self.up = self.right.cross(f)
+        self.forward_xz = Vec3(f.x, 0.0, f.z).normalized()
+
+        # Parte de rotação da matriz do gluLookAt (linhas s, u, -f)
+        self.view_rotation = Mat4.from_rows(self.right, self.up, -f)
+        # A inversa: eixos da câmera no mundo, o mesmo que Ry(-yaw - 90) * Rx(pitch)
+        self.orientation = Mat4.from_basis(self.right, self.up, -f)
+
+
+class Camera:
+    def __init__(self):
+        self.position = Vec3(0.0, 1.8, 5.0)
+        self.yaw = -90.0
+        self.pitch = 0.0
+        self.fov = 70.0
+        self.sensitivity = 0.25
+        
+        self.base_speed = 0.1
+        self.sprint_speed = 0.3
+        self.speed = self.base_speed
+        
+        self.max_stamina = 200.0
+        self.current_stamina = 200.0
+        self.stamina_drain_rate = 1.0
+        self.stamina_recover_rate = 0.75
+        
+        self.up = WORLD_UP
+        
+        self.previous_position = self.position.copy()
+        self.render_position = self.position.copy()
+        self._basis = None
+
+    def basis(self):
+        basis = self._basis
+        if basis is None or basis.yaw != self.yaw or basis.pitch != self.pitch:
+            basis = self._basis = CameraBasis(self.yaw, self.pitch)
+        return basis
+
+    def get_direction(self):
+        return self.basis().forward
+
+    def process_mouse_movement(self, dx, dy):
+        self.yaw += dx * self.sensitivity
+        self.pitch += dy * self.sensitivity
+        
+        if self.pitch > 89.0:
+            self.pitch = 89.0
+        if self.pitch < -89.0:
+            self.pitch = -89.0
+
+    def update_movement(self, keys, scale=1.0):
+        self.previous_position = self.position
+        
+        is_moving = keys[K_w] or keys[K_s] or keys[K_a] or keys[K_d]
+        wants_to_sprint = keys[K_LSHIFT] and is_moving
+        
+        is_sprinting = wants_to_sprint and self.current_stamina > 0.0
+        
+        if is_sprinting:
+            self.speed = self.sprint_speed
+            self.current_stamina = max(0.0, self.current_stamina - self.stamina_drain_rate * scale)
+            
+            if self.current_stamina == 0.0:
+                self.speed = self.base_speed
+            
+        else:
+            self.speed = self.base_speed
+            self.current_stamina = min(self.max_stamina, self.current_stamina + self.stamina_recover_rate * scale)
+
+        basis = self.basis()
+        forward_xz = basis.forward_xz
+        right_dir = basis.right
+
+        # Só x e z andam: y volta a 1.8 de qualquer forma
+        x = self.position.x
+        z = self.position.z
+        step = self.speed * scale
+
+        if keys[K_w]:
+            x += forward_xz.x * step
+            z += forward_xz.z * step
+        if keys[K_s]:
+            x -= forward_xz.x * step
+            z -= forward_xz.z * step
+        if keys[K_a]:
+            x -= right_dir.x * step
+            z -= right_dir.z * step
+        if keys[K_d]:
+            x += right_dir.x * step
+            z += right_dir.z * step
+        
+        x = max(-GRID_LIMIT, min(GRID_LIMIT, x))
+        z = max(-GRID_LIMIT, min(GRID_LIMIT, z))
+        
+        self.position = Vec3(x, 1.8, z)
+
+    def interpolate(self, alpha):
+        self.render_position = self.previous_position.lerp(self.position, alpha)
+
+    def frustum_planes(self, aspect, near, far):
+        # Os seis planos do gluPerspective(fov, aspect, near, far) com esta câmera, no espaço do mundo:
+        # (a, b, c, d) com a normal unitária para dentro, ou seja, a*x + b*y + c*z + d >= 0 do lado visível
+        basis = self.basis()
+        f, r, u = basis.forward, basis.right, basis.up
+        eye = self.render_position
+        tan_v = math.tan(math.radians(self.fov) * 0.5)
+        tan_h = tan_v * aspect
+
+        planes = []
+        # Laterais passam pelo olho: normal = eixo lateral +/- forward * tangente do meio-ângulo
+        for axis, tangent in ((r, tan_h), (-r, tan_h), (u, tan_v), (-u, tan_v)):
+            n = (axis + f * tangent).normalized()
+            planes.append((n.x, n.y, n.z, -n.dot(eye)))
+        planes.append((f.x, f.y, f.z, -f.dot(eye) - near))
+        planes.append((-f.x, -f.y, -f.z, f.dot(eye) + far))
+        return planes
+
+    def view_rotation(self):
+        return self.basis().view_rotation
+
+    def update_view(self):
+        direction = self.get_direction()
+        position = self.render_position
+        
+        gluLookAt(
+            position.x, position.y, position.z,
+            position.x + direction.x, position.y + direction.y, position.z + direction.z,
+            self.up.x, self.up.y, self.up.z
+        )
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+def spheres_vs_sphere(centers, radii, center, radius):
+    d = centers - np.asarray(center, dtype=np.float64)
+    reach = radii + radius
+    return np.einsum("ij,ij->i", d, d) < reach * reach
+
+def spheres_in_frustum(planes, x, y, z, radii):
+    # Esferas que tocam o volume entre os planos (normais para dentro, ver Camera.frustum_planes);
+    # conservador perto das arestas, onde uma esfera fora de todos os cantos ainda passa
+    planes = np.asarray(planes, dtype=np.float64)
+    distances = planes[:, 0, None] * x + planes[:, 1, None] * y + planes[:, 2, None] * z + planes[:, 3, None]
+    return (distances >= -radii).all(axis=0)
+
+def spheres_vs_segment(centers, radii, p0, p1, radius):
+    # Cápsula (segmento p0-p1 com raio) contra esferas
+    p0 = np.asarray(p0, dtype=np.float64)
+    p1 = np.asarray(p1, dtype=np.float64)
+
+    reach = radii + radius
+    return _segment_distance_sq(centers, p0, p1) < reach * reach
+
+def spheres_vs_ray(centers, radii, origin, direction, max_distance=np.inf):
+    direction = np.asarray(direction, dtype=np.float64)
+    direction = direction / np.linalg.norm(direction)
+
+    rel = centers - origin
+    b = rel @ direction
+    c = np.einsum("ij,ij->i", rel, rel) - radii * radii
+    disc = b * b - c
+
+    hit = disc >= 0.0
+    sqrt_disc = np.sqrt(np.where(hit, disc, 0.0))
+    t_near = b - sqrt_disc
+    t_far = b + sqrt_disc
+    t = np.where(t_near >= 0.0, t_near, t_far)
+
+    hit &= (t >= 0.0) & (t <= max_distance)
+    return hit, t
+
+def _segment_distance_sq(points, p0, p1):
+    seg = p1 - p0
+    seg_len2 = float(seg @ seg)
+    rel = points - p0
+    if seg_len2 > 0.0:
+        t = np.clip(rel @ seg / seg_len2, 0.0, 1.0)
+        rel = rel - t[:, None] * seg
+    return np.einsum("ij,ij->i", rel, rel)
+
+def _cross(u, v):
+    return np.array((u[1] * v[2] - u[2] * v[1],
+                     u[2] * v[0] - u[0] * v[2],
+                     u[0] * v[1] - u[1] * v[0]))
+
+def _triangle_interior_distance_sq(points, a, b, c):
+    # Distância ao plano do triângulo, apenas para pontos cuja projeção cai dentro dele
+    normal = _cross(b - a, c - a)
+    normal_len2 = float(normal @ normal)
+    if normal_len2 < 1e-12:
+        return np.full(len(points), np.inf)
+
+    normal = normal / np.sqrt(normal_len2)
+    height = (points - a) @ normal
+
+    # (p - v0) . (n x aresta) >= 0 para as três arestas <=> projeção dentro do triângulo
+    inside = (points - a) @ _cross(normal, b - a) >= 0.0
+    inside &= (points - b) @ _cross(normal, c - b) >= 0.0
+    inside &= (points - c) @ _cross(normal, a - c) >= 0.0
+
+    return np.where(inside, height * height, np.inf)
+
+def spheres_vs_swept_segment(centers, radii, a0, b0, a1, b1, radius, subdivisions=4):
+    # Superfície varrida pelo segmento a0-b0 até a1-b1 (um patch bilinear),
+    # aproximada por `subdivisions` faixas de dois triângulos cada
+    if len(centers) == 0:
+        return np.zeros(0, dtype=bool)
+
+    a0, b0, a1, b1 = (np.asarray(p, dtype=np.float64) for p in (a0, b0, a1, b1))
+
+    dist2 = _segment_distance_sq(centers, a0, b0)
+    np.minimum(dist2, _segment_distance_sq(centers, a0, a1), out=dist2)
+    np.minimum(dist2, _segment_distance_sq(centers, b0, b1), out=dist2)
+
+    pa, pb = a0, b0
+    for step in range(1, subdivisions + 1):
+        s = step / subdivisions
+        qa = a0 + (a1 - a0) * s
+        qb = b0 + (b1 - b0) * s
+
+        np.minimum(dist2, _triangle_interior_distance_sq(centers, pa, pb, qb), out=dist2)
+        np.minimum(dist2, _triangle_interior_distance_sq(centers, pa, qb, qa), out=dist2)
+        np.minimum(dist2, _segment_distance_sq(centers, qa, qb), out=dist2)
+        np.minimum(dist2, _segment_distance_sq(centers, pa, qb), out=dist2)
+        pa, pb = qa, qb
+
+    reach = radii + radius
+    return dist2 < reach * reach
@@ -0,0 +1,115 @@
+import math
+import pygame
+from OpenGL.GL import *
+from OpenGL.GLU import *
+import glstate
+
+CRAWL_FOV = 60.0
+CRAWL_TILT = 40.0
+CRAWL_DISTANCE = 1.0
+# Comprimento do plano, em alturas de tela de texto rolado. Uma altura: a última linha sai pela borda
+# distante quando a rolagem passa de total + altura da tela, o mesmo fim da rolagem plana antiga
+CRAWL_DEPTH = 1.0
+# Fração final do plano (a mais distante) em que o texto desaparece
+CRAWL_FADE_START = 0.7
+
+
+def visible_height(display_size):
+    return display_size[1] * CRAWL_DEPTH
+
+
+class CrawlTexture:
+    # O texto inteiro da abertura em uma textura alta, rolado pelas coordenadas
+    # de textura de um único plano inclinado em perspectiva
+    def __init__(self, font, lines, color, line_spacing):
+        surface_height = len(lines) * line_spacing
+        rendered = [font.render(line, True, color[:3]) if line else None for line in lines]
+        surface_width = max((surface.get_width() for surface in rendered if surface), default=1)
+
+        surface = pygame.Surface((surface_width, surface_height), pygame.SRCALPHA)
+        for i, line_surface in enumerate(rendered):
+            if line_surface is None:
+                continue
+            # Mesma posição relativa entre as linhas da rolagem antiga: base da linha i em (i + 1) * espaçamento
+            x = (surface_width - line_surface.get_width()) // 2
+            y = (i + 1) * line_spacing - line_surface.get_height()
+            surface.blit(line_surface, (x, y))
+
+        self.width = surface_width
+        self.height = surface_height
+        self.color = color
+
+        self.texture_id = int(glGenTextures(1))
+        glstate.bind_texture(self.texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        # Fora de [0, 1] a borda é transparente: o texto entra e sai do plano sem repetir
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_BORDER)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_BORDER)
+        glTexParameterfv(GL_TEXTURE_2D, GL_TEXTURE_BORDER_COLOR, (0.0, 0.0, 0.0, 0.0))
+        glTexParameteri(GL_TEXTURE_2D, GL_GENERATE_MIPMAP, GL_TRUE)
+
+        data = pygame.image.tostring(surface, "RGBA", True)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, surface_width, surface_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glstate.bind_texture(0)
+
+    def draw(self, display_size, offset):
+        # offset em pixels de texto: a borda de baixo da tela mostra a linha que a rolagem
+        # plana antiga mostraria em y = 0, e a borda distante a de y = visible_height
+        width, height = display_size
+        window = visible_height(display_size)
+        tan_half_fov = math.tan(math.radians(CRAWL_FOV) / 2.0)
+
+        # Escala 1:1 com a tela na borda de baixo do plano
+        units_per_pixel = 2.0 * CRAWL_DISTANCE * tan_half_fov / height
+        half_width = self.width * units_per_pixel / 2.0
+        length = window * units_per_pixel
+        fade_length = length * CRAWL_FADE_START
+
+        t_near = 1.0 - offset / self.height
+        t_far = 1.0 - (offset - window) / self.height
+        t_fade = t_near + (t_far - t_near) * CRAWL_FADE_START
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluPerspective(CRAWL_FOV, width / height, 0.1, 100.0)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glTranslatef(0.0, -CRAWL_DISTANCE * tan_half_fov, -CRAWL_DISTANCE)
+        glRotatef(-CRAWL_TILT, 1.0, 0.0, 0.0)
+
+        glstate.disable(GL_DEPTH_TEST)
+        glstate.enable(GL_BLEND)
+        glstate.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glstate.enable(GL_TEXTURE_2D)
+        glstate.bind_texture(self.texture_id)
+
+        glstate.begin(GL_QUAD_STRIP)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+        glTexCoord2f(0.0, t_near); glVertex3f(-half_width, 0.0, 0.0)
+        glTexCoord2f(1.0, t_near); glVertex3f(half_width, 0.0, 0.0)
+        glTexCoord2f(0.0, t_fade); glVertex3f(-half_width, fade_length, 0.0)
+        glTexCoord2f(1.0, t_fade); glVertex3f(half_width, fade_length, 0.0)
+        glColor4f(1.0, 1.0, 1.0, 0.0)
+        glTexCoord2f(0.0, t_far); glVertex3f(-half_width, length, 0.0)
+        glTexCoord2f(1.0, t_far); glVertex3f(half_width, length, 0.0)
+        glEnd()
+
+        glstate.bind_texture(0)
+        glstate.disable(GL_TEXTURE_2D)
+        glstate.disable(GL_BLEND)
+        glstate.enable(GL_DEPTH_TEST)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def release(self):
+        if self.texture_id is not None:
+            glstate.delete_textures([self.texture_id])
+        self.texture_id = None
@@ -1,28 +1,45 @@
+import argparse
+import math
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import numpy as np
-import math
+import glstate
+import profiler
 import random
-from PIL import Image
+import time
 import os
-import sys
 from lightsaber import *
+from meshes import LODSphere, GLOBE_LOD, set_lod_projection
+from assets import AssetLoader, release_texture
+import audio
+from meteor_renderer import MeteorBatchRenderer
+from meteor_field import MeteorView
+from text_renderer import get_text_layout
+from hud import Hud
+import scenes
+from scenes import Scene, DISPLAY_SIZE
+from crawl import CrawlTexture
+from simulation import GameSimulation, SIM_TICK_RATE
+from replay import InputRecorder, load_recording, apply_tick_input, session_checksum, numbered_path
 
 skybox_texture_id = None
 meteor_texture_id = None
 earth_texture_id = None
+meteor_renderer = None
+hud = None
+asset_loader = None
 earth_rotation_angle = 0.0 
+previous_earth_rotation_angle = 0.0
+earth_sphere = LODSphere(GLOBE_LOD)
 
-MAX_GAME_TIME_SECONDS = 61
-game_timer_ms = MAX_GAME_TIME_SECONDS * 1000
+# Limite de quadros da partida; GAME_MAX_FPS=0 desliga (só para medir: sem limite o laço ocupa CPU e GPU inteiras)
+MAX_FRAME_RATE = int(os.environ.get("GAME_MAX_FPS", 60))
+MAX_TICKS_PER_FRAME = 8
+EARTH_ROTATION_SPEED = 0.1 
 
-EARTH_SURFACE_Y = -30.0 
 PENALTY_GROUND_Y = 0.0
 
-GRID_LIMIT = 20.0 
-
 crawl_title = "GUERRA NAS ESFERAS" 
 
 crawl_text = [
@@ -49,237 +66,30 @@ crawl_text = [
     ""
 ]
 crawl_y_offset = 0.0 
+previous_crawl_y_offset = 0.0
 crawl_speed = 0.5 
+crawl_texture = None
 
 title_fade_timer = 0 
 TITLE_STILL_DURATION =  240 
 TITLE_FADE_DURATION = 90  
 
-class Camera:
-    def __init__(self):
-        self.position = np.array([0.0, 1.8, 5.0])
-        self.yaw = -90.0
-        self.pitch = 0.0
-        self.fov = 70.0
-        self.sensitivity = 0.25
-        
-        self.base_speed = 0.1
-        self.sprint_speed = 0.3
-        self.speed = self.base_speed
-        
-        self.max_stamina = 200.0
-        self.current_stamina = 200.0
-        self.stamina_drain_rate = 1.0
-        self.stamina_recover_rate = 0.75
-        
-        self.up = np.array([0.0, 1.0, 0.0])
-
-    def get_direction(self):
-        yaw_rad = np.radians(self.yaw)
-        pitch_rad = np.radians(self.pitch)
-
-        x = np.cos(yaw_rad) * np.cos(pitch_rad)
-        y = np.sin(pitch_rad)
-        z = np.sin(yaw_rad) * np.cos(pitch_rad)
-        
-        direction = np.array([x, y, z])
-        return direction / np.linalg.norm(direction) if np.linalg.norm(direction) > 0 else np.array([0, 0, 0])
-
-    def process_mouse_movement(self, dx, dy):
-        self.yaw += dx * self.sensitivity
-        self.pitch += dy * self.sensitivity
-        
-        if self.pitch > 89.0:
-            self.pitch = 89.0
-        if self.pitch < -89.0:
-            self.pitch = -89.0
-
-    def update_movement(self, keys):
-        global GRID_LIMIT
-        
-        is_moving = keys[K_w] or keys[K_s] or keys[K_a] or keys[K_d]
-        wants_to_sprint = keys[K_LSHIFT] and is_moving
-        
-        is_sprinting = wants_to_sprint and self.current_stamina > 0.0
-        
-        if is_sprinting:
-            self.speed = self.sprint_speed
-            self.current_stamina = max(0.0, self.current_stamina - self.stamina_drain_rate)
-            
-            if self.current_stamina == 0.0:
-                self.speed = self.base_speed
-            
-        else:
-            self.speed = self.base_speed
-            self.current_stamina = min(self.max_stamina, self.current_stamina + self.stamina_recover_rate)
-
-        forward_dir = self.get_direction()
-        
-        right_dir = np.cross(forward_dir, self.up)
-        right_dir = right_dir / np.linalg.norm(right_dir)
-        
-        forward_xz = np.array([forward_dir[0], 0.0, forward_dir[2]])
-        forward_xz_norm = np.linalg.norm(forward_xz)
-        forward_xz = forward_xz / forward_xz_norm if forward_xz_norm > 0 else np.array([0, 0, 0])
-
-        new_position = self.position.copy()
-
-        if keys[K_w]:
-            new_position += forward_xz * self.speed
-        if keys[K_s]:
-            new_position -= forward_xz * self.speed
-        if keys[K_a]:
-            new_position -= right_dir * self.speed
-        if keys[K_d]:
-            new_position += right_dir * self.speed
-            
-        new_position[1] = 1.8 
-        
-        new_position[0] = np.clip(new_position[0], -GRID_LIMIT, GRID_LIMIT)
-        new_position[2] = np.clip(new_position[2], -GRID_LIMIT, GRID_LIMIT)
-        
-        self.position = new_position 
-
-    def update_view(self):
-        direction = self.get_direction()
-        look_at = self.position + direction
-        
-        gluLookAt(
-            self.position[0], self.position[1], self.position[2],
-            look_at[0], look_at[1], look_at[2],
-            self.up[0], self.up[1], self.up[2]
-        )
-
-class DroppingObject:
-    def __init__(self):
-        self.x = random.uniform(-GRID_LIMIT, GRID_LIMIT) 
-        self.y = random.uniform(50.0, 100.0)
-        self.z = random.uniform(-GRID_LIMIT, GRID_LIMIT) 
-        
-        self.size = random.uniform(1.0, 3.0)
-        
-        self.color = (random.random(), random.random(), random.random())
-        self.speed = random.uniform(0.05, 0.15)
-        self.active = True
-        self.has_hit_earth = False 
-        
-        self.rotation_angle = random.uniform(0.0, 360.0) 
-        self.rotation_speed = random.uniform(1.0, 5.0) 
-        self.rotation_axis = np.array([random.random(), random.random(), random.random()])
-        self.rotation_axis /= np.linalg.norm(self.rotation_axis) 
-
-    def update(self):
-        global EARTH_SURFACE_Y
-        
-        if self.active:
-            self.y -= self.speed
-            self.rotation_angle += self.rotation_speed
-            
-            if self.y <= EARTH_SURFACE_Y:
-                self.active = False
-                
-    def draw(self):
-        global meteor_texture_id
-        
-        if self.active or self.y > EARTH_SURFACE_Y: 
-            glPushMatrix()
-            glTranslatef(self.x, self.y, self.z)
-            
-            glRotatef(self.rotation_angle, self.rotation_axis[0], self.rotation_axis[1], self.rotation_axis[2])
-
-            if meteor_texture_id:
-                glEnable(GL_TEXTURE_2D)
-                glBindTexture(GL_TEXTURE_2D, meteor_texture_id)
-                glColor3f(1.0, 1.0, 1.0)
-            else:
-                glColor3f(*self.color)
-            
-            quadric = gluNewQuadric()
-            gluQuadricTexture(quadric, GL_TRUE) 
-            
-            gluSphere(quadric, self.size, 5, 5)
-            gluDeleteQuadric(quadric)
-            
-            if meteor_texture_id:
-                glBindTexture(GL_TEXTURE_2D, 0)
-                glDisable(GL_TEXTURE_2D)
-            
-            glPopMatrix()
-
-    def check_collision(self, player_pos):
-        if not self.active:
-            return False
-        
-        player_x = player_pos[0]
-        player_y = player_pos[1]  
-        player_z = player_pos[2]
-        
-        meteor_x = self.x
-        meteor_y = self.y
-        meteor_z = self.z
-        
-        distance_3d = math.sqrt(
-            (meteor_x - player_x)**2 + 
-            (meteor_y - player_y)**2 + 
-            (meteor_z - player_z)**2
-        )
-        
-        collision_radius = self.size + 2
-        
-        if distance_3d < collision_radius:
-            self.active = False
-            return True
-            
-        return False
-
-def load_texture(filename):
-    try:
-        img = Image.open(filename)
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA') 
-            
-        img_data = img.tobytes("raw", "RGBA")
-        width, height = img.size
-    except FileNotFoundError:
-        print(f"ERRO: Arquivo de textura '{filename}' não encontrado. O objeto será desenhado sem textura.")
-        return 0
-    except Exception as e:
-        print(f"ERRO ao carregar a textura '{filename}': {e}")
-        return 0
+SKYBOX_SIZE = 500.0
 
-    texture_id = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, texture_id)
+# Projeção da cena do jogo (GameScene.enter); o recorte dos meteoros usa os mesmos valores
+DISPLAY_ASPECT = DISPLAY_SIZE[0] / DISPLAY_SIZE[1]
+NEAR_PLANE = 0.1
+FAR_PLANE = 1000.0
 
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT) 
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+skybox_list = None
 
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, img_data)
-    
-    glBindTexture(GL_TEXTURE_2D, 0)
-    return texture_id
-
-def draw_skybox(texture_id, size=500.0):
-    
-    glPushMatrix()
-    
-    R = glGetFloatv(GL_MODELVIEW_MATRIX)
-    R[3, 0] = R[3, 1] = R[3, 2] = 0.0 
-    glLoadMatrixf(R)
-
-    glDisable(GL_LIGHTING)
-    glDisable(GL_DEPTH_TEST) 
-    glEnable(GL_TEXTURE_2D)
-    glBindTexture(GL_TEXTURE_2D, texture_id)
-    glColor3f(1.0, 1.0, 1.0) 
+def build_skybox_list(size=SKYBOX_SIZE):
+    # Só a geometria; textura e estados ficam fora da lista
+    display_list = glGenLists(1)
+    glNewList(display_list, GL_COMPILE)
     
     s = size / 2.0
     
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE) 
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-
     glBegin(GL_QUADS)
     
     glTexCoord2f(0.0, 0.0); glVertex3f(-s, -s, s)
@@ -313,67 +123,92 @@ def draw_skybox(texture_id, size=500.0):
     glTexCoord2f(0.0, 1.0); glVertex3f(-s,  s, -s)
     
     glEnd()
+    glEndList()
+    return display_list
+
+def draw_skybox(texture_id, cam):
+    global skybox_list
+    
+    if skybox_list is None:
+        skybox_list = build_skybox_list()
     
-    glBindTexture(GL_TEXTURE_2D, 0)
-    glDisable(GL_TEXTURE_2D)
-    glEnable(GL_DEPTH_TEST) 
+    # Rotação da câmera calculada na CPU: sem ler a matriz de volta do GL
+    glPushMatrix()
+    glLoadMatrixf(cam.view_rotation().values)
+
+    glstate.disable(GL_LIGHTING)
+    glstate.disable(GL_DEPTH_TEST) 
+    glstate.enable(GL_TEXTURE_2D)
+    glstate.bind_texture(texture_id)
+    glColor3f(1.0, 1.0, 1.0) 
+    
+    glstate.call_list(skybox_list)
+    
+    # A textura fica ligada: a Terra e os meteoros, logo depois, trocam só o que precisam
+    glstate.enable(GL_DEPTH_TEST) 
     glPopMatrix() 
+
+def release_skybox():
+    global skybox_list
     
-    if texture_id:
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT) 
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-        glBindTexture(GL_TEXTURE_2D, 0)
+    if skybox_list is not None:
+        glDeleteLists(skybox_list, 1)
+        skybox_list = None
 
 def draw_ground():
     pass 
 
-def draw_half_sphere():
-    global earth_texture_id, earth_rotation_angle 
-    
+def draw_half_sphere(cam, alpha=1.0):
     center_y = -130.0 
     radius = 100.0 
+    eye = cam.render_position
+    distance = math.sqrt(eye.x * eye.x + (eye.y - center_y) ** 2 + eye.z * eye.z)
     
     glPushMatrix()
     glTranslatef(0.0, center_y, 0.0) 
     
-    glRotatef(earth_rotation_angle, 0.0, 1.0, 0.0)
+    angle = previous_earth_rotation_angle + (earth_rotation_angle - previous_earth_rotation_angle) * alpha
+    glRotatef(angle, 0.0, 1.0, 0.0)
     glRotatef(90.0, 1.0, 0.0, 0.0) 
     
     if earth_texture_id:
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, earth_texture_id)
+        glstate.enable(GL_TEXTURE_2D)
+        glstate.bind_texture(earth_texture_id)
         glColor3f(1.0, 1.0, 1.0) 
     else:
+        glstate.disable(GL_TEXTURE_2D)
         glColor3f(0.0, 0.0, 0.5) 
     
-    quadric = gluNewQuadric()
-    gluQuadricDrawStyle(quadric, GLU_FILL) 
-    gluQuadricTexture(quadric, GL_TRUE) 
-    
-    gluSphere(quadric, radius, 30, 30)
-    
-    gluDeleteQuadric(quadric)
-    
-    if earth_texture_id:
-        glBindTexture(GL_TEXTURE_2D, 0)
-        glDisable(GL_TEXTURE_2D)
+    earth_sphere.draw(radius, distance)
     
     glPopMatrix()
 
-def draw_scene(dropping_objects, skybox_id):
+def draw_scene(meteor_field, skybox_id, cam, alpha=1.0):
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     
     glMatrixMode(GL_MODELVIEW) 
     
     if skybox_id:
-        draw_skybox(skybox_id) 
+        draw_skybox(skybox_id, cam) 
     
-    draw_half_sphere() 
+    draw_half_sphere(cam, alpha) 
     draw_ground() 
     
-    for obj in dropping_objects:
-        obj.draw()
+    # Só os meteoros dentro do frustum vão para o renderizador, num teste único para o campo todo
+    with profiler.section("recorte"):
+        planes = cam.frustum_planes(DISPLAY_ASPECT, NEAR_PLANE, FAR_PLANE)
+        visible = meteor_field.visible_indices(planes, alpha)
+    profiler.count("meteoros_visiveis", len(visible))
+    profiler.count("meteoros_cortados", meteor_field.count - len(visible))
+
+    if meteor_renderer is not None:
+        meteor_renderer.pack_field(meteor_field, alpha, cam.render_position, visible)
+        meteor_renderer.draw(meteor_texture_id)
+    else:
+        for i in visible.tolist():
+            MeteorView(meteor_field, i).draw(meteor_texture_id)
+        glstate.bind_texture(0)
+        glstate.disable(GL_TEXTURE_2D)
         
 def setup_2d_projection(display_size):
     glMatrixMode(GL_PROJECTION)
@@ -386,32 +221,24 @@ def setup_2d_projection(display_size):
     glPushMatrix()
     glLoadIdentity()
     
-    glDisable(GL_DEPTH_TEST)
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    glstate.disable(GL_DEPTH_TEST)
+    glstate.enable(GL_BLEND)
+    glstate.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
 def restore_3d_projection():
-    glDisable(GL_BLEND)
-    glEnable(GL_DEPTH_TEST)
+    glstate.disable(GL_BLEND)
+    glstate.enable(GL_DEPTH_TEST)
     glPopMatrix() 
     glMatrixMode(GL_PROJECTION)
     glPopMatrix() 
     glMatrixMode(GL_MODELVIEW)
 
 def draw_text_2d(text, x, y, font, color=(255, 255, 255, 255)):
-    setup_2d_projection(pygame.display.get_surface().get_size())
-    
-    text_surface = font.render(text, True, color[:3]) 
-    text_data = pygame.image.tostring(text_surface, "RGBA", True)
-
     width, height = pygame.display.get_surface().get_size()
+    setup_2d_projection((width, height))
     
-    glColor4ub(*color)
-    
-    glRasterPos2i(x, height - y - text_surface.get_height()) 
-    
-    glDrawPixels(text_surface.get_width(), text_surface.get_height(), 
-                 GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+    layout = get_text_layout(font, text)
+    layout.draw(x, height - y - layout.height, color)
     
     glColor4f(1.0, 1.0, 1.0, 1.0)
     
@@ -421,19 +248,13 @@ def draw_centered_text(text, font, display_size, y_offset=0, color=(255, 255, 25
     setup_2d_projection(display_size)
     
     width, height = display_size
-    text_surface = font.render(text, True, color[:3]) 
-    text_w, text_h = text_surface.get_size()
+    layout = get_text_layout(font, text)
+    text_w, text_h = layout.width, layout.height
     
     x = (width - text_w) // 2
     y_center = (height - text_h) // 2 + y_offset 
     
-    text_data = pygame.image.tostring(text_surface, "RGBA", True)
-
-    glColor4ub(*color)
-
-    glRasterPos2i(x, height - y_center - text_h) 
-    
-    glDrawPixels(text_w, text_h, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+    layout.draw(x, height - y_center - text_h, color)
     
     glColor4f(1.0, 1.0, 1.0, 1.0)
     
@@ -443,340 +264,367 @@ def draw_outlined_text(text, font, display_size, y_offset=0, fill_color=(0, 0, 0
     setup_2d_projection(display_size)
     width, height = display_size
     
-    outline_surface = font.render(text, True, outline_color[:3]) 
-    outline_w, outline_h = outline_surface.get_size()
-    
-    base_x = (width - outline_w) // 2
-    base_y = (height - outline_h) // 2 + y_offset 
-
-    glColor4ub(*outline_color)
-    outline_data = pygame.image.tostring(outline_surface, "RGBA", True)
-
-    offsets = [
-        (-outline_size, -outline_size), (outline_size, -outline_size), 
-        (-outline_size, outline_size), (outline_size, outline_size), 
-        (0, -outline_size), (0, outline_size), 
-        (-outline_size, 0), (outline_size, 0)
-    ]
+    # Contorno (8 cópias deslocadas) e preenchimento saem do mesmo buffer, em uma chamada
+    layout = get_text_layout(font, text, outline_size)
+    text_w, text_h = layout.width, layout.height
     
-    for dx, dy in offsets:
-        raster_y = height - (base_y + dy) - outline_h 
-        glRasterPos2i(base_x + dx, raster_y) 
-        glDrawPixels(outline_w, outline_h, GL_RGBA, GL_UNSIGNED_BYTE, outline_data)
+    base_x = (width - text_w) // 2
+    base_y = (height - text_h) // 2 + y_offset 
 
-    fill_surface = font.render(text, True, fill_color[:3]) 
-    
-    glColor4ub(*fill_color)
-    fill_data = pygame.image.tostring(fill_surface, "RGBA", True)
-    
-    raster_y = height - base_y - outline_h
-    glRasterPos2i(base_x, raster_y) 
-    
-    glDrawPixels(outline_w, outline_h, GL_RGBA, GL_UNSIGNED_BYTE, fill_data)
+    layout.draw(base_x, height - base_y - text_h, fill_color, outline_color)
     
     glColor4f(1.0, 1.0, 1.0, 1.0)
     
     restore_3d_projection()
     
-def draw_star_wars_crawl(font, display_size):
-    global crawl_y_offset, crawl_text, crawl_speed
-    
-    setup_2d_projection(display_size)
-    width, height = display_size
-    
-    line_spacing = 40 
-    crawl_color = (255, 210, 0, 255) 
+CRAWL_LINE_SPACING = 40
+
+def update_star_wars_crawl(display_size, scale=1.0):
+    global crawl_y_offset, previous_crawl_y_offset, crawl_text, crawl_speed
     
-    num_lines = len(crawl_text)
-    total_text_height = num_lines * line_spacing
+    total_text_height = len(crawl_text) * CRAWL_LINE_SPACING
     
-    start_base_y = -total_text_height 
-
-    if crawl_y_offset > total_text_height + height:
-        restore_3d_projection()
+    if crawl_y_offset > total_text_height + display_size[1]:
         return True 
-
-    for i, line in enumerate(crawl_text):
-        glColor4ub(*crawl_color)
-        
-        text_surface = font.render(line, True, crawl_color[:3])
-        text_w, text_h = text_surface.get_size()
-        
-        inverted_index = num_lines - 1 - i 
-        
-        line_y = start_base_y + (inverted_index * line_spacing) + crawl_y_offset
-
-        if line_y < -text_h or line_y > height + text_h:
-            continue
-
-        x = (width - text_w) // 2
-        
-        glRasterPos2i(x, int(line_y))
-        
-        text_data = pygame.image.tostring(text_surface, "RGBA", True)
-        glDrawPixels(text_w, text_h, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
-
-    glColor4f(1.0, 1.0, 1.0, 1.0)
-        
-    crawl_y_offset += crawl_speed
     
-    restore_3d_projection()
+    previous_crawl_y_offset = crawl_y_offset
+    crawl_y_offset += crawl_speed * scale
     return False
 
-def draw_health_bar(current, max_health, display_size):
-    
-    setup_2d_projection(display_size)
-    
-    bar_width_max = 1000  
-    bar_height = 20
-    bar_padding_top = 30
-    
-    width, height = display_size
-    
-    bar_x = (width - bar_width_max) // 2
-    
-    bar_y = height - bar_padding_top - bar_height 
-    
-    health_ratio = current / max_health
-    bar_width_current = bar_width_max * max(0.0, health_ratio) 
-    
-    glColor4f(0.2, 0.2, 0.2, 0.8) 
-    glBegin(GL_QUADS)
-    glVertex2f(bar_x, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y + bar_height)
-    glVertex2f(bar_x, bar_y + bar_height)
-    glEnd()
-    
-    if health_ratio > 0:
-        if health_ratio >= 0.5:
-            r = (1.0 - health_ratio) * 2.0  
-            g = 1.0
-        else:
-            r = 1.0
-            g = health_ratio * 2.0  
-        b = 0.0
-        
-        glColor4f(r, g, b, 0.9)
-        
-        glBegin(GL_QUADS)
-        glVertex2f(bar_x, bar_y)
-        glVertex2f(bar_x + bar_width_current, bar_y)
-        glVertex2f(bar_x + bar_width_current, bar_y + bar_height)
-        glVertex2f(bar_x, bar_y + bar_height)
-        glEnd()
-
-    glColor4f(1.0, 1.0, 1.0, 1.0) 
-    glLineWidth(2.0)
-    glBegin(GL_LINE_LOOP)
-    glVertex2f(bar_x, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y + bar_height)
-    glVertex2f(bar_x, bar_y + bar_height)
-    glEnd()
-    
-    health_text = f"TERRA"
-    font = pygame.font.Font(None, 24) 
-    text_surface = font.render(health_text, True, (255, 255, 255))
-    text_w, text_h = text_surface.get_size()
-    
-    text_x = bar_x + (bar_width_max - text_w) // 2
-    text_y = bar_y - text_h - 5 
-    
-    text_data = pygame.image.tostring(text_surface, "RGBA", True)
-
-    glColor4f(1.0, 1.0, 1.0, 1.0) 
-    glRasterPos2i(text_x, int(text_y))
-    glDrawPixels(text_w, text_h, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
-
-    restore_3d_projection()
-    
-def draw_stamina_bar(current, max_stamina, display_size):
-    
-    setup_2d_projection(display_size)
+def draw_star_wars_crawl(font, display_size, alpha=1.0):
+    global crawl_texture
     
-    bar_width_max = 200
-    bar_height = 15
-    bar_padding_bottom = 30
-    bar_padding_left = 30 
+    # Rasterizado uma vez ao começar a abertura; liberado em release_star_wars_crawl()
+    if crawl_texture is None:
+        crawl_color = (255, 210, 0, 255) 
+        crawl_texture = CrawlTexture(font, crawl_text, crawl_color, CRAWL_LINE_SPACING)
     
-    bar_x = bar_padding_left 
-    bar_y = bar_padding_bottom 
-    
-    stamina_ratio = current / max_stamina
-    bar_width_current = bar_width_max * stamina_ratio
-    
-    glColor4f(0.2, 0.2, 0.2, 0.8) 
-    glBegin(GL_QUADS)
-    glVertex2f(bar_x, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y + bar_height)
-    glVertex2f(bar_x, bar_y + bar_height)
-    glEnd()
-    
-    if stamina_ratio > 0:
-        r = 1.0 if stamina_ratio < 0.5 else 1.0 - (stamina_ratio - 0.5) * 2.0
-        g = 1.0 if stamina_ratio > 0.5 else stamina_ratio * 2.0
-        b = 0.0
-        glColor4f(r, g, b, 0.9)
-        
-        glBegin(GL_QUADS)
-        glVertex2f(bar_x, bar_y)
-        glVertex2f(bar_x + bar_width_current, bar_y)
-        glVertex2f(bar_x + bar_width_current, bar_y + bar_height)
-        glVertex2f(bar_x, bar_y + bar_height)
-        glEnd()
+    y_offset = previous_crawl_y_offset + (crawl_y_offset - previous_crawl_y_offset) * alpha
+    crawl_texture.draw(display_size, y_offset)
 
-    glColor4f(1.0, 1.0, 1.0, 1.0)
-    glLineWidth(2.0)
-    glBegin(GL_LINE_LOOP)
-    glVertex2f(bar_x, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y)
-    glVertex2f(bar_x + bar_width_max, bar_y + bar_height)
-    glVertex2f(bar_x, bar_y + bar_height)
-    glEnd()
+def release_star_wars_crawl():
+    global crawl_texture
     
-    restore_3d_projection()
+    if crawl_texture is not None:
+        crawl_texture.release()
+        crawl_texture = None
 
 STAR_WARS_THEME_PATH = "sounds/star_wars_theme.mp3" 
 WILHELM_SCREAM_PATH = "sounds/scream.mp3" 
 wilhelm_scream_sound = None 
 
-def main():
-    global skybox_texture_id, meteor_texture_id, earth_texture_id, earth_rotation_angle, crawl_y_offset, wilhelm_scream_sound
-    global title_fade_timer, crawl_title, TITLE_STILL_DURATION, TITLE_FADE_DURATION
-    global game_timer_ms, MAX_GAME_TIME_SECONDS
-    
-    pygame.init()
-    
-    pygame.mixer.init()
-    
-    display = (1280, 720)
-    pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
-    pygame.display.set_caption("PyOpenGL Catch the Meteors") 
-    
-    pygame.mouse.set_visible(True) 
-    pygame.event.set_grab(False)
-    
-    cam = Camera()
-    
-    skybox_texture_id = load_texture("textures/stars.jpg") 
-    meteor_texture_id = load_texture("textures/meteor.jpg")
-    earth_texture_id = load_texture("textures/earth.jpg") 
+def set_skybox_texture(texture_id):
+    global skybox_texture_id
+    skybox_texture_id = texture_id
 
-    glMatrixMode(GL_PROJECTION)
-    gluPerspective(cam.fov, (display[0] / display[1]), 0.1, 1000.0) 
-    
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-    
-    glEnable(GL_DEPTH_TEST)
-    glClearColor(0.0, 0.0, 0.0, 1.0) 
-    
-    MAX_HEALTH = 100 
-    score = 100 
-    
-    try:
-        pygame.font.init()
-        font = pygame.font.Font(None, 36) 
-        font_large = pygame.font.Font(None, 120) 
-        font_crawl = pygame.font.Font(None, 48)
-    except:
-        font = pygame.font.SysFont('Arial', 36)
-        font_large = pygame.font.SysFont('Arial', 120)
-        font_crawl = pygame.font.SysFont('Arial', 48)
+def set_meteor_texture(texture_id):
+    global meteor_texture_id
+    meteor_texture_id = texture_id
 
-    try:
-        wilhelm_scream_sound = pygame.mixer.Sound(WILHELM_SCREAM_PATH)
+def set_earth_texture(texture_id):
+    global earth_texture_id
+    earth_texture_id = texture_id
+
+def set_wilhelm_scream_sound(sound):
+    global wilhelm_scream_sound
+    wilhelm_scream_sound = sound
+    if sound is not None:
         print(f"Som '{WILHELM_SCREAM_PATH}' carregado com sucesso.")
-    except pygame.error as e:
-        print(f"AVISO: ERRO ao carregar o som do Game Over: {e}. Verifique se o arquivo '{WILHELM_SCREAM_PATH}' existe.")
-        wilhelm_scream_sound = None
 
-    dropping_objects = []
-    
-    object_spawn_timer = 0
-    SPAWN_INTERVAL = 60 
-    
-    game_state = "TITLE_SCREEN" 
-    
-    clock = pygame.time.Clock()
-    running = True
-    
-    EARTH_ROTATION_SPEED = 0.1 
-    
-    last_time = pygame.time.get_ticks() 
-    
-    try:
-        pygame.mixer.music.load(STAR_WARS_THEME_PATH)
-        pygame.mixer.music.play(-1) 
+def release_game_textures():
+    global skybox_texture_id, meteor_texture_id, earth_texture_id
+    for texture_id in (skybox_texture_id, meteor_texture_id, earth_texture_id):
+        release_texture(texture_id)
+    skybox_texture_id = meteor_texture_id = earth_texture_id = None
+
+class GameScene(Scene):
+    # Título, abertura, partida e fim de jogo; os recursos ficam entre uma partida e outra
+    caption = "PyOpenGL Catch the Meteors"
+
+    def __init__(self, tick_rate=SIM_TICK_RATE, max_fps=MAX_FRAME_RATE, record=None, replay=None, lockstep=False):
+        super().__init__()
+        # record: grava a entrada de cada partida; replay: joga uma gravação no lugar do jogador,
+        # em tempo real ou, com lockstep, uma atualização por quadro o mais rápido possível
+        self.record_path = record
+        self.recordings_saved = 0
+        self.recorder = None
+        self.recording = load_recording(replay) if replay else None
+        self.lockstep = lockstep and self.recording is not None
+        self.replay_done = False
+        if self.recording is not None:
+            tick_rate = self.recording.tick_rate
+        
+        self.max_fps = max_fps
+        self.session = GameSimulation(tick_rate)
+        self.display = DISPLAY_SIZE
+        self.game_state = "TITLE_SCREEN"
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.last_time = time.perf_counter()
+        self.theme_loaded = False
+        self.assets_reported = False
+        self.fonts = None
+
+    def load(self):
+        global meteor_renderer, hud, asset_loader
+        
+        # Texturas e sons chegam durante a tela de título; até lá a cena é desenhada sem eles
+        asset_loader = AssetLoader()
+        # Borda fixa desde o carregamento; o skybox não troca o modo a cada quadro
+        asset_loader.texture("textures/stars.jpg", set_skybox_texture, GL_CLAMP_TO_EDGE)
+        asset_loader.texture("textures/meteor.jpg", set_meteor_texture)
+        asset_loader.texture("textures/earth.jpg", set_earth_texture)
+        asset_loader.submit(audio.load_sound, WILHELM_SCREAM_PATH, set_wilhelm_scream_sound)
+        asset_loader.submit(audio.load_music, STAR_WARS_THEME_PATH, self.on_theme_loaded)
+        load_saber_sounds(asset_loader)
+        
+        meteor_renderer = MeteorBatchRenderer()
+        hud = Hud()
+        
+        try:
+            pygame.font.init()
+            font = pygame.font.Font(None, 36) 
+            font_large = pygame.font.Font(None, 120) 
+            font_crawl = pygame.font.Font(None, 48)
+        except:
+            font = pygame.font.SysFont('Arial', 36)
+            font_large = pygame.font.SysFont('Arial', 120)
+            font_crawl = pygame.font.SysFont('Arial', 48)
+        self.fonts = (font, font_large, font_crawl)
+
+    def on_theme_loaded(self, loaded):
+        self.theme_loaded = loaded
+        # Pode terminar de carregar depois que o jogador já pulou a abertura
+        if loaded and self.manager.current is self and self.game_state in ("TITLE_SCREEN", "INTRO"):
+            self.start_theme_music()
+
+    def start_theme_music(self):
+        audio.play_music(-1)
         print(f"Música '{STAR_WARS_THEME_PATH}' iniciada.")
-    except pygame.error as e:
-        print(f"ERRO ao carregar ou tocar a música: {e}. Verifique se o arquivo de áudio está correto.")
-        pass
 
+    def enter(self):
+        global earth_rotation_angle, previous_earth_rotation_angle
+        global title_fade_timer, crawl_y_offset, previous_crawl_y_offset
+        
+        if self.fonts is None:
+            self.load()
+        
+        # Nova partida no mesmo processo: só o estado volta ao início
+        if self.recording is not None:
+            self.session.reset(self.recording.seed)
+        elif self.record_path:
+            # Gravar exige uma semente conhecida; sem gravação o jogo segue com o random global
+            seed = random.getrandbits(63)
+            self.session.reset(seed)
+            self.recorder = InputRecorder(seed, self.session.tick_rate)
+        else:
+            self.session.reset()
+        self.game_state = "TITLE_SCREEN"
+        title_fade_timer = 0
+        crawl_y_offset = previous_crawl_y_offset = 0.0
+        earth_rotation_angle = previous_earth_rotation_angle = 0.0
+        
+        pygame.mouse.set_visible(True) 
+        pygame.event.set_grab(False)
+        
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluPerspective(self.session.cam.fov, DISPLAY_ASPECT, NEAR_PLANE, FAR_PLANE)
+        set_lod_projection(self.session.cam.fov, self.display[1])
+        
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        
+        glstate.enable(GL_DEPTH_TEST)
+        glClearColor(0.0, 0.0, 0.0, 1.0) 
+        
+        if self.theme_loaded:
+            self.start_theme_music()
+        
+        self.accumulator = 0.0
+        self.last_time = time.perf_counter() 
+        
+        if self.recording is not None:
+            # O replay começa direto na partida, sem capturar o mouse do jogador
+            self.game_state = "RUNNING"
+            self.replay_done = False
+            audio.stop_music()
+
+    def leave(self):
+        # Partida abandonada no meio também é gravada, até o último tick jogado
+        self.save_recording()
+        release_star_wars_crawl()
+        audio.stop_music()
+        pygame.mouse.set_visible(True)
+        pygame.event.set_grab(False)
+
+    def start_running(self):
+        self.game_state = "RUNNING"
+        release_star_wars_crawl()
+        pygame.mouse.set_visible(False)
+        pygame.event.set_grab(True)
+        audio.stop_music()
+
+    def save_recording(self):
+        recorder = self.recorder
+        self.recorder = None
+        if recorder is None or recorder.ticks == 0:
+            return
+        self.recordings_saved += 1
+        path = numbered_path(self.record_path, self.recordings_saved)
+        try:
+            recorder.save(path)
+            print(f"Partida gravada em '{path}' ({recorder.ticks} ticks, semente {recorder.seed}).")
+        except OSError as e:
+            print(f"ERRO ao gravar a partida em '{path}': {e}")
+
+    def finish_replay(self):
+        self.replay_done = True
+        session = self.session
+        if session.ticks == len(self.recording.inputs) and session_checksum(session) == self.recording.checksum:
+            print(f"Replay exato: {session.ticks} ticks, estado final idêntico ao da gravação.")
+        else:
+            print(f"AVISO: o replay divergiu da gravação após {session.ticks} ticks.")
+        if self.lockstep:
+            self.manager.quit()
+
+    def handle_event(self, event):
+        if self.recording is not None:
+            # No replay só o ESC vale; o resto da entrada vem da gravação
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.manager.quit()
+            return
+        
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE: 
+                if self.game_state == "GAME_OVER" or self.game_state == "WIN":
+                    self.manager.switch("menu")
+                else:
+                    self.manager.quit()
+            
+            if (self.game_state == "TITLE_SCREEN" or self.game_state == "INTRO") and event.key == pygame.K_SPACE:
+                self.start_running()
+            
+            if self.game_state == "RUNNING" and event.key == pygame.K_SPACE:
+                toggle_saber()
+                if self.recorder is not None:
+                    self.recorder.toggle_saber()
+                
+        if self.game_state == "RUNNING":
+            if event.type == pygame.MOUSEMOTION:
+                dx, dy = event.rel
+                self.session.cam.process_mouse_movement(dx, -dy)
+                if self.recorder is not None:
+                    self.recorder.mouse(dx, dy)
 
-    while running:
-        current_time = pygame.time.get_ticks()
-        delta_time_ms = current_time - last_time 
-        last_time = current_time
+    def update(self):
+        global earth_rotation_angle, previous_earth_rotation_angle, title_fade_timer
+        
+        session = self.session
+        cam = session.cam
+        tick_seconds = session.tick_seconds
+        tick_scale = session.tick_scale
+        
+        current_time = time.perf_counter()
+        frame_seconds = current_time - self.last_time 
+        self.last_time = current_time
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE: 
-                    if game_state == "GAME_OVER" or game_state == "WIN":
-                        pygame.mixer.quit()
-                        pygame.quit()
-                        
-                        try:
-                            os.system('python menu.py') 
-                        except Exception as e:
-                            print(f"ERRO ao tentar iniciar menu.py: {e}")
-                            
-                        sys.exit() 
-                        
-                    else:
-                        running = False
+        # Evita a espiral de atraso quando um quadro demora demais
+        self.accumulator += min(frame_seconds, MAX_TICKS_PER_FRAME * tick_seconds)
+        if self.lockstep:
+            # Carga fixa por quadro, independente da velocidade da máquina
+            self.accumulator = tick_seconds
+        
+        asset_loader.pump()
+        if not self.assets_reported and asset_loader.done:
+            self.assets_reported = True
+            print(f"Recursos carregados em {asset_loader.load_seconds * 1000.0:.0f} ms")
+        
+        keys = pygame.key.get_pressed()
+        
+        while self.accumulator >= tick_seconds:
+            self.accumulator -= tick_seconds
+            
+            if self.game_state == "TITLE_SCREEN":
+                if title_fade_timer >= TITLE_STILL_DURATION + TITLE_FADE_DURATION:
+                    self.game_state = "INTRO"
+                    title_fade_timer = 0 
+                else:
+                    title_fade_timer += tick_scale
+            
+            elif self.game_state == "INTRO":
+                intro_finished = update_star_wars_crawl(self.display, tick_scale)
                 
-                if (game_state == "TITLE_SCREEN" or game_state == "INTRO") and event.key == pygame.K_SPACE:
-                    game_state = "RUNNING"
-                    pygame.mouse.set_visible(False)
-                    pygame.event.set_grab(True)
-                    pygame.mixer.music.stop() 
+                if intro_finished:
+                    self.start_running()
+            
+            elif self.game_state == "RUNNING":
+                if self.recording is not None:
+                    if self.replay_done:
+                        break
+                    tick_input = self.recording.inputs[session.ticks]
+                    apply_tick_input(session, tick_input, play_sound=True)
+                    session.tick(tick_input.keys)
+                else:
+                    session.tick(keys)
+                    if self.recorder is not None:
+                        self.recorder.tick(keys, session)
+                
+                previous_earth_rotation_angle = earth_rotation_angle
+                earth_rotation_angle += EARTH_ROTATION_SPEED * tick_scale
+                if earth_rotation_angle >= 360.0:
+                    earth_rotation_angle -= 360.0
+                    previous_earth_rotation_angle -= 360.0
+                
+                if session.finished:
+                    self.game_state = session.state
+                    pygame.mouse.set_visible(True)
+                    pygame.event.set_grab(False)
+                    audio.stop_music()
+                    if self.game_state == "GAME_OVER" and wilhelm_scream_sound:
+                        audio.play(wilhelm_scream_sound, audio.PRIORITY_HIGH)
+                    self.save_recording()
                 
-                if game_state == "RUNNING" and event.key == pygame.K_SPACE:
-                    toggle_saber()
-                    
-            if game_state == "RUNNING":
-                if event.type == pygame.MOUSEMOTION:
-                    dx, dy = event.rel
-                    cam.process_mouse_movement(dx, -dy)
+                if self.recording is not None and (session.finished or session.ticks == len(self.recording.inputs)):
+                    self.finish_replay()
+            
+            else:
+                # Fora do RUNNING nada se move; mantém a interpolação parada
+                cam.previous_position = cam.position
+                session.field.settle()
+                previous_earth_rotation_angle = earth_rotation_angle
+        
+        self.alpha = self.accumulator / tick_seconds
+        cam.interpolate(self.alpha)
 
-        keys = pygame.key.get_pressed()
+    def draw(self):
+        session = self.session
+        cam = session.cam
+        meteor_field = session.field
+        display = self.display
+        alpha = self.alpha
+        font, font_large, font_crawl = self.fonts
+        game_state = self.game_state
         
         if game_state == "TITLE_SCREEN":
             glLoadIdentity()
-            cam.update_view()
-            draw_scene(dropping_objects, skybox_texture_id) 
+            with profiler.section("camera_vista"):
+                cam.update_view()
+            with profiler.section("cena", gpu=True):
+                draw_scene(meteor_field, skybox_texture_id, cam, alpha) 
             
-            if title_fade_timer < TITLE_STILL_DURATION:
-                alpha = 1.0
-            elif title_fade_timer < TITLE_STILL_DURATION + TITLE_FADE_DURATION:
-                fade_time = title_fade_timer - TITLE_STILL_DURATION
-                alpha = 1.0 - (fade_time / TITLE_FADE_DURATION)
+            title_time = title_fade_timer
+            if title_time < TITLE_STILL_DURATION:
+                alpha_title = 1.0
             else:
-                game_state = "INTRO"
-                title_fade_timer = 0 
-                
-            title_fade_timer += 1
+                fade_time = title_time - TITLE_STILL_DURATION
+                alpha_title = 1.0 - (fade_time / TITLE_FADE_DURATION)
             
-            alpha = max(0.0, min(1.0, alpha))
+            alpha_title = max(0.0, min(1.0, alpha_title))
             
-            outline_color = (255, 210, 0, int(alpha * 255))
+            outline_color = (255, 210, 0, int(alpha_title * 255))
             
-            fill_color = (0, 0, 0, int(alpha * 255)) 
+            fill_color = (0, 0, 0, int(alpha_title * 255)) 
             
             draw_outlined_text(
                 crawl_title, 
@@ -793,97 +641,44 @@ def main():
         
         elif game_state == "INTRO":
             glLoadIdentity()
-            cam.update_view()
-            draw_scene(dropping_objects, skybox_texture_id) 
+            with profiler.section("camera_vista"):
+                cam.update_view()
+            with profiler.section("cena", gpu=True):
+                draw_scene(meteor_field, skybox_texture_id, cam, alpha) 
             
-            intro_finished = draw_star_wars_crawl(font_crawl, display)
-            
-            if intro_finished:
-                game_state = "RUNNING"
-                pygame.mouse.set_visible(False)
-                pygame.event.set_grab(True)
-                pygame.mixer.music.stop() 
+            draw_star_wars_crawl(font_crawl, display, alpha)
             
             draw_centered_text("Pressione ESPAÇO para Pular", font, display, y_offset=300, color=(150, 150, 150, 255))
             
         elif game_state == "RUNNING":
-            if game_timer_ms > 0:
-                game_timer_ms -= delta_time_ms
-                if game_timer_ms < 0:
-                    game_timer_ms = 0
-            
-            if game_timer_ms <= 0:
-                if game_state != "WIN": 
-                    game_state = "WIN"
-                pygame.mouse.set_visible(True)
-                pygame.event.set_grab(False)
-                pygame.mixer.music.stop() 
-                
-            cam.update_movement(keys)
             glLoadIdentity()
-            cam.update_view()
+            with profiler.section("camera_vista"):
+                cam.update_view()
             
-            earth_rotation_angle += EARTH_ROTATION_SPEED
-            if earth_rotation_angle >= 360.0:
-                earth_rotation_angle -= 360.0
-                
-            for obj in list(dropping_objects): 
-                obj.update() 
-                
-                if obj.check_collision(cam.position):
-                    dropping_objects.remove(obj) 
-                    continue 
-                
-                if not obj.active and not obj.has_hit_earth:
-                    score -= 5 
-                    obj.has_hit_earth = True 
-                    
-                if not obj.active and obj.has_hit_earth:
-                    dropping_objects.remove(obj)
-
-
-            object_spawn_timer += 1
-            if object_spawn_timer >= SPAWN_INTERVAL:
-                dropping_objects.append(DroppingObject())
-                object_spawn_timer = 0
-            
-            if score <= 0:
-                game_state = "GAME_OVER"
-                pygame.mouse.set_visible(True)
-                pygame.event.set_grab(False)
-                pygame.mixer.music.stop() 
-                if wilhelm_scream_sound:
-                    wilhelm_scream_sound.play() 
-                
-            draw_scene(dropping_objects, skybox_texture_id)
-
-            draw_lightsaber(cam)
+            with profiler.section("cena", gpu=True):
+                draw_scene(meteor_field, skybox_texture_id, cam, alpha)
 
-            draw_health_bar(score, MAX_HEALTH, display)
+            with profiler.section("sabre", gpu=True):
+                draw_lightsaber(cam)
 
-            draw_stamina_bar(cam.current_stamina, cam.max_stamina, display)
-
-            time_remaining_ms = max(0, game_timer_ms)
-            total_seconds = time_remaining_ms // 1000
-            minutes = total_seconds // 60
-            seconds = total_seconds % 60
-            
-            time_text = f"TEMPO RESTANTE: {minutes:02}:{seconds:02}"
-            
-            text_width, text_height = font.size(time_text)
-            timer_x = display[0] - text_width - 10 
-            timer_y = display[1] - text_height - 10
-            draw_text_2d(time_text, timer_x, timer_y, font)
+            with profiler.section("hud", gpu=True):
+                setup_2d_projection(display)
+                hud.update(session, display)
+                hud.draw()
+                restore_3d_projection()
         
         elif game_state == "GAME_OVER" or game_state == "WIN":
             glLoadIdentity()
-            cam.update_view()
-            draw_scene(dropping_objects, skybox_texture_id)
+            with profiler.section("camera_vista"):
+                cam.update_view()
+            with profiler.section("cena", gpu=True):
+                draw_scene(meteor_field, skybox_texture_id, cam, alpha)
             
             setup_2d_projection(display)
             
+            glstate.disable(GL_TEXTURE_2D)
             glColor4f(0.0, 0.0, 0.0, 0.8) 
-            glBegin(GL_QUADS)
+            glstate.begin(GL_QUADS)
             glVertex2f(0, 0); glVertex2f(display[0], 0); glVertex2f(display[0], display[1]); glVertex2f(0, display[1])
             glEnd()
             
@@ -898,13 +693,26 @@ def main():
                 draw_centered_text(f"Você defendeu a Terra!", font, display, y_offset=10, color=(255, 255, 255, 255))
                 draw_centered_text("Pressione ESC para sair", font, display, y_offset=130, color=(150, 150, 150, 255))
 
-
-        pygame.display.flip()
-        clock.tick(60)
-
-    pygame.mixer.quit()
-        
-    pygame.quit()
+    def release(self):
+        if self.fonts is None:
+            return
+        meteor_renderer.release()
+        hud.release()
+        release_saber_trail()
+        release_skybox()
+        release_star_wars_crawl()
+        asset_loader.shutdown()
+        release_game_textures()
+        self.fonts = None
+
+def main(tick_rate=SIM_TICK_RATE, max_fps=MAX_FRAME_RATE, record=None, replay=None, lockstep=False):
+    scenes.run("game", tick_rate, max_fps, record=record, replay=replay, lockstep=lockstep)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Catch the Meteors, direto na partida.")
+    parser.add_argument("--record", help="grava a entrada de cada partida neste arquivo (.ctmr)")
+    parser.add_argument("--replay", help="reproduz uma gravação no lugar da entrada ao vivo")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="com --replay: uma atualização por quadro, sem limite de fps, e sai no fim")
+    args = parser.parse_args()
+    main(max_fps=0 if args.lockstep else MAX_FRAME_RATE, record=args.record, replay=args.replay, lockstep=args.lockstep)
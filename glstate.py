@@ -0,0 +1,143 @@
+from OpenGL.GL import *
+
+# Último valor enviado ao GL; ausente = desconhecido (sempre envia)
+_capabilities = {}
+_bound_texture = None
+_blend_func = None
+
+
+class FrameCounters:
+    # state_calls: chamadas que passaram pelas funções de estado deste módulo (enable, bind_texture...),
+    # não todas as chamadas GL do quadro (matrizes, buffers e modo imediato ficam de fora); draws conta
+    # todos os desenhos, já que cada glDraw* do jogo passa por begin, call_list ou count_draw
+    __slots__ = ("state_calls", "changes", "draws")
+
+    def __init__(self):
+        self.state_calls = 0
+        self.changes = 0
+        self.draws = 0
+
+    @property
+    def skipped(self):
+        return self.state_calls - self.changes
+
+    def as_dict(self):
+        return {"state_calls": self.state_calls, "changes": self.changes, "skipped": self.skipped, "draws": self.draws}
+
+
+counters = FrameCounters()
+last_frame = FrameCounters()
+
+
+def enable(capability):
+    counters.state_calls += 1
+    if _capabilities.get(capability) is True:
+        return
+    glEnable(capability)
+    _capabilities[capability] = True
+    counters.changes += 1
+
+def disable(capability):
+    counters.state_calls += 1
+    if _capabilities.get(capability) is False:
+        return
+    glDisable(capability)
+    _capabilities[capability] = False
+    counters.changes += 1
+
+def bind_texture(texture_id):
+    global _bound_texture
+    texture_id = texture_id or 0
+    counters.state_calls += 1
+    if texture_id == _bound_texture:
+        return
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    _bound_texture = texture_id
+    counters.changes += 1
+
+def blend_func(source, destination):
+    global _blend_func
+    counters.state_calls += 1
+    if (source, destination) == _blend_func:
+        return
+    glBlendFunc(source, destination)
+    _blend_func = (source, destination)
+    counters.changes += 1
+
+def delete_textures(texture_ids):
+    # O GL desliga a textura apagada, e o id pode voltar em um glGenTextures seguinte
+    global _bound_texture
+    glDeleteTextures(texture_ids)
+    if _bound_texture in texture_ids:
+        _bound_texture = None
+
+def begin(mode):
+    counters.draws += 1
+    glBegin(mode)
+
+def call_list(display_list, exit_state=None):
+    # exit_state: o capture() feito ao fim da compilação da lista (ver hud.HudWidget); sem ele,
+    # o chamador precisa chamar invalidate() se a lista mexe em estados
+    counters.draws += 1
+    glCallList(display_list)
+    if exit_state is not None:
+        restore(exit_state)
+
+def count_draw(count=1):
+    # Para glDrawArrays/glDrawElements chamados diretamente
+    counters.draws += count
+
+def invalidate():
+    # Depois de qualquer mudança feita por fora (glPopAttrib, display lists com estados,
+    # compilação de listas): a próxima chamada de cada estado volta a ser enviada
+    global _bound_texture, _blend_func
+    _capabilities.clear()
+    _bound_texture = None
+    _blend_func = None
+
+def capture():
+    # O que o cache sabe agora; depois de um invalidate(), só os estados mexidos desde então
+    return dict(_capabilities), _bound_texture, _blend_func
+
+def restore(captured):
+    # Junta ao cache os estados conhecidos de um capture(); os ausentes ficam como estão
+    global _bound_texture, _blend_func
+    capabilities, bound_texture, blend = captured
+    _capabilities.update(capabilities)
+    if bound_texture is not None:
+        _bound_texture = bound_texture
+    if blend is not None:
+        _blend_func = blend
+
+_attrib_stack = []
+
+def push_attrib(mask):
+    # glPushAttrib que guarda o cache junto: pop_attrib devolve os valores que o GL restaura,
+    # sem precisar de invalidate()
+    glPushAttrib(mask)
+    _attrib_stack.append((mask, capture()))
+
+def pop_attrib():
+    global _bound_texture, _blend_func
+    glPopAttrib()
+    mask, (capabilities, bound_texture, blend) = _attrib_stack.pop()
+    if mask & GL_ENABLE_BIT:
+        _capabilities.clear()
+        _capabilities.update(capabilities)
+    if mask & GL_COLOR_BUFFER_BIT:
+        _blend_func = blend
+        if GL_BLEND in capabilities:
+            _capabilities[GL_BLEND] = capabilities[GL_BLEND]
+        else:
+            _capabilities.pop(GL_BLEND, None)
+    if mask & GL_TEXTURE_BIT:
+        _bound_texture = bound_texture
+
+def end_frame():
+    global counters, last_frame
+    last_frame = counters
+    counters = FrameCounters()
+
+def frame_stats():
+    # Contadores do último quadro completo
+    return last_frame.as_dict()
@@ -0,0 +1,267 @@
+import os
+
+# Sem janela nem contexto GL; o mixer do pygame usa um driver de áudio nulo
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import time
+import numpy as np
+from pygame.locals import K_w, K_a, K_s, K_d, K_LSHIFT
+from simulation import GameSimulation, SIM_TICK_RATE
+from batch_simulation import BatchSimulation, BatchTickInput
+from replay import ScriptedKeys, TickInput, apply_tick_input, session_checksum, load_recording
+
+KEY_NAMES = {"w": K_w, "a": K_a, "s": K_s, "d": K_d, "lshift": K_LSHIFT}
+
+
+def idle_policy(seed):
+    idle = TickInput()
+
+    def policy(sim):
+        return idle
+    return policy
+
+def wander_policy(seed):
+    rng = random.Random(seed ^ 0x5EED)
+    state = {"keys": ScriptedKeys(), "hold": 0}
+
+    def policy(sim):
+        if state["hold"] <= 0:
+            state["keys"] = ScriptedKeys({K_w: rng.random() < 0.7, K_a: rng.random() < 0.2,
+                                          K_d: rng.random() < 0.2, K_LSHIFT: rng.random() < 0.3})
+            state["hold"] = rng.randint(10, 90)
+        state["hold"] -= 1
+        return TickInput(state["keys"], rng.uniform(-20.0, 20.0), 0.0, sim.ticks == 0)
+    return policy
+
+def chase_policy(seed):
+    # Persegue o meteoro mais baixo com o sabre ligado
+    def policy(sim):
+        field = sim.field
+        cam = sim.cam
+        if field.count == 0:
+            return TickInput(toggle_saber=sim.ticks == 0)
+
+        target = int(field.y[:field.count].argmin())
+        dx = field.x[target] - cam.position[0]
+        dz = field.z[target] - cam.position[2]
+        distance = math.hypot(dx, dz)
+
+        desired_yaw = math.degrees(math.atan2(dz, dx))
+        delta = (desired_yaw - cam.yaw + 180.0) % 360.0 - 180.0
+        mouse_dx = max(-40.0, min(40.0, delta / cam.sensitivity))
+
+        keys = ScriptedKeys({K_w: distance > 0.5, K_LSHIFT: distance > 6.0})
+        return TickInput(keys, mouse_dx, 0.0, sim.ticks == 0)
+    return policy
+
+POLICIES = {
+    "idle": idle_policy,
+    "wander": wander_policy,
+    "chase": chase_policy,
+}
+
+# As mesmas políticas para a BatchSimulation: uma linha por sessão, mesmos sorteios e mesmas contas
+
+def idle_batch_policy(seeds):
+    idle = BatchTickInput()
+
+    def policy(sim):
+        return idle
+    return policy
+
+def wander_batch_policy(seeds):
+    rngs = [random.Random(seed ^ 0x5EED) for seed in seeds]
+    keys = {key: np.zeros(len(seeds), dtype=bool) for key in (K_w, K_a, K_d, K_LSHIFT)}
+    hold = [0] * len(seeds)
+
+    def policy(sim):
+        mouse_dx = np.empty(sim.rows)
+        for row, session in enumerate(sim.sessions.tolist()):
+            rng = rngs[session]
+            if hold[session] <= 0:
+                for key, chance in ((K_w, 0.7), (K_a, 0.2), (K_d, 0.2), (K_LSHIFT, 0.3)):
+                    keys[key][session] = rng.random() < chance
+                hold[session] = rng.randint(10, 90)
+            hold[session] -= 1
+            mouse_dx[row] = rng.uniform(-20.0, 20.0)
+        return BatchTickInput({key: pressed[sim.sessions] for key, pressed in keys.items()},
+                              mouse_dx, 0.0, sim.ticks == 0)
+    return policy
+
+def chase_batch_policy(seeds):
+    def policy(sim):
+        y = np.where(sim.occupied_slots(), sim.y, np.inf)
+        target = y.argmin(axis=1)
+        everyone = np.arange(sim.rows)
+        dx = sim.x[everyone, target] - sim.cam_x
+        dz = sim.z[everyone, target] - sim.cam_z
+        # hypot e atan2 pelo módulo math, como em chase_policy; o resto é aritmética simples
+        distance = np.array([math.hypot(x, z) for x, z in zip(dx.tolist(), dz.tolist())])
+        desired_yaw = np.array([math.degrees(math.atan2(z, x)) for x, z in zip(dx.tolist(), dz.tolist())])
+
+        delta = (desired_yaw - sim.yaw + 180.0) % 360.0 - 180.0
+        mouse_dx = np.maximum(-40.0, np.minimum(40.0, delta / sim.sensitivity))
+
+        # Sem meteoros: só o sabre no primeiro tick
+        has_target = sim.count > 0
+        keys = {K_w: has_target & (distance > 0.5), K_LSHIFT: has_target & (distance > 6.0)}
+        return BatchTickInput(keys, np.where(has_target, mouse_dx, 0.0), 0.0, sim.ticks == 0)
+    return policy
+
+BATCH_POLICIES = {
+    "idle": idle_batch_policy,
+    "wander": wander_batch_policy,
+    "chase": chase_batch_policy,
+}
+
+
+def load_input_script(path):
+    # JSON: {"ticks": [{"keys": ["w", "lshift"], "mouse": [dx, dy], "saber": true}, ...]}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    inputs = []
+    for entry in data["ticks"]:
+        keys = ScriptedKeys({KEY_NAMES[name]: True for name in entry.get("keys", [])})
+        mouse_dx, mouse_dy = entry.get("mouse", (0.0, 0.0))
+        inputs.append(TickInput(keys, mouse_dx, mouse_dy, entry.get("saber", False)))
+    return inputs
+
+def scripted_policy(inputs):
+    idle = TickInput()
+
+    def policy(sim):
+        return inputs[sim.ticks] if sim.ticks < len(inputs) else idle
+    return policy
+
+
+def run_session(seed, policy, tick_rate=SIM_TICK_RATE, max_ticks=None):
+    # max_ticks: gravações de partidas abandonadas no meio terminam antes do fim do jogo
+    sim = GameSimulation(tick_rate, seed)
+
+    while not sim.finished and (max_ticks is None or sim.ticks < max_ticks):
+        tick_input = policy(sim)
+        apply_tick_input(sim, tick_input)
+        sim.tick(tick_input.keys)
+
+    result = sim.result()
+    result["checksum"] = session_checksum(sim)
+    return result
+
+def _run_job(job):
+    seed, policy_name, input_path, tick_rate = job
+    if input_path:
+        policy = scripted_policy(load_input_script(input_path))
+    else:
+        policy = POLICIES[policy_name](seed)
+    return run_session(seed, policy, tick_rate)
+
+def run_batch(seeds, policy_name, tick_rate=SIM_TICK_RATE):
+    sim = BatchSimulation(seeds, tick_rate)
+    policy = BATCH_POLICIES[policy_name](seeds)
+
+    while not sim.finished:
+        tick_input = policy(sim)
+        sim.apply_input(tick_input)
+        sim.tick(tick_input.keys)
+    return sim.results
+
+def _run_batch_job(job):
+    seeds, policy_name, tick_rate = job
+    return run_batch(seeds, policy_name, tick_rate)
+
+def replay_session(path):
+    recording = load_recording(path)
+    result = run_session(recording.seed, scripted_policy(recording.inputs), recording.tick_rate,
+                         max_ticks=len(recording.inputs))
+    result["exact"] = result["checksum"] == recording.checksum and result["ticks"] == len(recording.inputs)
+    return result
+
+def summarize(results, elapsed):
+    count = len(results)
+    wins = sum(1 for r in results if r["outcome"] == "WIN")
+    mean = lambda key: sum(r[key] for r in results) / count
+
+    return {
+        "sessions": count,
+        "wins": wins,
+        "game_overs": count - wins,
+        "mean_score": mean("score"),
+        "mean_interceptions": mean("interceptions"),
+        "mean_impacts": mean("impacts"),
+        "elapsed_seconds": elapsed,
+        "sessions_per_minute": count / elapsed * 60.0 if elapsed > 0 else float("inf"),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula partidas sem janela, o mais rápido possível.")
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira sessão; as demais usam seed+1, seed+2...")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="chase")
+    parser.add_argument("--input", help="roteiro de entradas por tick (JSON) no lugar da política")
+    parser.add_argument("--replay", help="reproduz uma gravação de partida (game.py --record); ignora seed e tick-rate")
+    parser.add_argument("--tick-rate", type=int, default=SIM_TICK_RATE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=256,
+                        help="sessões simuladas juntas em arrays (BatchSimulation); 1 roda uma GameSimulation por sessão")
+    parser.add_argument("--json", help="grava os resultados de cada sessão neste arquivo")
+    args = parser.parse_args()
+
+    jobs = [(args.seed + i, args.policy, args.input, args.tick_rate) for i in range(args.sessions)]
+
+    start = time.perf_counter()
+    if args.replay:
+        results = [replay_session(args.replay) for _ in range(args.sessions)]
+    elif not args.input and args.batch > 1:
+        seeds = [args.seed + i for i in range(args.sessions)]
+        # Lotes menores quando sobram workers: cada lote roda inteiro num processo
+        size = min(args.batch, max(1, math.ceil(len(seeds) / max(1, args.workers))))
+        batches = [(seeds[i:i + size], args.policy, args.tick_rate) for i in range(0, len(seeds), size)]
+        if args.workers > 1 and len(batches) > 1:
+            pool = multiprocessing.Pool(min(args.workers, len(batches)))
+            try:
+                done = pool.map(_run_batch_job, batches)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            done = [_run_batch_job(batch) for batch in batches]
+        results = sorted((r for batch in done for r in batch), key=lambda r: r["seed"])
+    elif args.workers > 1 and len(jobs) > 1:
+        # close/join em vez do terminate() do `with`: o pygame trata o SIGTERM nos workers
+        pool = multiprocessing.Pool(args.workers)
+        try:
+            results = pool.map(_run_job, jobs, chunksize=max(1, len(jobs) // (args.workers * 4)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_run_job(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed)
+
+    if args.sessions == 1:
+        r = results[0]
+        print(f"Resultado: {r['outcome']} | pontuação {r['score']} | interceptações {r['interceptions']} | impactos {r['impacts']}")
+    if args.replay:
+        if all(r["exact"] for r in results):
+            print(f"Replay exato: {results[0]['ticks']} ticks, estado final idêntico ao da gravação.")
+        else:
+            print("AVISO: o replay divergiu da gravação.")
+    print(f"{summary['sessions']} sessões em {elapsed:.2f}s ({summary['sessions_per_minute']:.0f}/min) | "
+          f"vitórias {summary['wins']} | derrotas {summary['game_overs']} | "
+          f"pontuação média {summary['mean_score']:.1f} | interceptações médias {summary['mean_interceptions']:.1f} | "
+          f"impactos médios {summary['mean_impacts']:.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
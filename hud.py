@@ -0,0 +1,333 @@
+import time
+from OpenGL.GL import *
+import glstate
+from text_renderer import load_font, get_text_layout
+from simulation import MAX_HEALTH
+
+HEALTH_BAR_WIDTH = 1000
+HEALTH_BAR_HEIGHT = 20
+HEALTH_BAR_PADDING_TOP = 30
+HEALTH_LABEL = "TERRA"
+
+STAMINA_BAR_WIDTH = 200
+STAMINA_BAR_HEIGHT = 15
+STAMINA_BAR_PADDING = 30
+
+TIMER_MARGIN = 10
+
+DEBUG_OVERLAY_MARGIN = 10
+# O texto muda no máximo 4 vezes por segundo: legível e sem um layout novo por quadro
+DEBUG_OVERLAY_INTERVAL = 0.25
+
+WHITE = (255, 255, 255, 255)
+
+
+def _draw_rect(x, y, w, h):
+    # Sem textura: o texto desenhado antes deixa a do atlas ligada
+    glstate.disable(GL_TEXTURE_2D)
+    glBegin(GL_QUADS)
+    glVertex2f(x, y)
+    glVertex2f(x + w, y)
+    glVertex2f(x + w, y + h)
+    glVertex2f(x, y + h)
+    glEnd()
+
+def _draw_frame(x, y, w, h):
+    glstate.disable(GL_TEXTURE_2D)
+    glColor4f(1.0, 1.0, 1.0, 1.0)
+    glLineWidth(2.0)
+    glBegin(GL_LINE_LOOP)
+    glVertex2f(x, y)
+    glVertex2f(x + w, y)
+    glVertex2f(x + w, y + h)
+    glVertex2f(x, y + h)
+    glEnd()
+
+
+class HudWidget:
+    # Display list recompilada apenas quando o valor ligado (a chave) muda
+    def __init__(self):
+        self.display_list = None
+        self.key = None
+        self.rebuilds = 0
+        # Estados que a lista deixa ao terminar, para o cache do glstate continuar valendo depois dela
+        self.exit_state = None
+
+    def sync(self, key, *args):
+        if key == self.key:
+            return
+        self.key = key
+        self.rebuilds += 1
+
+        self.prepare(*args)
+        if self.display_list is None:
+            self.display_list = glGenLists(1)
+        # Na compilação nada é executado: a lista grava todos os estados que usa,
+        # e o cache do glstate não pode confiar no que "viu" durante a gravação
+        glstate.invalidate()
+        glNewList(self.display_list, GL_COMPILE)
+        self.build(*args)
+        glEndList()
+        self.exit_state = glstate.capture()
+        glstate.invalidate()
+
+    # Ganchos das subclasses: prepare roda antes da gravação (ex.: montar texturas de texto),
+    # build grava os comandos na lista
+    def prepare(self, *args):
+        pass
+
+    def build(self, *args):
+        pass
+
+    def draw(self):
+        if self.display_list is not None:
+            glstate.call_list(self.display_list, self.exit_state)
+
+    def release(self):
+        if self.display_list is not None:
+            glDeleteLists(self.display_list, 1)
+        self.display_list = None
+        self.key = None
+        self.exit_state = None
+
+
+class HealthBar(HudWidget):
+    def __init__(self, font):
+        super().__init__()
+        self.font = font
+
+    def update(self, current, max_health, display_size):
+        self.sync((current, max_health, display_size, get_text_layout(self.font, HEALTH_LABEL).atlas_height),
+                  current, max_health, display_size)
+
+    def prepare(self, current, max_health, display_size):
+        get_text_layout(self.font, HEALTH_LABEL).prepare(WHITE)
+
+    def build(self, current, max_health, display_size):
+        width, height = display_size
+        bar_x = (width - HEALTH_BAR_WIDTH) // 2
+        bar_y = height - HEALTH_BAR_PADDING_TOP - HEALTH_BAR_HEIGHT
+
+        glColor4f(0.2, 0.2, 0.2, 0.8)
+        _draw_rect(bar_x, bar_y, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT)
+
+        health_ratio = current / max_health
+        if health_ratio > 0:
+            if health_ratio >= 0.5:
+                r = (1.0 - health_ratio) * 2.0
+                g = 1.0
+            else:
+                r = 1.0
+                g = health_ratio * 2.0
+            glColor4f(r, g, 0.0, 0.9)
+            _draw_rect(bar_x, bar_y, HEALTH_BAR_WIDTH * health_ratio, HEALTH_BAR_HEIGHT)
+
+        _draw_frame(bar_x, bar_y, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT)
+
+        label = get_text_layout(self.font, HEALTH_LABEL)
+        text_x = bar_x + (HEALTH_BAR_WIDTH - label.width) // 2
+        text_y = bar_y - label.height - 5
+        label.draw(text_x, text_y, WHITE)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+
+
+class StaminaBar(HudWidget):
+    def update(self, current, max_stamina, display_size):
+        # A estamina muda a cada atualização; só vale recompilar quando a barra muda de pixel
+        fill_width = round(STAMINA_BAR_WIDTH * current / max_stamina)
+        self.sync((fill_width, display_size), fill_width / STAMINA_BAR_WIDTH)
+
+    def build(self, stamina_ratio):
+        bar_x = STAMINA_BAR_PADDING
+        bar_y = STAMINA_BAR_PADDING
+
+        glColor4f(0.2, 0.2, 0.2, 0.8)
+        _draw_rect(bar_x, bar_y, STAMINA_BAR_WIDTH, STAMINA_BAR_HEIGHT)
+
+        if stamina_ratio > 0:
+            r = 1.0 if stamina_ratio < 0.5 else 1.0 - (stamina_ratio - 0.5) * 2.0
+            g = 1.0 if stamina_ratio > 0.5 else stamina_ratio * 2.0
+            glColor4f(r, g, 0.0, 0.9)
+            _draw_rect(bar_x, bar_y, STAMINA_BAR_WIDTH * stamina_ratio, STAMINA_BAR_HEIGHT)
+
+        _draw_frame(bar_x, bar_y, STAMINA_BAR_WIDTH, STAMINA_BAR_HEIGHT)
+
+
+class TimerText(HudWidget):
+    def __init__(self, font):
+        super().__init__()
+        self.font = font
+
+    def update(self, time_remaining_ms, display_size):
+        # O texto só muda uma vez por segundo
+        total_seconds = max(0, int(time_remaining_ms)) // 1000
+        minutes = total_seconds // 60
+        seconds = total_seconds % 60
+        layout = get_text_layout(self.font, f"TEMPO RESTANTE: {minutes:02}:{seconds:02}")
+        self.sync((layout.text, display_size, layout.atlas_height), layout, display_size)
+
+    def prepare(self, layout, display_size):
+        layout.prepare(WHITE)
+
+    def build(self, layout, display_size):
+        layout.draw(display_size[0] - layout.width - TIMER_MARGIN, TIMER_MARGIN, WHITE)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+
+
+class Hud:
+    def __init__(self):
+        self.font = load_font(36)
+        self.label_font = load_font(24)
+
+        self.health_bar = HealthBar(self.label_font)
+        self.stamina_bar = StaminaBar()
+        self.timer = TimerText(self.font)
+        self.widgets = (self.health_bar, self.stamina_bar, self.timer)
+
+    def update(self, session, display_size):
+        cam = session.cam
+        self.health_bar.update(session.score, MAX_HEALTH, display_size)
+        self.stamina_bar.update(cam.current_stamina, cam.max_stamina, display_size)
+        self.timer.update(session.game_timer_ms, display_size)
+
+    def draw(self):
+        # Espera a projeção 2D já montada (setup_2d_projection)
+        for widget in self.widgets:
+            widget.draw()
+
+    @property
+    def rebuilds(self):
+        return sum(widget.rebuilds for widget in self.widgets)
+
+    def release(self):
+        for widget in self.widgets:
+            widget.release()
+
+
+class TextOverlay:
+    # Texto de depuração por cima de qualquer cena, ligado por uma tecla; cada subclasse monta
+    # self.lines no seu update, com a assinatura que a fonte dos dados pede
+    color = (255, 255, 255, 255)
+    # Colunas fixas de row(): rótulo e depois os valores
+    label_width = 170
+    column_width = 70
+
+    def __init__(self):
+        self.font = load_font(20)
+        self.enabled = False
+        # Linhas de células (x relativo, texto); números e rótulos em layouts separados,
+        # assim só os números geram layouts novos a cada atualização
+        self.lines = []
+        self.updated = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.updated = 0.0
+
+    def due(self):
+        now = time.perf_counter()
+        if now - self.updated < DEBUG_OVERLAY_INTERVAL:
+            return False
+        self.updated = now
+        return True
+
+    def flow(self, parts):
+        # Uma linha com os textos colados um depois do outro
+        cells = []
+        x = 0
+        for text in parts:
+            cells.append((x, text))
+            x += get_text_layout(self.font, text, 1).width
+        return cells
+
+    def row(self, label, values):
+        # Uma linha de tabela: rótulo e valores em colunas fixas
+        cells = [(0, label)]
+        for i, value in enumerate(values):
+            cells.append((self.label_width + i * self.column_width, value))
+        return cells
+
+    def origin(self, display_size, line_height):
+        return DEBUG_OVERLAY_MARGIN, DEBUG_OVERLAY_MARGIN
+
+    def draw(self, display_size):
+        if not self.lines:
+            return
+        width, height = display_size
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, width, 0, height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        # Não sabe o que a cena deixou ligado: guarda tudo e devolve intacto
+        glstate.push_attrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT)
+        glstate.disable(GL_DEPTH_TEST)
+        glstate.disable(GL_LIGHTING)
+        glstate.enable(GL_BLEND)
+        glstate.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        line_height = self.font.get_linesize()
+        x, y = self.origin(display_size, line_height)
+        # A primeira linha fica em cima
+        y += (len(self.lines) - 1) * line_height
+        for cells in self.lines:
+            for offset, text in cells:
+                if text:
+                    get_text_layout(self.font, text, 1).draw(x + offset, y, self.color, (0, 0, 0, 255))
+            y -= line_height
+
+        glstate.pop_attrib()
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+
+class DebugOverlay(TextOverlay):
+    # Contadores do glstate (F3)
+    color = (255, 255, 0, 255)
+
+    # Rótulos fixos intercalados com os números (chaves de stats, ou "fps")
+    template = ("glstate: ", "state_calls", " chamadas de estado | ", "changes", " mudanças | ", "skipped", " evitadas | ",
+                "draws", " desenhos | ", "fps", " fps")
+
+    def update(self, stats, fps):
+        if not self.due():
+            return
+        parts = [part if i % 2 == 0 else (f"{fps:.0f}" if part == "fps" else str(stats[part]))
+                 for i, part in enumerate(self.template)]
+        self.lines = [self.flow(parts)]
+
+    def origin(self, display_size, line_height):
+        # Logo acima da barra de estamina, longe da barra da Terra e do tempo
+        return STAMINA_BAR_PADDING, STAMINA_BAR_PADDING + STAMINA_BAR_HEIGHT + DEBUG_OVERLAY_MARGIN
+
+
+class ProfilerOverlay(TextOverlay):
+    # Tempos por seção do profiler (F4): média e percentis dos últimos quadros
+    color = (120, 255, 255, 255)
+
+    def update(self, summary):
+        if not self.due():
+            return
+        self.lines = [self.row(f"ms ({summary['frames']} quadros)", ("média", "p50", "p95", "p99", "gpu"))]
+        for name, entry in summary["sections"].items():
+            cpu = entry["cpu_ms"]
+            if cpu is None:
+                continue
+            gpu = entry.get("gpu_ms")
+            values = [f"{cpu[key]:.2f}" for key in ("mean", "p50", "p95", "p99")]
+            values.append(f"{gpu['mean']:.2f}" if gpu else "")
+            self.lines.append(self.row(name, values))
+        for name, stats in summary["counters"].items():
+            if stats is not None:
+                self.lines.append(self.row(name, (f"{stats['mean']:.0f}",)))
+
+    def origin(self, display_size, line_height):
+        # Abaixo da barra da Terra e do rótulo dela
+        top = HEALTH_BAR_PADDING_TOP + HEALTH_BAR_HEIGHT + 40
+        return DEBUG_OVERLAY_MARGIN, display_size[1] - top - line_height * len(self.lines)
@@ -1,20 +1,24 @@
+import ctypes
 import math
 import time
-import pygame
+import numpy as np
 from OpenGL.GL import *
 from OpenGL.GLU import *
+import glstate
+from meshes import get_box_mesh, get_cylinder_mesh
+from audio import load_sound, play as play_sound_effect, PRIORITY_NORMAL
 
-pygame.mixer.init()
+SABER_ON_SOUND_PATH = "sounds/saber_on.mp3"
+SABER_OFF_SOUND_PATH = "sounds/saber_off.mp3"
 
-sound_on = pygame.mixer.Sound("sounds/saber_on.mp3")
-sound_off = pygame.mixer.Sound("sounds/saber_off.mp3")
+# Carregados pelo AssetLoader (load_saber_sounds); até lá o sabre liga em silêncio
+sound_on = None
+sound_off = None
 
 SABER_ON = False
 blade_progress = 0.0
 BLADE_GROW_SPEED = 2.0
 
-_last_time = time.time()
-
 HILT_LENGTH = 0.3
 HILT_RADIUS = 0.06
 BLADE_LENGTH = 2.0
@@ -24,36 +28,103 @@ CYL_SEGMENTS = 32
 
 BLADE_COLOR = (0.0, 0.8, 1.0)
 
-def draw_cylinder(length, radius, segments):
-    glBegin(GL_QUAD_STRIP)
-    for i in range(segments + 1):
-        t = i / segments
-        ang = t * 2 * math.pi
-        x = math.cos(ang) * radius
-        z = math.sin(ang) * radius
-        glVertex3f(x, 0.0, z)
-        glVertex3f(x, length, z)
-    glEnd()
+HAND_OFFSET = (0.35, -0.5, -1.0)
+HAND_YAW = 30.0
+BLADE_HIT_RADIUS = GLOW_RADIUS
+
+# Rastro do golpe: posições base/ponta dos últimos ticks (0,2 s a 60 ticks/s)
+TRAIL_TICKS = 12
+TRAIL_ALPHA = 0.35
+
+_previous_blade = None
+
+
+class SaberTrail:
+    # Anel de tamanho fixo com base e ponta da lâmina, escrito uma vez por tick. No desenho,
+    # o anel vira uma fita (do mais antigo ao mais novo) numa
+    # área de trabalho também fixa, enviada com um único glBufferSubData. A cor de cada par depende
+    # só da posição na fita, então fica num trecho estático do mesmo VBO. Nada é alocado por quadro
+    def __init__(self, length=TRAIL_TICKS):
+        self.length = length
+        self.ring = np.zeros((length, 2, 3), dtype=np.float32)
+        self.head = 0
+        self.count = 0
+        self.strip = np.zeros((length, 2, 3), dtype=np.float32)
+
+        r, g, b = BLADE_COLOR
+        self.colors = np.empty((length, 2, 4), dtype=np.float32)
+        self.colors[..., 0] = r
+        self.colors[..., 1] = g
+        self.colors[..., 2] = b
+        self.colors[..., 3] = (TRAIL_ALPHA * np.arange(length) / (length - 1))[:, None]
+        self.vbo = None
+
+    def push(self, base, tip):
+        self.ring[self.head, 0] = base
+        self.ring[self.head, 1] = tip
+        self.head = (self.head + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+
+    def clear(self):
+        self.count = 0
+
+    def _upload_colors(self):
+        self.vbo = int(glGenBuffers(1))
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.strip.nbytes + self.colors.nbytes, None, GL_DYNAMIC_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, self.strip.nbytes, self.colors.nbytes, self.colors)
+
+    def draw(self, base, tip):
+        if self.count < 2:
+            return
+        n = self.length
+        h = self.head
+        # Do mais antigo ao mais novo; os `count` válidos ficam no fim. O último tick fica à frente
+        # da câmera interpolada, então o par mais novo dá lugar à lâmina desenhada neste quadro
+        self.strip[:n - h] = self.ring[h:]
+        self.strip[n - h:] = self.ring[:h]
+        self.strip[n - 1, 0] = base
+        self.strip[n - 1, 1] = tip
+
+        start = n - self.count
+        pair_bytes = self.strip.itemsize * 6
+        if self.vbo is None:
+            self._upload_colors()
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, start * pair_bytes, self.count * pair_bytes, self.strip[start:])
+
+        glstate.enable(GL_BLEND)
+        glstate.blend_func(GL_SRC_ALPHA, GL_ONE)
+        glDepthMask(GL_FALSE)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+        glColorPointer(4, GL_FLOAT, 0, ctypes.c_void_p(self.strip.nbytes))
+        glDrawArrays(GL_TRIANGLE_STRIP, start * 2, self.count * 2)
+        glstate.count_draw()
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        glDepthMask(GL_TRUE)
+        glstate.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glstate.disable(GL_BLEND)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+        self.vbo = None
+
+
+_trail = SaberTrail()
 
 def draw_hilt():
     glPushMatrix()
     glColor3f(0.1, 0.1, 0.1)
     glScalef(HILT_RADIUS, HILT_LENGTH, HILT_RADIUS)
-
-    faces = [
-        [(-0.5, -0.5,  0.5), ( 0.5, -0.5,  0.5), ( 0.5,  0.5,  0.5), (-0.5,  0.5,  0.5)],
-        [(-0.5, -0.5, -0.5), ( 0.5, -0.5, -0.5), ( 0.5,  0.5, -0.5), (-0.5,  0.5, -0.5)],
-        [(-0.5, -0.5, -0.5), (-0.5, -0.5,  0.5), (-0.5,  0.5,  0.5), (-0.5,  0.5, -0.5)],
-        [( 0.5, -0.5, -0.5), ( 0.5, -0.5,  0.5), ( 0.5,  0.5,  0.5), ( 0.5,  0.5, -0.5)],
-        [(-0.5,  0.5,  0.5), ( 0.5,  0.5,  0.5), ( 0.5,  0.5, -0.5), (-0.5,  0.5, -0.5)],
-        [(-0.5, -0.5,  0.5), ( 0.5, -0.5,  0.5), ( 0.5, -0.5, -0.5), (-0.5, -0.5, -0.5)]
-    ]
-
-    glBegin(GL_QUADS)
-    for face in faces:
-        for v in face:
-            glVertex3f(*v)
-    glEnd()
+    get_box_mesh().draw()
     glPopMatrix()
 
 def get_pulse_factor():
@@ -72,23 +143,29 @@ def draw_blade():
     glow_alpha = 0.10 + 0.10 * pulse
     core_alpha = 0.75 + 0.20 * pulse
 
-    glDisable(GL_DEPTH_TEST)
+    # Um cilindro unitário para as duas camadas: raio e comprimento pela escala, pulso pela cor
+    cylinder = get_cylinder_mesh(CYL_SEGMENTS)
+    glstate.disable(GL_DEPTH_TEST)
+    cylinder.bind()
 
+    glPushMatrix()
+    glScalef(glow_radius, current_length, glow_radius)
     glColor4f(r, g, b, glow_alpha)
-    draw_cylinder(current_length, glow_radius, CYL_SEGMENTS)
+    cylinder.draw_bound()
+    glPopMatrix()
 
+    glPushMatrix()
+    glScalef(BLADE_RADIUS, current_length, BLADE_RADIUS)
     glColor4f(r*1.4, g*1.4, b*1.4, core_alpha)
-    draw_cylinder(current_length, BLADE_RADIUS, CYL_SEGMENTS)
-
-    glEnable(GL_DEPTH_TEST)
+    cylinder.draw_bound()
+    glPopMatrix()
 
+    cylinder.unbind()
+    glstate.enable(GL_DEPTH_TEST)
 
-def _update_saber_internal():
-    global blade_progress, _last_time
 
-    now = time.time()
-    dt = now - _last_time
-    _last_time = now
+def update_saber(dt):
+    global blade_progress
 
     if SABER_ON:
         blade_progress += dt * BLADE_GROW_SPEED
@@ -98,16 +175,22 @@ def _update_saber_internal():
         blade_progress = max(blade_progress, 0.0)
 
 def draw_lightsaber(cam):
-    _update_saber_internal()
+    glstate.disable(GL_TEXTURE_2D)
+    # O rastro está no espaço do mundo: desenhado antes das transformações da mão
+    if _trail.count > 1:
+        current = get_blade_capsule(cam, cam.render_position)
+        if current is not None:
+            _trail.draw(*current)
 
     glPushMatrix()
 
-    glTranslatef(*cam.position)
-    glRotatef(-cam.yaw - 90, 0, 1, 0)
-    glRotatef(cam.pitch, 1, 0, 0)
+    position = cam.render_position
+    glTranslatef(position.x, position.y, position.z)
+    # Ry(-yaw - 90) * Rx(pitch), já montada na base em cache da câmera
+    glMultMatrixf(cam.basis().orientation.values)
 
-    glTranslatef(0.35, -0.5, -1.0)
-    glRotatef(30.0, 0, 1, 0)
+    glTranslatef(*HAND_OFFSET)
+    glRotatef(HAND_YAW, 0, 1, 0)
 
     draw_hilt()
 
@@ -117,12 +200,71 @@ def draw_lightsaber(cam):
 
     glPopMatrix()
 
-def toggle_saber():
+def get_blade_capsule(cam, position=None):
+    if blade_progress <= 0.001:
+        return None
+
+    # Mesma rotação de draw_lightsaber. A lâmina sai do topo do cabo ao longo do eixo Y local,
+    # que a rotação HAND_YAW preserva: no mundo, é o "up" da câmera
+    basis = cam.basis()
+    hx, hy, hz = HAND_OFFSET
+    bx, by, bz = basis.orientation.transform_vector(hx, hy + HILT_LENGTH * 0.5, hz)
+    direction = basis.up
+    dx, dy, dz = direction.x, direction.y, direction.z
+
+    length = BLADE_LENGTH * blade_progress
+    if position is None:
+        position = cam.position
+    px, py, pz = position.x, position.y, position.z
+
+    base = (px + bx, py + by, pz + bz)
+    tip = (base[0] + dx * length, base[1] + dy * length, base[2] + dz * length)
+    return base, tip
+
+def update_blade_sweep(cam):
+    global _previous_blade
+
+    current = get_blade_capsule(cam)
+    if current is None:
+        _previous_blade = None
+        _trail.clear()
+        return None
+
+    _trail.push(*current)
+    previous = _previous_blade if _previous_blade is not None else current
+    _previous_blade = current
+    return previous[0], previous[1], current[0], current[1]
+
+def reset_saber():
+    global SABER_ON, blade_progress, _previous_blade
+
+    SABER_ON = False
+    blade_progress = 0.0
+    _previous_blade = None
+    _trail.clear()
+
+def release_saber_trail():
+    # Antes de destruir o contexto GL
+    _trail.release()
+
+def load_saber_sounds(loader):
+    def set_sound_on(sound):
+        global sound_on
+        sound_on = sound
+
+    def set_sound_off(sound):
+        global sound_off
+        sound_off = sound
+
+    loader.submit(load_sound, SABER_ON_SOUND_PATH, set_sound_on)
+    loader.submit(load_sound, SABER_OFF_SOUND_PATH, set_sound_off)
+
+def toggle_saber(play_sound=True):
     global SABER_ON
 
     SABER_ON = not SABER_ON
 
-    if SABER_ON:
-        sound_on.play()
-    else:
-        sound_off.play()
+    if not play_sound:
+        return
+
+    play_sound_effect(sound_on if SABER_ON else sound_off, PRIORITY_NORMAL)
@@ -1,10 +1,14 @@
+import math
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import sys
-import os
+import glstate
 import random
+from meshes import draw_sphere, LODSphere, GLOBE_LOD, set_lod_projection
+from assets import acquire_texture, release_texture
+import scenes
+from scenes import Scene, DISPLAY_SIZE
 
 try:
     import numpy as np
@@ -12,14 +16,6 @@ except ImportError:
     print("AVISO: O pacote 'numpy' não foi encontrado. O PyOpenGL pode ter problemas.")
     np = None
 
-try:
-    from game import main as run_game_main
-except ImportError:
-    print("AVISO: O arquivo 'game.py' (com a função main) não foi encontrado.")
-    print("O menu será exibido, mas a opção 'INICIAR JOGO' não funcionará.")
-    run_game_main = None
-
-DISPLAY_SIZE = (1280, 720)
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -32,56 +28,34 @@ stars_texture = None
 meteor_texture = None 
 meteors = [] 
 METEOR_COLOR = (0.8, 0.4, 0.1) 
+GLOBE_POSITION = (-0.2, -0.2, -5.0)
+globe_sphere = LODSphere(GLOBE_LOD)
 
 def init_gl():
     glClearColor(0.0, 0.0, 0.0, 0.0) 
-    glEnable(GL_DEPTH_TEST) 
-    glEnable(GL_LIGHTING) 
-    glEnable(GL_LIGHT0) 
+    glstate.enable(GL_DEPTH_TEST) 
+    glstate.enable(GL_LIGHTING) 
+    glstate.enable(GL_LIGHT0) 
+    glstate.enable(GL_NORMALIZE) 
     glLightfv(GL_LIGHT0, GL_POSITION, (1, 1, 1, 0)) 
     glLightfv(GL_LIGHT0, GL_AMBIENT, (0.2, 0.2, 0.2, 1))
     glLightfv(GL_LIGHT0, GL_DIFFUSE, (0.8, 0.8, 0.8, 1))
     
-    glEnable(GL_TEXTURE_2D)
+    glstate.enable(GL_TEXTURE_2D)
     
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
     gluPerspective(45, (DISPLAY_SIZE[0] / DISPLAY_SIZE[1]), 0.1, 100.0) 
+    set_lod_projection(45, DISPLAY_SIZE[1])
     
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
     
-def load_texture(filename):
-    global np
-    try:
-        filepath = os.path.join(os.path.dirname(__file__), "textures", filename)
-        
-        image = pygame.image.load(filepath).convert_alpha()
-        image = pygame.transform.flip(image, False, True) 
-        
-        texture_data = pygame.image.tostring(image, "RGBA", 1) 
-        width, height = image.get_size()
-        
-        texture_id = glGenTextures(1)
-        
-        if np is not None and isinstance(texture_id, (list, tuple, np.ndarray)):
-            texture_id = int(texture_id[0])
-        else:
-            texture_id = int(texture_id)
-            
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        
-        print(f"Textura '{filename}' carregada com sucesso.")
-        return texture_id
-    except pygame.error as e:
-        print(f"AVISO: Não foi possível carregar a textura '{filename}': {e}")
-        return None
-    except FileNotFoundError:
-        print(f"AVISO: O arquivo de textura '{filename}' não foi encontrado em '{filepath}'.")
-        return None
+def release_menu_textures():
+    global globe_texture, stars_texture, meteor_texture
+    for texture_id in (globe_texture, stars_texture, meteor_texture):
+        release_texture(texture_id)
+    globe_texture = stars_texture = meteor_texture = None
 
 def generate_meteor():
     x = random.uniform(-15.0, 15.0)
@@ -103,74 +77,63 @@ def draw_scene(globe_texture_id, stars_texture_id, angle, meteors):
         glLoadIdentity()
         glTranslatef(0.0, 0.0, -15.0) 
         
-        glBindTexture(GL_TEXTURE_2D, stars_texture_id)
-        glDisable(GL_LIGHTING)
+        glstate.bind_texture(stars_texture_id)
+        glstate.disable(GL_LIGHTING)
         glColor3f(1.0, 1.0, 1.0) 
-        glDisable(GL_DEPTH_TEST) 
+        glstate.disable(GL_DEPTH_TEST) 
         
-        glBegin(GL_QUADS)
+        glstate.begin(GL_QUADS)
         glTexCoord2f(0.0, 0.0); glVertex3f(-10.0, -10.0, 0.0) 
         glTexCoord2f(1.0, 0.0); glVertex3f( 10.0, -10.0, 0.0) 
         glTexCoord2f(1.0, 1.0); glVertex3f( 10.0,  10.0, 0.0) 
         glTexCoord2f(0.0, 1.0); glVertex3f(-10.0,  10.0, 0.0) 
         glEnd()
         
-        glEnable(GL_DEPTH_TEST) 
-        glEnable(GL_LIGHTING)
+        glstate.enable(GL_DEPTH_TEST) 
+        glstate.enable(GL_LIGHTING)
     
     glLoadIdentity()
     
-    glTranslatef(-0.2, -0.2, -5.0) 
+    glTranslatef(*GLOBE_POSITION) 
     
     glRotatef(angle, 0, 1, 0) 
     
     if globe_texture_id:
-        glBindTexture(GL_TEXTURE_2D, globe_texture_id)
-        glEnable(GL_COLOR_MATERIAL) 
+        glstate.bind_texture(globe_texture_id)
+        glstate.enable(GL_COLOR_MATERIAL) 
         glColor3f(1.0, 1.0, 1.0)
     else:
-        glDisable(GL_TEXTURE_2D)
+        glstate.disable(GL_TEXTURE_2D)
         glColor3f(0.1, 0.2, 0.9)
         
-    quadric_earth = gluNewQuadric()
-    gluQuadricNormals(quadric_earth, GLU_SMOOTH)
-    gluQuadricTexture(quadric_earth, GL_TRUE) 
-    
-    gluSphere(quadric_earth, 1.0, 32, 32)
-    gluDeleteQuadric(quadric_earth)
+    globe_sphere.draw(1.0, math.hypot(*GLOBE_POSITION))
     
     if globe_texture_id:
-        glDisable(GL_COLOR_MATERIAL)
-        glEnable(GL_TEXTURE_2D) 
+        glstate.disable(GL_COLOR_MATERIAL)
+        glstate.enable(GL_TEXTURE_2D) 
         
     glLoadIdentity() 
     
-    quadric_meteor = gluNewQuadric()
-    gluQuadricNormals(quadric_meteor, GLU_SMOOTH)
-
     if meteor_texture:
-        glEnable(GL_TEXTURE_2D)
-        gluQuadricTexture(quadric_meteor, GL_TRUE)
-        glBindTexture(GL_TEXTURE_2D, meteor_texture)
-        glDisable(GL_LIGHTING) 
+        glstate.enable(GL_TEXTURE_2D)
+        glstate.bind_texture(meteor_texture)
+        glstate.disable(GL_LIGHTING) 
         glColor3f(1.0, 1.0, 1.0) 
     else:
-        glDisable(GL_TEXTURE_2D)
-        glEnable(GL_LIGHTING)
+        glstate.disable(GL_TEXTURE_2D)
+        glstate.enable(GL_LIGHTING)
         glColor3f(*METEOR_COLOR)
     
     for x, y, z, _, size in meteors:
         glPushMatrix()
         glTranslatef(x, y, z)
         
-        gluSphere(quadric_meteor, size, 5, 5) 
+        draw_sphere(size, 5, 5) 
         
         glPopMatrix()
 
-    gluDeleteQuadric(quadric_meteor) 
-
-    glEnable(GL_LIGHTING)
-    glEnable(GL_TEXTURE_2D) 
+    glstate.enable(GL_LIGHTING)
+    glstate.enable(GL_TEXTURE_2D) 
 
 
 def draw_centered_text_2d(screen, font, text, y_offset, color=(255, 255, 255), outline_color=None):
@@ -188,69 +151,181 @@ def draw_centered_text_2d(screen, font, text, y_offset, color=(255, 255, 255), o
             for dy in [-outline_offset, 0, outline_offset]:
                 if dx != 0 or dy != 0:
                     screen.blit(outline_surface, (text_rect.x + dx, text_rect.y + dy))
+        
+        screen.blit(text_surface, text_rect)
+        return text_rect.inflate(2 * outline_offset, 2 * outline_offset)
 
     screen.blit(text_surface, text_rect)
+    return text_rect
 
 
-def menu_main():
+MENU_DIM_ALPHA = 150 / 255.0
+MENU_OPTIONS_Y = 50
+MENU_OPTIONS_SPACING = 70
+
+def draw_menu_options(surface, font, menu_options, selected_option):
+    # Só esta faixa muda com a seleção; devolve o retângulo a reenviar à textura
+    dirty = None
+    for i, option in enumerate(menu_options):
+        color = YELLOW if i == selected_option else GRAY
+        text_rect = font.render(option, True, color).get_rect(center=(
+            DISPLAY_SIZE[0] // 2,
+            DISPLAY_SIZE[1] // 2 + MENU_OPTIONS_Y + i * MENU_OPTIONS_SPACING
+        ))
+        surface.fill((0, 0, 0, 0), text_rect)
+        draw_centered_text_2d(surface, font, option, MENU_OPTIONS_Y + i * MENU_OPTIONS_SPACING, color)
+        dirty = text_rect if dirty is None else dirty.union(text_rect)
+    return dirty
+
+def create_overlay_texture(surface):
+    texture_data = pygame.image.tostring(surface, "RGBA", True) 
+    width, height = surface.get_size()
     
-    global rotation_angle, globe_texture, stars_texture, meteor_texture, np, meteors
+    gl_texture = glGenTextures(1)
     
-    pygame.init()
+    if np is not None and isinstance(gl_texture, (list, tuple, np.ndarray)):
+        gl_texture_id = int(gl_texture[0])
+    else:
+        gl_texture_id = int(gl_texture)
+        
+    glstate.bind_texture(gl_texture_id)
     
-    screen = pygame.display.set_mode(DISPLAY_SIZE, DOUBLEBUF | OPENGL)
-    pygame.display.set_caption("Catch the Meteors - Menu")
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
+    return gl_texture_id
+
+def update_overlay_texture(texture_id, surface, rect):
+    # Envia só o retângulo alterado; a textura tem a origem embaixo (linhas invertidas)
+    rect = rect.clip(surface.get_rect())
+    region_data = pygame.image.tostring(surface.subsurface(rect), "RGBA", True)
     
-    init_gl()
+    glstate.bind_texture(texture_id)
+    glTexSubImage2D(GL_TEXTURE_2D, 0, rect.x, surface.get_height() - rect.bottom, rect.width, rect.height,
+                    GL_RGBA, GL_UNSIGNED_BYTE, region_data)
+
+def draw_overlay(texture_id, size):
+    width, height = size
     
-    globe_texture = load_texture("earth.jpg") 
-    stars_texture = load_texture("stars.jpg") 
-    meteor_texture = load_texture("meteor.jpg")
+    glstate.disable(GL_DEPTH_TEST) 
     
-    meteors = [generate_meteor() for _ in range(10)] 
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    gluOrtho2D(0, width, 0, height) 
     
-    try:
-        pygame.font.init()
-        font_title = pygame.font.Font(None, 120)
-        font_menu = pygame.font.Font(None, 48)
-        font_small = pygame.font.Font(None, 24)
-    except:
-        font_title = pygame.font.SysFont('Arial', 80)
-        font_menu = pygame.font.SysFont('Arial', 48)
-        font_small = pygame.font.SysFont('Arial', 24)
-
-    running = True
-    clock = pygame.time.Clock()
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
     
-    menu_options = ["INICIAR JOGO", "SAIR"] 
-    selected_option = 0
+    glstate.enable(GL_BLEND)
+    glstate.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    glstate.disable(GL_LIGHTING) 
     
-    menu_surface = pygame.Surface(DISPLAY_SIZE, pygame.SRCALPHA)
+    # Escurecimento constante: um quad translúcido em vez de pixels na textura
+    glstate.disable(GL_TEXTURE_2D)
+    glColor4f(0.0, 0.0, 0.0, MENU_DIM_ALPHA)
+    glstate.begin(GL_QUADS)
+    glVertex2f(0, 0)
+    glVertex2f(width, 0)
+    glVertex2f(width, height)
+    glVertex2f(0, height)
+    glEnd()
+    glstate.enable(GL_TEXTURE_2D)
     
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    glstate.bind_texture(texture_id)
+    glColor3f(1.0, 1.0, 1.0)
+    
+    glstate.begin(GL_QUADS)
+    glTexCoord2f(0, 0); glVertex2f(0, 0) 
+    glTexCoord2f(1, 0); glVertex2f(width, 0) 
+    glTexCoord2f(1, 1); glVertex2f(width, height) 
+    glTexCoord2f(0, 1); glVertex2f(0, height) 
+    glEnd()
+
+    glstate.enable(GL_LIGHTING) 
+    glstate.disable(GL_BLEND)
+    
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+    
+    glstate.enable(GL_DEPTH_TEST)
+
+
+class MenuScene(Scene):
+    caption = "Catch the Meteors - Menu"
+    max_fps = 60
+
+    def __init__(self):
+        super().__init__()
+        self.menu_options = ["INICIAR JOGO", "SAIR"] 
+        self.selected_option = 0
+        self.overlay_texture = None
+
+    def load(self):
+        global globe_texture, stars_texture, meteor_texture
+        
+        # Ficam carregadas até o fim do programa: o jogo reaproveita as mesmas texturas
+        globe_texture = acquire_texture("textures/earth.jpg") 
+        # Mesmo modo de borda do skybox do jogo, que compartilha esta textura
+        stars_texture = acquire_texture("textures/stars.jpg", GL_CLAMP_TO_EDGE) 
+        meteor_texture = acquire_texture("textures/meteor.jpg")
+        
+        try:
+            pygame.font.init()
+            font_title = pygame.font.Font(None, 120)
+            font_menu = pygame.font.Font(None, 48)
+            font_small = pygame.font.Font(None, 24)
+        except:
+            font_title = pygame.font.SysFont('Arial', 80)
+            font_menu = pygame.font.SysFont('Arial', 48)
+            font_small = pygame.font.SysFont('Arial', 24)
+        self.font_menu = font_menu
+        
+        # Textos do menu em uma textura persistente; o escurecimento é desenhado à parte
+        self.menu_surface = pygame.Surface(DISPLAY_SIZE, pygame.SRCALPHA)
+        self.menu_surface.fill((0, 0, 0, 0)) 
+        
+        draw_centered_text_2d(self.menu_surface, font_title, "GUERRA NAS ESFERAS", -150, BLACK, outline_color=YELLOW)
+        draw_menu_options(self.menu_surface, font_menu, self.menu_options, self.selected_option)
+        draw_centered_text_2d(self.menu_surface, font_small, 
+                              "Use as setas para navegar e ENTER para selecionar", 
+                              250, GRAY)
+        
+        self.overlay_texture = create_overlay_texture(self.menu_surface)
+        self.overlay_selection = self.selected_option
+
+    def enter(self):
+        global meteors
+        
+        init_gl()
+        if self.overlay_texture is None:
+            self.load()
+        
+        meteors = [generate_meteor() for _ in range(10)] 
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.manager.quit()
             
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
+            if event.key == pygame.K_UP:
+                self.selected_option = (self.selected_option - 1) % len(self.menu_options)
+            if event.key == pygame.K_DOWN:
+                self.selected_option = (self.selected_option + 1) % len(self.menu_options)
                 
-                if event.key == pygame.K_UP:
-                    selected_option = (selected_option - 1) % len(menu_options)
-                if event.key == pygame.K_DOWN:
-                    selected_option = (selected_option + 1) % len(menu_options)
+            if event.key == pygame.K_RETURN:
+                if self.menu_options[self.selected_option] == "INICIAR JOGO":
+                    if "game" in self.manager.scenes:
+                        self.manager.switch("game")
                     
-                if event.key == pygame.K_RETURN:
-                    if menu_options[selected_option] == "INICIAR JOGO":
-                        pygame.quit()
-                        if run_game_main:
-                            run_game_main()
-                        return 
-                        
-                    elif menu_options[selected_option] == "SAIR":
-                        running = False
-                        
+                elif self.menu_options[self.selected_option] == "SAIR":
+                    self.manager.quit()
+
+    def update(self):
+        global rotation_angle, meteors
         
         rotation_angle += 0.25 
         if rotation_angle > 360:
@@ -267,83 +342,26 @@ def menu_main():
         
         if random.random() < 0.1 and len(meteors) < 50: 
             meteors.append(generate_meteor())
-            
-        draw_scene(globe_texture, stars_texture, rotation_angle, meteors) 
-        
-        
-        menu_surface.fill((0, 0, 0, 0)) 
-        s = pygame.Surface(DISPLAY_SIZE, pygame.SRCALPHA)
-        s.fill((0, 0, 0, 150)) 
-        menu_surface.blit(s, (0, 0))
-
-        draw_centered_text_2d(menu_surface, font_title, "GUERRA NAS ESFERAS", -150, BLACK, outline_color=YELLOW)
-
-        y_offset_start = 50
-        y_spacing = 70
-        for i, option in enumerate(menu_options):
-            color = YELLOW if i == selected_option else GRAY
-            draw_centered_text_2d(menu_surface, font_menu, option, y_offset_start + i * y_spacing, color)
-
-        draw_centered_text_2d(menu_surface, font_small, 
-                              "Use as setas para navegar e ENTER para selecionar", 
-                              250, GRAY)
-
-        glDisable(GL_DEPTH_TEST) 
-        
-        texture_data = pygame.image.tostring(menu_surface, "RGBA", True) 
-        width, height = menu_surface.get_size()
-        
-        gl_texture = glGenTextures(1)
-        
-        if np is not None and isinstance(gl_texture, (list, tuple, np.ndarray)):
-            gl_texture_id = int(gl_texture[0])
-        else:
-            gl_texture_id = int(gl_texture)
-            
-        glBindTexture(GL_TEXTURE_2D, gl_texture_id)
-        
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        gluOrtho2D(0, width, 0, height) 
-        
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glDisable(GL_LIGHTING) 
-        glColor3f(1.0, 1.0, 1.0)
-        
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 0); glVertex2f(0, 0) 
-        glTexCoord2f(1, 0); glVertex2f(width, 0) 
-        glTexCoord2f(1, 1); glVertex2f(width, height) 
-        glTexCoord2f(0, 1); glVertex2f(0, height) 
-        glEnd()
 
-        glEnable(GL_LIGHTING) 
-        glDisable(GL_BLEND)
+    def draw(self):
+        draw_scene(globe_texture, stars_texture, rotation_angle, meteors) 
         
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
-        glPopMatrix()
+        if self.selected_option != self.overlay_selection:
+            dirty = draw_menu_options(self.menu_surface, self.font_menu, self.menu_options, self.selected_option)
+            update_overlay_texture(self.overlay_texture, self.menu_surface, dirty)
+            self.overlay_selection = self.selected_option
         
-        glDeleteTextures([gl_texture_id]) 
-        glEnable(GL_DEPTH_TEST)
+        draw_overlay(self.overlay_texture, self.menu_surface.get_size())
 
+    def release(self):
+        if self.overlay_texture is None:
+            return
+        glstate.delete_textures([self.overlay_texture])
+        self.overlay_texture = None
+        release_menu_textures()
 
-        pygame.display.flip()
-        clock.tick(60) 
-
-    pygame.quit()
-    sys.exit()
+def menu_main():
+    scenes.run("menu")
 
 if __name__ == "__main__":
-    menu_main()
\ No newline at end of file
+    menu_main()
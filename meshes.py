@@ -0,0 +1,289 @@
+import bisect
+import ctypes
+import math
+import numpy as np
+from OpenGL.GL import *
+import glstate
+
+VERTEX_STRIDE = 8 * 4
+
+# Faixa em volta de cada limiar de LOD: sobe de nível acima de limiar * (1 + h) e só desce
+# abaixo de limiar * (1 - h), assim um objeto parado na fronteira não fica trocando de malha
+LOD_HYSTERESIS = 0.15
+
+_sphere_cache = {}
+_shape_cache = {}
+
+# Cubo unitário centrado na origem, uma face (4 vértices) por linha
+_BOX_FACES = (
+    (-0.5, -0.5,  0.5), ( 0.5, -0.5,  0.5), ( 0.5,  0.5,  0.5), (-0.5,  0.5,  0.5),
+    (-0.5, -0.5, -0.5), ( 0.5, -0.5, -0.5), ( 0.5,  0.5, -0.5), (-0.5,  0.5, -0.5),
+    (-0.5, -0.5, -0.5), (-0.5, -0.5,  0.5), (-0.5,  0.5,  0.5), (-0.5,  0.5, -0.5),
+    ( 0.5, -0.5, -0.5), ( 0.5, -0.5,  0.5), ( 0.5,  0.5,  0.5), ( 0.5,  0.5, -0.5),
+    (-0.5,  0.5,  0.5), ( 0.5,  0.5,  0.5), ( 0.5,  0.5, -0.5), (-0.5,  0.5, -0.5),
+    (-0.5, -0.5,  0.5), ( 0.5, -0.5,  0.5), ( 0.5, -0.5, -0.5), (-0.5, -0.5, -0.5),
+)
+
+
+class SphereMesh:
+    def __init__(self, slices, stacks):
+        self.slices = slices
+        self.stacks = stacks
+
+        self.vertices = self._build_vertices(slices, stacks)
+        self.indices = self._build_indices(slices, stacks)
+        self.index_count = len(self.indices)
+
+        self.vbo = None
+        self.ibo = None
+
+    @staticmethod
+    def _build_vertices(slices, stacks):
+        # Mesma parametrização do gluSphere: polos no eixo Z, s = 1 - j/slices, t = 1 - i/stacks
+        phi = np.linspace(0.0, math.pi, stacks + 1)
+        theta = np.linspace(0.0, 2.0 * math.pi, slices + 1)
+        phi_grid, theta_grid = np.meshgrid(phi, theta, indexing="ij")
+
+        x = np.sin(phi_grid) * np.sin(theta_grid)
+        y = np.sin(phi_grid) * np.cos(theta_grid)
+        z = np.cos(phi_grid)
+
+        s = 1.0 - np.arange(slices + 1) / slices
+        t = 1.0 - np.arange(stacks + 1) / stacks
+        t_grid, s_grid = np.meshgrid(t, s, indexing="ij")
+
+        vertices = np.empty((stacks + 1, slices + 1, 8), dtype=np.float32)
+        vertices[..., 0] = x
+        vertices[..., 1] = y
+        vertices[..., 2] = z
+        vertices[..., 3] = x
+        vertices[..., 4] = y
+        vertices[..., 5] = z
+        vertices[..., 6] = s_grid
+        vertices[..., 7] = t_grid
+        return vertices.reshape(-1, 8)
+
+    @staticmethod
+    def _build_indices(slices, stacks):
+        row = slices + 1
+        i, j = np.meshgrid(np.arange(stacks), np.arange(slices), indexing="ij")
+        a = (i * row + j).ravel()
+        b = a + row
+        c = b + 1
+        d = a + 1
+
+        indices = np.empty((a.size, 6), dtype=np.uint32)
+        indices[:, 0] = c
+        indices[:, 1] = b
+        indices[:, 2] = d
+        indices[:, 3] = b
+        indices[:, 4] = a
+        indices[:, 5] = d
+        return indices.ravel()
+
+    def _upload(self):
+        self.vbo = int(glGenBuffers(1))
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+
+        self.ibo = int(glGenBuffers(1))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_STATIC_DRAW)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def bind(self):
+        if self.vbo is None:
+            self._upload()
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+
+    def draw(self):
+        self.bind()
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(12))
+        glTexCoordPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(24))
+
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+        glstate.count_draw()
+
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+        self.vbo = None
+        self.ibo = None
+
+
+class ShapeMesh:
+    # Só posições, desenhada com glDrawArrays; tamanho e cor vêm da matriz e do glColor de quem desenha.
+    # bind/draw_bound/unbind desenham a mesma malha várias vezes com um único bind
+    def __init__(self, vertices, mode):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.mode = mode
+        self.vertex_count = len(self.vertices)
+        self.vbo = None
+
+    def bind(self):
+        if self.vbo is None:
+            self.vbo = int(glGenBuffers(1))
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+
+    def draw_bound(self):
+        glDrawArrays(self.mode, 0, self.vertex_count)
+        glstate.count_draw()
+
+    def unbind(self):
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        self.bind()
+        self.draw_bound()
+        self.unbind()
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+        self.vbo = None
+
+
+def get_cylinder_mesh(segments):
+    # Lateral de um cilindro de raio 1, de y = 0 a y = 1 (mesma ordem de vértices do antigo GL_QUAD_STRIP)
+    key = ("cilindro", segments)
+    mesh = _shape_cache.get(key)
+    if mesh is None:
+        angles = np.arange(segments + 1) * (2.0 * math.pi / segments)
+        vertices = np.zeros((segments + 1, 2, 3), dtype=np.float32)
+        vertices[:, :, 0] = np.cos(angles)[:, None]
+        vertices[:, 1, 1] = 1.0
+        vertices[:, :, 2] = np.sin(angles)[:, None]
+        mesh = _shape_cache[key] = ShapeMesh(vertices, GL_QUAD_STRIP)
+    return mesh
+
+def get_box_mesh():
+    mesh = _shape_cache.get("caixa")
+    if mesh is None:
+        mesh = _shape_cache["caixa"] = ShapeMesh(_BOX_FACES, GL_QUADS)
+    return mesh
+
+def get_sphere_mesh(slices, stacks):
+    key = (slices, stacks)
+    mesh = _sphere_cache.get(key)
+    if mesh is None:
+        mesh = SphereMesh(slices, stacks)
+        _sphere_cache[key] = mesh
+    return mesh
+
+def draw_sphere(radius, slices, stacks):
+    mesh = get_sphere_mesh(slices, stacks)
+
+    glPushMatrix()
+    glScalef(radius, radius, radius)
+    mesh.draw()
+    glPopMatrix()
+
+# Pixels por unidade de mundo a distância 1 da câmera; set_lod_projection acompanha o gluPerspective.
+# O padrão é a câmera do jogo (70 graus) em 720 linhas
+_lod_pixel_scale = 360.0 / math.tan(math.radians(35.0))
+
+def set_lod_projection(fov_y, viewport_height):
+    global _lod_pixel_scale
+    _lod_pixel_scale = viewport_height * 0.5 / math.tan(math.radians(fov_y) * 0.5)
+
+def lod_pixel_scale():
+    return _lod_pixel_scale
+
+def projected_radius(radius, distance):
+    # Raio aparente, em pixels, de uma esfera com o centro a `distance` do olho (pior caso: no centro da tela)
+    if distance <= radius:
+        return math.inf
+    return radius / math.sqrt(distance * distance - radius * radius) * _lod_pixel_scale
+
+
+def silhouette_thresholds(levels, tolerance_px):
+    # Limiares para SphereLOD: cada nível vale até a silhueta errar mais que tolerance_px.
+    # Entre o círculo de raio r e o polígono de `slices` lados a diferença é r * (1 - cos(pi / slices))
+    return tuple(tolerance_px / (1.0 - math.cos(math.pi / slices)) for slices, _ in levels[:-1])
+
+
+class SphereLOD:
+    # Tesselações (slices, stacks) da mesma esfera, da mais simples à mais detalhada;
+    # thresholds[i] é o raio projetado (px) a partir do qual vale o nível i + 1
+    def __init__(self, levels, thresholds, hysteresis=LOD_HYSTERESIS):
+        if len(thresholds) != len(levels) - 1:
+            raise ValueError("SphereLOD precisa de um limiar a menos que o número de níveis")
+        self.levels = tuple(levels)
+        self.thresholds = tuple(thresholds)
+        self.upper = tuple(t * (1.0 + hysteresis) for t in thresholds)
+        self.lower = tuple(t * (1.0 - hysteresis) for t in thresholds)
+        self._thresholds = np.array(self.thresholds)
+        self._upper = np.array(self.upper)
+        self._lower = np.array(self.lower)
+
+    def mesh(self, level):
+        return get_sphere_mesh(*self.levels[level])
+
+    def select(self, pixel_radius, current=None):
+        if current is None:
+            return bisect.bisect_left(self.thresholds, pixel_radius)
+        # O nível atual vale enquanto o raio estiver dentro da faixa dele
+        floor = bisect.bisect_left(self.upper, pixel_radius)
+        ceiling = bisect.bisect_left(self.lower, pixel_radius)
+        return min(max(current, floor), ceiling)
+
+    def select_many(self, pixel_radii, current, out=None):
+        # Mesma regra de select para um array de raios; `current` tem os níveis do quadro anterior,
+        # com -1 no lugar de None para quem ainda não tem nível
+        floor = np.searchsorted(self._upper, pixel_radii)
+        ceiling = np.searchsorted(self._lower, pixel_radii)
+        fresh = current < 0
+        levels = np.clip(current, floor, ceiling, out=out)
+        if fresh.any():
+            levels[fresh] = np.searchsorted(self._thresholds, pixel_radii[fresh])
+        return levels
+
+
+class LODSphere:
+    # Esfera avulsa (a Terra, o globo do menu) que guarda o próprio nível entre quadros
+    def __init__(self, lod):
+        self.lod = lod
+        self.level = None
+
+    def draw(self, radius, distance):
+        self.level = self.lod.select(projected_radius(radius, distance), self.level)
+        slices, stacks = self.lod.levels[self.level]
+        draw_sphere(radius, slices, stacks)
+
+
+# Esferas grandes e texturizadas. Tanto o globo do menu (~180 px) quanto a Terra do jogo (~570-600 px
+# de raio, com a câmera a 30 unidades da superfície) ficam no 32x32; o 48x48 só vale bem mais perto
+GLOBE_LOD = SphereLOD(((16, 16), (24, 24), (32, 32), (48, 48)), (60.0, 120.0, 800.0))
+
+def clear_mesh_cache():
+    # Deve ser chamado antes de destruir o contexto GL (pygame.quit)
+    for mesh in _sphere_cache.values():
+        mesh.release()
+    _sphere_cache.clear()
+    for mesh in _shape_cache.values():
+        mesh.release()
+    _shape_cache.clear()
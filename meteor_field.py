@@ -0,0 +1,272 @@
+import random
+import numpy as np
+from OpenGL.GL import *
+import glstate
+from meshes import draw_sphere
+from spatial_hash import SpatialHash
+from collision import spheres_in_frustum
+
+PLAYER_COLLISION_MARGIN = 2.0
+
+
+def roll_meteor(rng, grid_limit):
+    # Sorteios de um meteoro novo, nesta ordem: a BatchSimulation consome o mesmo rng
+    # que a MeteorField e precisa chegar aos mesmos meteoros
+    return {
+        "x": rng.uniform(-grid_limit, grid_limit),
+        "y": rng.uniform(50.0, 100.0),
+        "z": rng.uniform(-grid_limit, grid_limit),
+        "size": rng.uniform(1.0, 3.0),
+        "color": (rng.random(), rng.random(), rng.random()),
+        "speed": rng.uniform(0.05, 0.15),
+        "rotation_angle": rng.uniform(0.0, 360.0),
+        "rotation_speed": rng.uniform(1.0, 5.0),
+        "rotation_axis": (rng.random(), rng.random(), rng.random()),
+    }
+
+
+class MeteorView:
+    __slots__ = ("field", "index")
+
+    def __init__(self, field, index):
+        self.field = field
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.field.x[self.index])
+
+    @property
+    def y(self):
+        return float(self.field.y[self.index])
+
+    @property
+    def z(self):
+        return float(self.field.z[self.index])
+
+    @property
+    def size(self):
+        return float(self.field.size[self.index])
+
+    @property
+    def speed(self):
+        return float(self.field.speed[self.index])
+
+    @property
+    def color(self):
+        return tuple(self.field.color[self.index])
+
+    @property
+    def rotation_angle(self):
+        return float(self.field.rotation_angle[self.index])
+
+    @property
+    def rotation_axis(self):
+        return self.field.rotation_axis[self.index]
+
+    @property
+    def active(self):
+        return bool(self.field.active[self.index])
+
+    def draw(self, texture_id=None):
+        if not self.active and self.y <= self.field.surface_y:
+            return
+
+        glPushMatrix()
+        glTranslatef(self.x, self.y, self.z)
+
+        axis = self.rotation_axis
+        glRotatef(self.rotation_angle, axis[0], axis[1], axis[2])
+
+        # Sem desligar ao final: os meteoros seguintes usam o mesmo estado e o glstate
+        # descarta as chamadas repetidas; draw_scene desliga a textura depois do laço
+        if texture_id:
+            glstate.enable(GL_TEXTURE_2D)
+            glstate.bind_texture(texture_id)
+            glColor3f(1.0, 1.0, 1.0)
+        else:
+            glstate.disable(GL_TEXTURE_2D)
+            glColor3f(*self.color)
+
+        draw_sphere(self.size, 5, 5)
+
+        glPopMatrix()
+
+
+class MeteorField:
+    def __init__(self, grid_limit, surface_y, capacity=256, rng=None):
+        self.grid_limit = grid_limit
+        self.surface_y = surface_y
+        self.rng = rng if rng is not None else random
+
+        self.count = 0
+        self.capacity = 0
+        self._allocate(capacity)
+
+        self.broadphase = SpatialHash(grid_limit)
+
+    def _allocate(self, capacity):
+        old_count = self.count
+        old = None
+        if self.capacity:
+            old = {name: getattr(self, name)[:old_count] for name in self._columns()}
+
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.z = np.zeros(capacity, dtype=np.float64)
+        self.size = np.zeros(capacity, dtype=np.float64)
+        self.speed = np.zeros(capacity, dtype=np.float64)
+        self.rotation_angle = np.zeros(capacity, dtype=np.float64)
+        self.rotation_speed = np.zeros(capacity, dtype=np.float64)
+        self.previous_y = np.zeros(capacity, dtype=np.float64)
+        self.previous_rotation_angle = np.zeros(capacity, dtype=np.float64)
+        self.rotation_axis = np.zeros((capacity, 3), dtype=np.float64)
+        self.color = np.zeros((capacity, 3), dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.intercepted = np.zeros(capacity, dtype=bool)
+        # Nível de LOD do último quadro desenhado (histerese do MeteorBatchRenderer); -1 = ainda sem nível
+        self.lod_level = np.full(capacity, -1, dtype=np.int8)
+
+        if old is not None:
+            for name, values in old.items():
+                getattr(self, name)[:old_count] = values
+
+        self.capacity = capacity
+
+    @staticmethod
+    def _columns():
+        return ("x", "y", "z", "size", "speed", "rotation_angle", "rotation_speed",
+                "previous_y", "previous_rotation_angle",
+                "rotation_axis", "color", "active", "intercepted", "lod_level")
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield MeteorView(self, i)
+
+    def clear(self):
+        self.count = 0
+        self.broadphase.mark_dirty()
+
+    def spawn(self):
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+
+        i = self.count
+        meteor = roll_meteor(self.rng, self.grid_limit)
+
+        self.x[i] = meteor["x"]
+        self.y[i] = meteor["y"]
+        self.z[i] = meteor["z"]
+        self.size[i] = meteor["size"]
+        self.color[i] = meteor["color"]
+        self.speed[i] = meteor["speed"]
+        self.active[i] = True
+        self.intercepted[i] = False
+        self.lod_level[i] = -1
+
+        self.rotation_angle[i] = meteor["rotation_angle"]
+        self.rotation_speed[i] = meteor["rotation_speed"]
+        axis = np.array(meteor["rotation_axis"])
+        self.rotation_axis[i] = axis / np.linalg.norm(axis)
+
+        self.previous_y[i] = self.y[i]
+        self.previous_rotation_angle[i] = self.rotation_angle[i]
+
+        self.count += 1
+        self.broadphase.mark_dirty()
+        return i
+
+    def update(self, scale=1.0):
+        n = self.count
+        active = self.active[:n]
+
+        self.previous_y[:n] = self.y[:n]
+        self.previous_rotation_angle[:n] = self.rotation_angle[:n]
+
+        self.y[:n] -= self.speed[:n] * (active * scale)
+        self.rotation_angle[:n] += self.rotation_speed[:n] * (active * scale)
+
+        active &= self.y[:n] > self.surface_y
+
+    def settle(self):
+        n = self.count
+        self.previous_y[:n] = self.y[:n]
+        self.previous_rotation_angle[:n] = self.rotation_angle[:n]
+
+    def check_player_collision(self, player_pos, margin=PLAYER_COLLISION_MARGIN):
+        self.broadphase.update(self)
+        hits = self.broadphase.query_sphere(player_pos, margin)
+        return self.intercept(hits)
+
+    def check_blade_collision(self, sweep, radius):
+        self.broadphase.update(self)
+        hits = self.broadphase.query_swept_segment(*sweep, radius)
+        return self.intercept(hits)
+
+    def intercept(self, indices):
+        indices = indices[self.active[indices]]
+        self.active[indices] = False
+        self.intercepted[indices] = True
+        return len(indices)
+
+    def count_impacts(self):
+        n = self.count
+        return int(np.count_nonzero(~self.active[:n] & ~self.intercepted[:n]))
+
+    def compact(self):
+        n = self.count
+        alive = self.active[:n]
+        new_count = int(np.count_nonzero(alive))
+        if new_count == n:
+            return 0
+
+        # Swap-remove: os buracos abaixo de new_count recebem os sobreviventes do final
+        holes = np.flatnonzero(~alive[:new_count])
+        fillers = np.flatnonzero(alive[new_count:]) + new_count
+
+        for name in self._columns():
+            column = getattr(self, name)
+            column[holes] = column[fillers]
+
+        self.count = new_count
+        self.broadphase.mark_dirty()
+        return n - new_count
+
+    def step(self, player_pos, blade_sweep=None, blade_radius=0.0, scale=1.0):
+        self.update(scale)
+        intercepted = self.check_player_collision(player_pos)
+        if blade_sweep is not None:
+            intercepted += self.check_blade_collision(blade_sweep, blade_radius)
+        impacts = self.count_impacts()
+        self.compact()
+        return intercepted, impacts
+
+    def visible_indices(self, planes, alpha=1.0):
+        # Meteoros cuja esfera, na posição interpolada que vai ser desenhada, toca o frustum
+        n = self.count
+        previous_y = self.previous_y[:n]
+        y = previous_y + (self.y[:n] - previous_y) * alpha
+        return np.flatnonzero(spheres_in_frustum(planes, self.x[:n], y, self.z[:n], self.size[:n]))
+
+    def fill_instances(self, out, alpha=1.0, indices=None):
+        # alpha interpola entre a atualização anterior e a atual; com `indices`, só esses meteoros, nessa ordem
+        if indices is None:
+            indices = slice(0, self.count)
+            n = self.count
+        else:
+            n = len(indices)
+        previous_y = self.previous_y[indices]
+        previous_angle = self.previous_rotation_angle[indices]
+
+        out[:n, 0] = self.x[indices]
+        out[:n, 1] = previous_y + (self.y[indices] - previous_y) * alpha
+        out[:n, 2] = self.z[indices]
+        out[:n, 3] = self.size[indices]
+        out[:n, 4:7] = self.rotation_axis[indices]
+        out[:n, 7] = previous_angle + (self.rotation_angle[indices] - previous_angle) * alpha
+        out[:n, 8:11] = self.color[indices]
+        out[:n, 11] = 1.0
+        return n
@@ -0,0 +1,345 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+import glstate
+from meshes import SphereLOD, VERTEX_STRIDE, lod_pixel_scale, silhouette_thresholds
+
+# Layout por instância: x, y, z, size | eixo x, y, z, ângulo (graus) | r, g, b, a
+INSTANCE_FLOATS = 12
+INSTANCE_STRIDE = INSTANCE_FLOATS * 4
+
+ATTRIB_POS_SIZE = 1
+ATTRIB_AXIS_ANGLE = 2
+ATTRIB_COLOR = 3
+
+# A malha única de antes era a 5x5 (nível 1). Com erro de silhueta de até 7 px, os meteoros que
+# ocupam poucos pixels (as ondas recém-criadas, lá no alto) descem para 4x3 e os grandes, perto do
+# jogador, ganham detalhe; numa partida típica o total de triângulos fica perto do de antes
+METEOR_LOD_LEVELS = ((4, 3), (5, 5), (7, 6), (10, 8), (16, 12))
+METEOR_LOD = SphereLOD(METEOR_LOD_LEVELS, silhouette_thresholds(METEOR_LOD_LEVELS, 7.0))
+DEFAULT_LOD_LEVEL = 1
+
+VERTEX_SHADER = """
+#version 120
+attribute vec4 instance_pos_size;
+attribute vec4 instance_axis_angle;
+attribute vec4 instance_color;
+varying vec4 v_color;
+
+void main() {
+    vec3 p = gl_Vertex.xyz * instance_pos_size.w;
+    vec3 k = instance_axis_angle.xyz;
+    float a = radians(instance_axis_angle.w);
+    float c = cos(a);
+    p = p * c + cross(k, p) * sin(a) + k * dot(k, p) * (1.0 - c);
+
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(p + instance_pos_size.xyz, 1.0);
+    gl_TexCoord[0] = gl_MultiTexCoord0;
+    v_color = instance_color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D meteor_texture;
+uniform bool textured;
+varying vec4 v_color;
+
+void main() {
+    if (textured) {
+        gl_FragColor = texture2D(meteor_texture, gl_TexCoord[0].st);
+    } else {
+        gl_FragColor = v_color;
+    }
+}
+"""
+
+
+def _compile_program():
+    try:
+        vertex = glCreateShader(GL_VERTEX_SHADER)
+        glShaderSource(vertex, VERTEX_SHADER)
+        glCompileShader(vertex)
+        if not glGetShaderiv(vertex, GL_COMPILE_STATUS):
+            raise RuntimeError(glGetShaderInfoLog(vertex))
+
+        fragment = glCreateShader(GL_FRAGMENT_SHADER)
+        glShaderSource(fragment, FRAGMENT_SHADER)
+        glCompileShader(fragment)
+        if not glGetShaderiv(fragment, GL_COMPILE_STATUS):
+            raise RuntimeError(glGetShaderInfoLog(fragment))
+
+        program = glCreateProgram()
+        glAttachShader(program, vertex)
+        glAttachShader(program, fragment)
+        glBindAttribLocation(program, ATTRIB_POS_SIZE, "instance_pos_size")
+        glBindAttribLocation(program, ATTRIB_AXIS_ANGLE, "instance_axis_angle")
+        glBindAttribLocation(program, ATTRIB_COLOR, "instance_color")
+        glLinkProgram(program)
+        if not glGetProgramiv(program, GL_LINK_STATUS):
+            raise RuntimeError(glGetProgramInfoLog(program))
+
+        glDeleteShader(vertex)
+        glDeleteShader(fragment)
+        return program
+    except Exception as e:
+        print(f"AVISO: Renderização instanciada indisponível ({e}). Usando malha combinada.")
+        return None
+
+def supports_instancing():
+    try:
+        return bool(glCreateShader) and bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)
+    except Exception:
+        return False
+
+
+class _MergedMesh:
+    # Caminho sem instanciamento: cópias de uma malha unitária (um nível de LOD) recalculadas a cada quadro
+    def __init__(self, mesh):
+        self.mesh = mesh
+        unit = mesh.vertices
+        self.unit_positions = np.ascontiguousarray(unit[:, 0:3])
+        self.unit_texcoords = np.ascontiguousarray(unit[:, 6:8])
+        self.capacity = 0
+        self.positions = None
+        self.texcoords = None
+        self.colors = None
+        self.indices = None
+
+    def reserve(self, count):
+        if count <= self.capacity:
+            return
+
+        capacity = max(self.capacity, 16)
+        while capacity < count:
+            capacity *= 2
+
+        n_verts = len(self.unit_positions)
+        self.positions = np.empty((capacity, n_verts, 3), dtype=np.float32)
+        self.texcoords = np.ascontiguousarray(np.broadcast_to(self.unit_texcoords, (capacity, n_verts, 2)))
+        self.colors = np.empty((capacity, n_verts, 4), dtype=np.float32)
+
+        offsets = (np.arange(capacity, dtype=np.uint32) * n_verts)[:, None]
+        self.indices = np.ascontiguousarray((self.mesh.indices[None, :] + offsets).ravel())
+        self.capacity = capacity
+
+    def draw(self, inst, rotation, textured):
+        count = len(inst)
+        self.reserve(count)
+
+        positions = self.positions[:count]
+        np.einsum("nij,vj->nvi", rotation, self.unit_positions, out=positions)
+        positions += inst[:, None, 0:3]
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.positions)
+        glTexCoordPointer(2, GL_FLOAT, 0, self.texcoords)
+
+        if textured:
+            glColor3f(1.0, 1.0, 1.0)
+        else:
+            self.colors[:count] = inst[:, None, 8:12]
+            glEnableClientState(GL_COLOR_ARRAY)
+            glColorPointer(4, GL_FLOAT, 0, self.colors)
+
+        index_count = count * self.mesh.index_count
+        glDrawElements(GL_TRIANGLES, index_count, GL_UNSIGNED_INT, self.indices)
+        glstate.count_draw()
+
+        if not textured:
+            glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+class MeteorBatchRenderer:
+    def __init__(self, lod=METEOR_LOD, capacity=256, use_instancing=None):
+        self.lod = lod
+        self.capacity = 0
+        self.instances = None
+        self.count = 0
+        # Instâncias do quadro ordenadas por nível: (nível, primeira instância, quantidade)
+        self.groups = []
+
+        if use_instancing is None:
+            use_instancing = supports_instancing()
+
+        self.program = _compile_program() if use_instancing else None
+        self.instance_vbo = None
+
+        self._textured_location = None
+        self._sampler_location = None
+        if self.program is not None:
+            self._textured_location = glGetUniformLocation(self.program, "textured")
+            self._sampler_location = glGetUniformLocation(self.program, "meteor_texture")
+            self.instance_vbo = int(glGenBuffers(1))
+
+        # Malhas combinadas por nível, criadas quando o nível aparece pela primeira vez
+        self._merged = {}
+
+        self._reserve(capacity)
+
+    @property
+    def instanced(self):
+        return self.program is not None
+
+    def _reserve(self, count):
+        if count <= self.capacity:
+            return
+
+        capacity = max(self.capacity, 1)
+        while capacity < count:
+            capacity *= 2
+
+        instances = np.zeros((capacity, INSTANCE_FLOATS), dtype=np.float32)
+        if self.instances is not None:
+            instances[:self.count] = self.instances[:self.count]
+        self.instances = instances
+        self.capacity = capacity
+
+        if self.instance_vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.instances.nbytes, None, GL_STREAM_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def pack_field(self, field, alpha=1.0, eye=None, visible=None):
+        # Com `eye` (posição da câmera), cada meteoro ganha um nível de LOD pelo raio na tela;
+        # sem, todos usam o nível padrão. `visible` (índices do campo, ver MeteorField.visible_indices)
+        # limita o envio aos meteoros que passaram no recorte
+        self._reserve(field.count)
+        count = self.count = field.fill_instances(self.instances, alpha, visible)
+        if eye is None or count == 0:
+            self.groups = [(DEFAULT_LOD_LEVEL, 0, count)] if count else []
+        else:
+            self._assign_lod(field, eye, count, visible)
+        return count
+
+    def _assign_lod(self, field, eye, count, visible=None):
+        inst = self.instances[:count]
+        dx = inst[:, 0] - eye[0]
+        dy = inst[:, 1] - eye[1]
+        dz = inst[:, 2] - eye[2]
+        radius = inst[:, 3]
+        # Mesma conta de meshes.projected_radius; dentro da esfera, o nível máximo
+        excess = dx * dx + dy * dy + dz * dz - radius * radius
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pixels = radius / np.sqrt(excess) * lod_pixel_scale()
+        pixels[excess <= 0.0] = np.inf
+
+        # O nível anterior fica numa coluna do campo, que acompanha cada meteoro no compact();
+        # quem ficou fora do recorte guarda o nível que tinha
+        if visible is None:
+            levels = self.lod.select_many(pixels, field.lod_level[:count], out=field.lod_level[:count])
+        else:
+            levels = self.lod.select_many(pixels, field.lod_level[visible])
+            field.lod_level[visible] = levels
+
+        # Um desenho por nível, do mais detalhado ao mais simples, e dentro de cada nível do mais perto
+        # ao mais longe: de frente para trás, o depth test descarta o que já está coberto antes de
+        # texturizar (no llvmpipe, desenhar de trás para frente quase dobra o tempo com 5000 meteoros)
+        order = np.lexsort((excess, -levels))
+        self.instances[:count] = inst[order]
+        self.groups = []
+        start = 0
+        level_counts = np.bincount(levels, minlength=len(self.lod.levels)).tolist()
+        for level in range(len(level_counts) - 1, -1, -1):
+            if level_counts[level]:
+                self.groups.append((level, start, level_counts[level]))
+                start += level_counts[level]
+
+    def draw(self, texture_id=None):
+        if self.count == 0:
+            glstate.bind_texture(0)
+            glstate.disable(GL_TEXTURE_2D)
+            return
+
+        if texture_id:
+            glstate.enable(GL_TEXTURE_2D)
+            glstate.bind_texture(texture_id)
+        else:
+            glstate.disable(GL_TEXTURE_2D)
+
+        if self.instanced:
+            self._draw_instanced(bool(texture_id))
+        else:
+            self._draw_merged(bool(texture_id))
+
+        if texture_id:
+            glstate.bind_texture(0)
+            glstate.disable(GL_TEXTURE_2D)
+
+    def _draw_instanced(self, textured):
+        glUseProgram(self.program)
+        glUniform1i(self._textured_location, 1 if textured else 0)
+        glUniform1i(self._sampler_location, 0)
+
+        # Um envio para todos os níveis; cada grupo aponta os atributos para o próprio trecho
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, self.count * INSTANCE_STRIDE, self.instances[:self.count])
+
+        for location in (ATTRIB_POS_SIZE, ATTRIB_AXIS_ANGLE, ATTRIB_COLOR):
+            glEnableVertexAttribArray(location)
+            glVertexAttribDivisor(location, 1)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+
+        for level, start, count in self.groups:
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+            base = start * INSTANCE_STRIDE
+            for location, offset in ((ATTRIB_POS_SIZE, 0), (ATTRIB_AXIS_ANGLE, 16), (ATTRIB_COLOR, 32)):
+                glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, ctypes.c_void_p(base + offset))
+
+            mesh = self.lod.mesh(level)
+            mesh.bind()
+            glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+            glTexCoordPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(24))
+
+            glDrawElementsInstanced(GL_TRIANGLES, mesh.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0), count)
+            glstate.count_draw()
+
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        for location in (ATTRIB_POS_SIZE, ATTRIB_AXIS_ANGLE, ATTRIB_COLOR):
+            glVertexAttribDivisor(location, 0)
+            glDisableVertexAttribArray(location)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def _draw_merged(self, textured):
+        count = self.count
+        inst = self.instances[:count]
+
+        # Rodrigues vetorizado: R = cI + s[k]x + (1 - c)kk^T
+        k = inst[:, 4:7]
+        angle = np.radians(inst[:, 7])
+        c = np.cos(angle)[:, None, None]
+        s = np.sin(angle)[:, None, None]
+
+        cross = np.zeros((count, 3, 3), dtype=np.float32)
+        cross[:, 0, 1] = -k[:, 2]
+        cross[:, 0, 2] = k[:, 1]
+        cross[:, 1, 0] = k[:, 2]
+        cross[:, 1, 2] = -k[:, 0]
+        cross[:, 2, 0] = -k[:, 1]
+        cross[:, 2, 1] = k[:, 0]
+
+        rotation = c * np.eye(3, dtype=np.float32) + s * cross + (1.0 - c) * (k[:, :, None] * k[:, None, :])
+        rotation *= inst[:, 3, None, None]
+
+        for level, start, level_count in self.groups:
+            merged = self._merged.get(level)
+            if merged is None:
+                merged = self._merged[level] = _MergedMesh(self.lod.mesh(level))
+            end = start + level_count
+            merged.draw(inst[start:end], rotation[start:end], textured)
+
+    def release(self):
+        if self.instance_vbo is not None:
+            glDeleteBuffers(1, [self.instance_vbo])
+            self.instance_vbo = None
+        if self.program is not None:
+            glDeleteProgram(self.program)
+            self.program = None
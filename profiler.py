@@ -0,0 +1,260 @@
+import csv
+import json
+import os
+import time
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.error import GLError
+
+# Quadros guardados no anel (10 s a 60 fps); o dump de saída grava só esses
+PROFILER_HISTORY = 600
+MAX_SECTIONS = 32
+MAX_COUNTERS = 16
+# Média móvel do overlay
+ROLLING_FRAMES = 120
+# Resultados de GPU são lidos alguns quadros depois, sem esperar pelo driver
+GPU_QUERY_LATENCY = 3
+
+FRAME_SECTION = "quadro"
+PROFILE_DIR = os.environ.get("GAME_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+
+_names = [FRAME_SECTION]
+_gpu_columns = set()
+_sections = {}
+_counter_names = []
+_counter_columns = {}
+
+_cpu = np.full((PROFILER_HISTORY, MAX_SECTIONS), np.nan)
+_gpu = np.full((PROFILER_HISTORY, MAX_SECTIONS), np.nan)
+_counts = np.full((PROFILER_HISTORY, MAX_COUNTERS), np.nan)
+
+# Quadros já completos; o quadro em andamento usa a linha _frame % PROFILER_HISTORY
+_frame = 0
+_row = 0
+_in_frame = False
+_frame_start = 0.0
+
+# None = ainda não verificado (precisa de um contexto GL)
+_gpu_supported = None
+_gpu_active = False
+_gl_renderer = None
+_query_pool = {}
+_pending = [None] * GPU_QUERY_LATENCY
+
+
+class _Section:
+    # Reaproveitada a cada uso: o "with" de uma seção não aloca nada
+    __slots__ = ("column", "gpu", "start", "query")
+
+    def __init__(self, column, gpu):
+        self.column = column
+        self.gpu = gpu
+        self.start = None
+        self.query = None
+
+    def __enter__(self):
+        global _gpu_active
+        if not _in_frame:
+            self.start = None
+            return self
+        # Consultas de tempo não podem se sobrepor: uma seção dentro de outra mede só CPU
+        if self.gpu and _gpu_supported and not _gpu_active:
+            self.query = _begin_query(self.column)
+            _gpu_active = True
+        else:
+            self.query = None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _gpu_active
+        if self.start is None:
+            return False
+        elapsed = (time.perf_counter() - self.start) * 1000.0
+        if self.query is not None:
+            glEndQuery(GL_TIME_ELAPSED)
+            _gpu_active = False
+        # A mesma seção pode rodar várias vezes no quadro (ex.: uma por atualização)
+        value = _cpu[_row, self.column]
+        _cpu[_row, self.column] = elapsed if value != value else value + elapsed
+        return False
+
+
+def section(name, gpu=False):
+    # Fora de begin_frame/end_frame (ex.: headless.py) a seção não mede nada
+    entry = _sections.get(name)
+    if entry is None:
+        if name in _names:
+            column = _names.index(name)
+        elif len(_names) < MAX_SECTIONS:
+            column = len(_names)
+            _names.append(name)
+        else:
+            raise ValueError(f"Seções demais no profiler (máximo {MAX_SECTIONS})")
+        if gpu:
+            _gpu_columns.add(column)
+        entry = _sections[name] = _Section(column, gpu)
+    return entry
+
+def count(name, value):
+    # Valor por quadro que não é tempo (ex.: chamadas GL, meteoros visíveis)
+    if not _in_frame:
+        return
+    column = _counter_columns.get(name)
+    if column is None:
+        if len(_counter_names) >= MAX_COUNTERS:
+            raise ValueError(f"Contadores demais no profiler (máximo {MAX_COUNTERS})")
+        column = _counter_columns[name] = len(_counter_names)
+        _counter_names.append(name)
+    _counts[_row, column] = value
+
+def _check_gpu_support():
+    global _gpu_supported, _gl_renderer
+    try:
+        renderer = glGetString(GL_RENDERER)
+        _gl_renderer = renderer.decode("utf-8", "replace") if renderer else None
+        version = glGetString(GL_VERSION)
+        major, minor = (int(part) for part in version.split(b" ")[0].split(b".")[:2])
+        extensions = glGetString(GL_EXTENSIONS) or b""
+        _gpu_supported = bool(glBeginQuery) and ((major, minor) >= (3, 3) or b"GL_ARB_timer_query" in extensions)
+    except (GLError, ValueError, TypeError, AttributeError):
+        _gpu_supported = False
+
+def _begin_query(column):
+    key = (_frame % GPU_QUERY_LATENCY, column)
+    query = _query_pool.get(key)
+    if query is None:
+        query = _query_pool[key] = int(glGenQueries(1)[0])
+    glBeginQuery(GL_TIME_ELAPSED, query)
+    _pending[key[0]][1].append((column, query))
+    return query
+
+def _collect(slot):
+    # Resultado ainda indisponível depois de GPU_QUERY_LATENCY quadros é descartado
+    pending = _pending[slot]
+    if pending is None:
+        return
+    frame, queries = pending
+    _pending[slot] = None
+    if frame <= _frame - PROFILER_HISTORY:
+        return
+    # As consultas terminam em ordem: se a última do quadro está pronta, todas estão
+    if not queries or not glGetQueryObjectuiv(queries[-1][1], GL_QUERY_RESULT_AVAILABLE):
+        return
+    row = frame % PROFILER_HISTORY
+    for column, query in queries:
+        _gpu[row, column] = glGetQueryObjectuiv(query, GL_QUERY_RESULT) / 1e6
+
+def begin_frame():
+    global _in_frame, _row, _frame_start
+    if _gpu_supported is None:
+        _check_gpu_support()
+
+    _row = _frame % PROFILER_HISTORY
+    _cpu[_row] = np.nan
+    _gpu[_row] = np.nan
+    _counts[_row] = np.nan
+
+    if _gpu_supported:
+        slot = _frame % GPU_QUERY_LATENCY
+        _collect(slot)
+        _pending[slot] = (_frame, [])
+
+    _in_frame = True
+    _frame_start = time.perf_counter()
+
+def end_frame():
+    global _in_frame, _frame
+    if not _in_frame:
+        return
+    _cpu[_row, 0] = (time.perf_counter() - _frame_start) * 1000.0
+    _in_frame = False
+    _frame += 1
+
+def _recent_rows(frames):
+    frames = min(frames or PROFILER_HISTORY, _frame, PROFILER_HISTORY)
+    return [(_frame - frames + i) % PROFILER_HISTORY for i in range(frames)]
+
+def _stats(values):
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return None
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+        "samples": int(values.size),
+    }
+
+def summary(frames=None):
+    # Estatísticas dos últimos `frames` quadros completos (todos os do anel por padrão), em ms
+    rows = _recent_rows(frames)
+    sections = {}
+    counters = {}
+    if rows:
+        cpu = _cpu[rows]
+        gpu = _gpu[rows]
+        for column, name in enumerate(_names):
+            entry = {"cpu_ms": _stats(cpu[:, column])}
+            if column in _gpu_columns:
+                entry["gpu_ms"] = _stats(gpu[:, column])
+            sections[name] = entry
+        counts = _counts[rows]
+        for column, name in enumerate(_counter_names):
+            counters[name] = _stats(counts[:, column])
+    return {"frames": len(rows), "sections": sections, "counters": counters}
+
+def dump(directory=PROFILE_DIR):
+    # CSV com um quadro por linha e JSON com o resumo, para comparar versões do jogo;
+    # GAME_PROFILE_DIR vazio desliga
+    if not directory or _frame == 0:
+        return None
+    rows = _recent_rows(None)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(directory, f"perfil-{stamp}")
+
+    columns = []
+    for column, name in enumerate(_names):
+        columns.append((f"{name}_cpu_ms", _cpu, column))
+        if column in _gpu_columns:
+            columns.append((f"{name}_gpu_ms", _gpu, column))
+    for column, name in enumerate(_counter_names):
+        columns.append((name, _counts, column))
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(base + ".csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [header for header, _, _ in columns])
+            first_frame = _frame - len(rows)
+            for i, row in enumerate(rows):
+                values = [source[row, column] for _, source, column in columns]
+                writer.writerow([first_frame + i] + ["" if value != value else f"{value:.4f}" for value in values])
+
+        report = summary()
+        report["total_frames"] = _frame
+        report["gpu_timing"] = bool(_gpu_supported)
+        report["renderer"] = _gl_renderer
+        report["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        print(f"AVISO: Não foi possível gravar o perfil em '{directory}': {e}")
+        return None
+
+    print(f"Perfil de {len(rows)} quadros salvo em {base}.csv/.json")
+    return base
+
+def release():
+    # Antes de destruir o contexto GL
+    global _gpu_supported, _gpu_active
+    if _query_pool:
+        glDeleteQueries(len(_query_pool), list(_query_pool.values()))
+    _query_pool.clear()
+    for slot in range(GPU_QUERY_LATENCY):
+        _pending[slot] = None
+    _gpu_active = False
+    _gpu_supported = None
@@ -0,0 +1,154 @@
+import os
+import struct
+import zlib
+from pygame.locals import K_w, K_a, K_s, K_d, K_LSHIFT
+from lightsaber import toggle_saber
+
+RECORDING_MAGIC = b"CTMR"
+RECORDING_VERSION = 1
+# Só as teclas que a Camera lê; a posição na tupla é o bit na gravação
+RECORDED_KEYS = (K_w, K_a, K_s, K_d, K_LSHIFT)
+
+# magic, versão, ticks por segundo, semente, ticks gravados, checksum do estado final
+_HEADER = struct.Struct("<4sHHqII")
+# teclas, alternâncias do sabre, eventos de mouse
+_TICK = struct.Struct("<BBH")
+# event.rel cru, como chega em handle_event
+_MOUSE = struct.Struct("<hh")
+_MOUSE_LIMIT = 32767
+
+
+class ScriptedKeys(dict):
+    # Substitui pygame.key.get_pressed(): teclas ausentes contam como soltas
+    def __missing__(self, key):
+        return False
+
+
+class TickInput:
+    __slots__ = ("keys", "mouse_dx", "mouse_dy", "toggle_saber", "mouse_events")
+
+    def __init__(self, keys=None, mouse_dx=0.0, mouse_dy=0.0, toggle_saber=False, mouse_events=()):
+        self.keys = keys if keys is not None else ScriptedKeys()
+        self.mouse_dx = mouse_dx
+        self.mouse_dy = mouse_dy
+        # bool nas políticas; nas gravações, quantas vezes o sabre foi alternado antes do tick
+        self.toggle_saber = toggle_saber
+        # Eventos de mouse um a um: somá-los mudaria o arredondamento do yaw e o limite do pitch
+        self.mouse_events = mouse_events
+
+
+def apply_tick_input(sim, tick_input, play_sound=False):
+    # Tudo o que handle_event faria antes do tick, na mesma ordem de operações de ponto flutuante
+    for _ in range(int(tick_input.toggle_saber)):
+        toggle_saber(play_sound=play_sound)
+    cam = sim.cam
+    for dx, dy in tick_input.mouse_events:
+        cam.process_mouse_movement(dx, -dy)
+    if tick_input.mouse_dx or tick_input.mouse_dy:
+        # Mesmo sinal usado em GameScene.handle_event com event.rel
+        cam.process_mouse_movement(tick_input.mouse_dx, -tick_input.mouse_dy)
+
+def session_checksum(sim):
+    # Estado que a gravação precisa reproduzir bit a bit: câmera, placar e meteoros
+    cam = sim.cam
+    field = sim.field
+    n = field.count
+    checksum = zlib.crc32(struct.pack("<3d4d4q", *cam.position, cam.yaw, cam.pitch, cam.current_stamina,
+                                      sim.game_timer_ms, sim.score, sim.ticks, sim.interceptions, sim.impacts))
+    for column in (field.x, field.y, field.z, field.size, field.active):
+        checksum = zlib.crc32(column[:n].tobytes(), checksum)
+    return checksum
+
+
+class InputRecorder:
+    # Entrada de uma partida, tick a tick: o que chegou por eventos desde o tick anterior
+    # mais as teclas que o tick leu
+    def __init__(self, seed, tick_rate):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.stream = bytearray()
+        self.ticks = 0
+        self.mouse_events = []
+        self.toggles = 0
+        self.checksum = 0
+
+    def mouse(self, dx, dy):
+        self.mouse_events.append((dx, dy))
+
+    def toggle_saber(self):
+        self.toggles += 1
+
+    def tick(self, keys, sim):
+        # Chamado logo depois de GameSimulation.tick(keys); o checksum é o do último tick, já que
+        # eventos que chegam depois (até sair do jogo) mexem na câmera sem chegar à simulação
+        mask = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if keys[key]:
+                mask |= 1 << bit
+
+        events = self.mouse_events
+        self.stream += _TICK.pack(mask, min(self.toggles, 255), len(events))
+        for dx, dy in events:
+            self.stream += _MOUSE.pack(max(-_MOUSE_LIMIT, min(_MOUSE_LIMIT, dx)),
+                                       max(-_MOUSE_LIMIT, min(_MOUSE_LIMIT, dy)))
+        self.mouse_events = []
+        self.toggles = 0
+        self.ticks += 1
+        self.checksum = session_checksum(sim)
+
+    def save(self, path):
+        header = _HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, self.tick_rate, self.seed,
+                              self.ticks, self.checksum)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(zlib.compress(bytes(self.stream), 9))
+        os.replace(tmp_path, path)
+
+
+class Recording:
+    __slots__ = ("seed", "tick_rate", "inputs", "checksum")
+
+    def __init__(self, seed, tick_rate, inputs, checksum):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.inputs = inputs
+        self.checksum = checksum
+
+
+def load_recording(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"'{path}' não é uma gravação de partida")
+    magic, version, tick_rate, seed, ticks, checksum = _HEADER.unpack_from(data)
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f"'{path}' não é uma gravação de partida")
+    if version != RECORDING_VERSION:
+        raise ValueError(f"Gravação '{path}' na versão {version}; esperada {RECORDING_VERSION}")
+
+    stream = zlib.decompress(data[_HEADER.size:])
+    inputs = []
+    # Um ScriptedKeys por combinação de teclas, compartilhado entre os ticks
+    keys_by_mask = {}
+    offset = 0
+    for _ in range(ticks):
+        mask, toggles, event_count = _TICK.unpack_from(stream, offset)
+        offset += _TICK.size
+        events = tuple(_MOUSE.unpack_from(stream, offset + i * _MOUSE.size) for i in range(event_count))
+        offset += event_count * _MOUSE.size
+
+        keys = keys_by_mask.get(mask)
+        if keys is None:
+            keys = keys_by_mask[mask] = ScriptedKeys({key: True for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit)})
+        inputs.append(TickInput(keys, toggle_saber=toggles, mouse_events=events))
+
+    return Recording(seed, tick_rate, inputs, checksum)
+
+def numbered_path(path, index):
+    # Segunda partida em diante na mesma execução: partida-2.ctmr, partida-3.ctmr...
+    if index <= 1:
+        return path
+    base, ext = os.path.splitext(path)
+    return f"{base}-{index}{ext}"
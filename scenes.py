@@ -0,0 +1,173 @@
+import time
+import pygame
+from pygame.locals import DOUBLEBUF, OPENGL
+from OpenGL.GL import *
+import glstate
+import profiler
+from assets import clear_texture_cache
+from meshes import clear_mesh_cache
+from text_renderer import clear_text_cache
+from hud import DebugOverlay, ProfilerOverlay
+import audio
+
+DISPLAY_SIZE = (1280, 720)
+
+
+class Scene:
+    # Uma tela do jogo dentro da janela única; enter/leave a cada troca, release só no fim
+    caption = "Catch the Meteors"
+    max_fps = 0
+
+    def __init__(self):
+        self.manager = None
+
+    def enter(self):
+        pass
+
+    def leave(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self):
+        pass
+
+    def release(self):
+        # Recursos GL da cena; chamado antes de destruir o contexto
+        pass
+
+
+class SceneManager:
+    # Mantém uma janela, um contexto GL e os caches vivos entre menu e partidas
+    def __init__(self, display_size=DISPLAY_SIZE):
+        self.start_time = time.perf_counter()
+        pygame.init()
+        self.display_size = display_size
+        pygame.display.set_mode(display_size, DOUBLEBUF | OPENGL)
+
+        self.scenes = {}
+        self.current = None
+        self.pending = None
+        self.running = True
+        self.clock = pygame.time.Clock()
+        self.first_frame_reported = False
+        self.overlay = DebugOverlay()
+        self.profiler_overlay = ProfilerOverlay()
+
+    def add(self, name, scene):
+        scene.manager = self
+        self.scenes[name] = scene
+
+    def switch(self, name):
+        # Aplicada no fim do quadro, para a cena atual terminar de desenhar
+        self.pending = name
+
+    def quit(self):
+        self.running = False
+
+    def _apply_switch(self):
+        name = self.pending
+        self.pending = None
+        self.activate(name)
+
+    def activate(self, name):
+        # Troca imediata, fora do laço de run() (ex.: benchmarks/bench_render.py)
+        scene = self.scenes[name]
+        if self.current is not None:
+            self.current.leave()
+            # Cada cena configura o próprio estado GL (luzes, texturas) por cima de um estado limpo
+            glPopAttrib()
+            glstate.invalidate()
+
+        self.current = scene
+        pygame.display.set_caption(scene.caption)
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+        scene.enter()
+
+    def run(self, name):
+        self.switch(name)
+        try:
+            while self.running:
+                profiler.begin_frame()
+                if self.pending is not None:
+                    self._apply_switch()
+                scene = self.current
+
+                with profiler.section("eventos"):
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
+                            self.running = False
+                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                            self.overlay.toggle()
+                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                            self.profiler_overlay.toggle()
+                        else:
+                            scene.handle_event(event)
+
+                scene.update()
+                scene.draw()
+                if self.overlay.enabled:
+                    self.overlay.update(glstate.frame_stats(), self.clock.get_fps())
+                    self.overlay.draw(self.display_size)
+                if self.profiler_overlay.enabled:
+                    self.profiler_overlay.update(profiler.summary(profiler.ROLLING_FRAMES))
+                    self.profiler_overlay.draw(self.display_size)
+                with profiler.section("flip"):
+                    pygame.display.flip()
+
+                stats = glstate.counters
+                profiler.count("glstate_chamadas", stats.state_calls)
+                profiler.count("glstate_mudancas", stats.changes)
+                profiler.count("gl_desenhos", stats.draws)
+                glstate.end_frame()
+                profiler.end_frame()
+
+                if not self.first_frame_reported:
+                    self.first_frame_reported = True
+                    print(f"Primeiro quadro em {(time.perf_counter() - self.start_time) * 1000.0:.0f} ms")
+
+                self.clock.tick(scene.max_fps)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self.current is not None:
+            self.current.leave()
+            glPopAttrib()
+            glstate.invalidate()
+            self.current = None
+
+        for scene in self.scenes.values():
+            scene.release()
+        clear_texture_cache()
+        clear_mesh_cache()
+        clear_text_cache()
+        profiler.dump()
+        profiler.release()
+        audio.shutdown()
+        pygame.quit()
+
+
+def run(start="menu", tick_rate=None, max_fps=None, **game_options):
+    # Importados aqui: menu.py e game.py são também pontos de entrada e importam este módulo
+    from menu import MenuScene
+    try:
+        from game import GameScene
+    except ImportError:
+        print("AVISO: O arquivo 'game.py' (com a cena do jogo) não foi encontrado.")
+        print("O menu será exibido, mas a opção 'INICIAR JOGO' não funcionará.")
+        GameScene = None
+
+    manager = SceneManager()
+    manager.add("menu", MenuScene())
+    if GameScene is not None:
+        if tick_rate is not None:
+            game_options["tick_rate"] = tick_rate
+        if max_fps is not None:
+            game_options["max_fps"] = max_fps
+        manager.add("game", GameScene(**game_options))
+    manager.run(start)
@@ -0,0 +1,95 @@
+import os
+import random
+import profiler
+from camera import Camera, GRID_LIMIT
+from meteor_field import MeteorField
+from lightsaber import update_saber, update_blade_sweep, reset_saber, BLADE_HIT_RADIUS
+
+# As taxas por atualização foram calibradas para 60 atualizações por segundo
+REFERENCE_TICK_RATE = 60
+SIM_TICK_RATE = int(os.environ.get("GAME_TICK_RATE", REFERENCE_TICK_RATE))
+
+MAX_GAME_TIME_SECONDS = 61
+
+EARTH_SURFACE_Y = -30.0
+
+MAX_HEALTH = 100
+IMPACT_PENALTY = 5
+SPAWN_INTERVAL = 60
+
+
+class GameSimulation:
+    # Regras da partida (estado RUNNING) sem nenhuma chamada de janela ou GL.
+    # batch_simulation.BatchSimulation repete estas regras em arrays: mudou aqui, muda lá
+    def __init__(self, tick_rate=SIM_TICK_RATE, seed=None):
+        self.tick_rate = tick_rate
+        self.tick_seconds = 1.0 / tick_rate
+        self.tick_scale = REFERENCE_TICK_RATE / tick_rate
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # Sem semente, usa o módulo random global, como o jogo sempre fez
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random
+
+        self.cam = Camera()
+        self.field = MeteorField(GRID_LIMIT, EARTH_SURFACE_Y, rng=self.rng)
+
+        self.score = MAX_HEALTH
+        self.game_timer_ms = MAX_GAME_TIME_SECONDS * 1000
+        self.spawn_timer = 0
+        self.interceptions = 0
+        self.impacts = 0
+        self.ticks = 0
+        self.state = "RUNNING"
+
+        reset_saber()
+
+    @property
+    def finished(self):
+        return self.state != "RUNNING"
+
+    def tick(self, keys):
+        if self.state != "RUNNING":
+            return
+
+        self.ticks += 1
+
+        if self.game_timer_ms > 0:
+            self.game_timer_ms -= self.tick_seconds * 1000
+            if self.game_timer_ms < 0:
+                self.game_timer_ms = 0
+
+        if self.game_timer_ms <= 0:
+            self.state = "WIN"
+
+        cam = self.cam
+        # Separada de camera_vista (o gluLookAt do quadro): o tick roda de 0 a N vezes por quadro
+        with profiler.section("camera_tick"):
+            cam.update_movement(keys, self.tick_scale)
+        update_saber(self.tick_seconds)
+
+        with profiler.section("meteoros"):
+            blade_sweep = update_blade_sweep(cam)
+            intercepted, impacts = self.field.step(cam.position, blade_sweep, BLADE_HIT_RADIUS, self.tick_scale)
+            self.interceptions += intercepted
+            self.impacts += impacts
+            self.score -= IMPACT_PENALTY * impacts
+
+            self.spawn_timer += self.tick_scale
+            if self.spawn_timer >= SPAWN_INTERVAL:
+                self.field.spawn()
+                self.spawn_timer = 0
+
+        if self.score <= 0:
+            self.state = "GAME_OVER"
+
+    def result(self):
+        return {
+            "seed": self.seed,
+            "outcome": self.state,
+            "score": self.score,
+            "interceptions": self.interceptions,
+            "impacts": self.impacts,
+            "ticks": self.ticks,
+        }
@@ -0,0 +1,127 @@
+import math
+import numpy as np
+from collision import spheres_vs_sphere, spheres_vs_segment, spheres_vs_ray, spheres_vs_swept_segment
+
+DEFAULT_CELL_SIZE = 2.0
+
+
+class SpatialHash:
+    # Grade uniforme no plano XZ da arena; os meteoros só se movem em Y,
+    # então a grade só precisa ser refeita quando meteoros nascem ou são removidos.
+    def __init__(self, grid_limit, cell_size=DEFAULT_CELL_SIZE):
+        self.grid_limit = grid_limit
+        self.cell_size = cell_size
+        self.cells_per_side = max(1, int(math.ceil(2.0 * grid_limit / cell_size)))
+        self.num_cells = self.cells_per_side * self.cells_per_side
+
+        self.field = None
+        self.order = np.zeros(0, dtype=np.intp)
+        self.cell_start = np.zeros(self.num_cells + 1, dtype=np.intp)
+        self.max_radius = 0.0
+        self.dirty = True
+
+    def _cell_coords(self, values):
+        cell = np.floor((values + self.grid_limit) / self.cell_size).astype(np.intp)
+        return np.clip(cell, 0, self.cells_per_side - 1)
+
+    def _cell_coord(self, value):
+        cell = int(math.floor((value + self.grid_limit) / self.cell_size))
+        return min(max(cell, 0), self.cells_per_side - 1)
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def rebuild(self, field):
+        self.field = field
+        n = field.count
+
+        cx = self._cell_coords(field.x[:n])
+        cz = self._cell_coords(field.z[:n])
+        cells = cz * self.cells_per_side + cx
+
+        self.order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.num_cells)
+        self.cell_start[0] = 0
+        np.cumsum(counts, out=self.cell_start[1:])
+
+        self.max_radius = float(field.size[:n].max()) if n else 0.0
+        self.dirty = False
+
+    def update(self, field):
+        if self.dirty or self.field is not field:
+            self.rebuild(field)
+
+    def candidates(self, x_min, x_max, z_min, z_max):
+        if self.field is None or self.field.count == 0:
+            return self.order[:0]
+
+        reach = self.max_radius
+        cx0 = self._cell_coord(x_min - reach)
+        cx1 = self._cell_coord(x_max + reach)
+        cz0 = self._cell_coord(z_min - reach)
+        cz1 = self._cell_coord(z_max + reach)
+
+        # Células de uma mesma linha são contíguas em `order`: uma fatia por linha
+        side = self.cells_per_side
+        starts = self.cell_start
+        rows = [self.order[starts[cz * side + cx0]:starts[cz * side + cx1 + 1]] for cz in range(cz0, cz1 + 1)]
+        if len(rows) == 1:
+            return rows[0]
+        return np.concatenate(rows)
+
+    def _within_y(self, indices, y_min, y_max):
+        # A grade só separa X e Z; descarta pela altura antes do teste exato
+        reach = self.max_radius
+        y = self.field.y[indices]
+        return indices[(y >= y_min - reach) & (y <= y_max + reach)]
+
+    def _gather(self, indices):
+        field = self.field
+        centers = np.empty((len(indices), 3))
+        centers[:, 0] = field.x[indices]
+        centers[:, 1] = field.y[indices]
+        centers[:, 2] = field.z[indices]
+        return centers, field.size[indices], field.active[indices]
+
+    def query_sphere(self, center, radius):
+        indices = self.candidates(center[0] - radius, center[0] + radius,
+                                  center[2] - radius, center[2] + radius)
+        indices = self._within_y(indices, center[1] - radius, center[1] + radius)
+        centers, radii, active = self._gather(indices)
+        hit = active & spheres_vs_sphere(centers, radii, center, radius)
+        return indices[hit]
+
+    def query_segment(self, p0, p1, radius=0.0):
+        indices = self.candidates(min(p0[0], p1[0]) - radius, max(p0[0], p1[0]) + radius,
+                                  min(p0[2], p1[2]) - radius, max(p0[2], p1[2]) + radius)
+        indices = self._within_y(indices, min(p0[1], p1[1]) - radius, max(p0[1], p1[1]) + radius)
+        centers, radii, active = self._gather(indices)
+        hit = active & spheres_vs_segment(centers, radii, p0, p1, radius)
+        return indices[hit]
+
+    def query_swept_segment(self, a0, b0, a1, b1, radius=0.0):
+        points = np.array([a0, b0, a1, b1], dtype=np.float64)
+        low = points.min(axis=0) - radius
+        high = points.max(axis=0) + radius
+        indices = self.candidates(low[0], high[0], low[2], high[2])
+        indices = self._within_y(indices, low[1], high[1])
+        if len(indices) == 0:
+            return indices
+        centers, radii, active = self._gather(indices)
+        hit = active & spheres_vs_swept_segment(centers, radii, a0, b0, a1, b1, radius)
+        return indices[hit]
+
+    def query_ray(self, origin, direction, max_distance=np.inf):
+        if math.isfinite(max_distance):
+            end = np.asarray(origin, dtype=np.float64) + max_distance * np.asarray(direction, dtype=np.float64) / np.linalg.norm(direction)
+            indices = self.candidates(min(origin[0], end[0]), max(origin[0], end[0]),
+                                      min(origin[2], end[2]), max(origin[2], end[2]))
+        else:
+            limit = self.grid_limit
+            indices = self.candidates(-limit, limit, -limit, limit)
+        centers, radii, active = self._gather(indices)
+        hit, t = spheres_vs_ray(centers, radii, origin, direction, max_distance)
+        hit &= active
+
+        order = np.argsort(t[hit])
+        return indices[hit][order], t[hit][order]
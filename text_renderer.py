@@ -0,0 +1,308 @@
+import ctypes
+from collections import OrderedDict
+import numpy as np
+import pygame
+from OpenGL.GL import *
+import glstate
+
+ATLAS_SIZE = 512
+GLYPH_PADDING = 1
+LAYOUT_CACHE_SIZE = 256
+
+# Rasterizados ao criar o atlas; qualquer outro caractere entra sob demanda
+PRELOADED_CHARACTERS = "".join(chr(c) for c in range(32, 127)) + "ÁÀÂÃÉÊÍÓÔÕÚÜÇáàâãéêíóôõúüç"
+
+# Layout por vértice: x, y, s, t, r, g, b, a
+TEXT_VERTEX_FLOATS = 8
+TEXT_VERTEX_STRIDE = TEXT_VERTEX_FLOATS * 4
+
+OUTLINE_DIRECTIONS = ((-1, -1), (1, -1), (-1, 1), (1, 1), (0, -1), (0, 1), (-1, 0), (1, 0))
+
+_font_cache = {}
+_atlas_cache = {}
+_layout_cache = OrderedDict()
+
+
+class GlyphAtlas:
+    # Glifos brancos (cobertura no alfa) de uma fonte; a cor vem do vértice via GL_MODULATE
+    def __init__(self, font, size=ATLAS_SIZE):
+        self.font = font
+        self.width = size
+        self.height = size
+        self.pixels = self._blank(size, size)
+
+        self.glyphs = {}
+        self.shelf_x = 0
+        self.shelf_y = 0
+        self.shelf_height = 0
+
+        self.texture_id = None
+        self.uploaded_height = 0
+        self.pending = []
+
+        for ch in PRELOADED_CHARACTERS:
+            self.glyph(ch)
+
+    @staticmethod
+    def _blank(width, height):
+        pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        pixels[..., :3] = 255
+        return pixels
+
+    def glyph(self, ch):
+        rect = self.glyphs.get(ch)
+        if rect is None:
+            rect = self._rasterize(ch)
+            self.glyphs[ch] = rect
+        return rect
+
+    def _rasterize(self, ch):
+        try:
+            surface = self.font.render(ch, True, (255, 255, 255))
+        except pygame.error:
+            return (0, 0, 0, 0, 0)
+
+        w, h = surface.get_size()
+        # Invertido: a linha 0 do atlas é a base da textura (t = 0)
+        data = np.frombuffer(pygame.image.tostring(surface, "RGBA", True), dtype=np.uint8)
+        alpha = data.reshape(h, w, 4)[..., 3]
+        if not alpha.any():
+            # Espaços só avançam a pena
+            return (0, 0, 0, 0, 0)
+
+        x, y = self._allocate(w, h)
+        self.pixels[y:y + h, x:x + w, 3] = alpha
+        self.pending.append((x, y, w, h))
+        return (x, y, w, h, self._overflow(ch))
+
+    def _overflow(self, ch):
+        # Glifos acima da ascendente (ex.: maiúsculas acentuadas) aumentam a superfície por cima
+        metrics = self.font.metrics(ch)[0]
+        if metrics is None:
+            return 0
+        return max(0, metrics[3] - self.font.get_ascent())
+
+    def _allocate(self, w, h):
+        pad = GLYPH_PADDING
+        if self.shelf_x + pad + w + pad > self.width:
+            self.shelf_y += self.shelf_height
+            self.shelf_x = 0
+            self.shelf_height = 0
+
+        while self.shelf_y + pad + h + pad > self.height:
+            self._grow()
+
+        x = self.shelf_x + pad
+        y = self.shelf_y + pad
+        self.shelf_x = x + w
+        self.shelf_height = max(self.shelf_height, h + pad)
+        return x, y
+
+    def _grow(self):
+        # As coordenadas de textura mudam: layouts antigos são refeitos (ver get_text_layout)
+        pixels = self._blank(self.width, self.height * 2)
+        pixels[:self.height] = self.pixels
+        self.pixels = pixels
+        self.height *= 2
+
+    def bind(self):
+        if self.texture_id is None:
+            self.texture_id = int(glGenTextures(1))
+            glstate.bind_texture(self.texture_id)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        else:
+            glstate.bind_texture(self.texture_id)
+
+        if self.uploaded_height != self.height:
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, self.pixels)
+            self.uploaded_height = self.height
+            self.pending.clear()
+        elif self.pending:
+            # Só os glifos novos desde o último envio
+            for x, y, w, h in self.pending:
+                region = np.ascontiguousarray(self.pixels[y:y + h, x:x + w])
+                glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, w, h, GL_RGBA, GL_UNSIGNED_BYTE, region)
+            self.pending.clear()
+
+    def release(self):
+        if self.texture_id is not None:
+            glstate.delete_textures([self.texture_id])
+        self.texture_id = None
+        self.uploaded_height = 0
+
+
+class TextLayout:
+    # Quads de uma string já posicionados (origem no canto inferior esquerdo),
+    # com as cópias deslocadas do contorno antes do preenchimento no mesmo buffer
+    def __init__(self, atlas, text, outline_size=0):
+        self.atlas = atlas
+        self.text = text
+        self.outline_size = outline_size
+
+        font = atlas.font
+        self.width, self.height = font.size(text)
+
+        glyphs = [(i, atlas.glyph(ch)) for i, ch in enumerate(text)]
+        overflow = max((glyph[4] for _, glyph in glyphs), default=0)
+
+        rects = []
+        for i, (gx, gy, gw, gh, glyph_overflow) in glyphs:
+            if gw == 0:
+                continue
+            # Posição da pena pela própria fonte, para manter o kerning do render da string inteira
+            pen = font.size(text[:i])[0] if i else 0
+            top = self.height - (overflow - glyph_overflow)
+            rects.append((pen, top - gh, pen + gw, top, gx, gy, gx + gw, gy + gh))
+
+        # Lido depois dos glifos: rasterizar pode ter aumentado o atlas
+        self.atlas_height = atlas.height
+
+        directions = [(dx * outline_size, dy * outline_size) for dx, dy in OUTLINE_DIRECTIONS] if outline_size else []
+        directions.append((0, 0))
+
+        quad_vertices = len(rects) * 4
+        self.vertex_count = quad_vertices * len(directions)
+        self.outline_vertex_count = quad_vertices * (len(directions) - 1)
+        self.vertices = np.zeros((len(directions), quad_vertices, TEXT_VERTEX_FLOATS), dtype=np.float32)
+
+        if rects:
+            rects = np.array(rects, dtype=np.float32)
+            rects[:, 4::2] /= atlas.width
+            rects[:, 5::2] /= atlas.height
+
+            # Cantos na ordem de GL_QUADS: (x0, y0), (x1, y0), (x1, y1), (x0, y1)
+            base = np.empty((len(rects), 4, 4), dtype=np.float32)
+            base[:, :, 0] = rects[:, [0, 2, 2, 0]]
+            base[:, :, 1] = rects[:, [1, 1, 3, 3]]
+            base[:, :, 2] = rects[:, [4, 6, 6, 4]]
+            base[:, :, 3] = rects[:, [5, 5, 7, 7]]
+
+            offsets = np.array(directions, dtype=np.float32)
+            self.vertices[:, :, :4] = base.reshape(-1, 4)
+            self.vertices[:, :, :2] += offsets[:, None, :]
+
+        self.vertices = self.vertices.reshape(-1, TEXT_VERTEX_FLOATS)
+        self.colors = None
+        self.vbo = None
+        self.dirty = True
+
+    def set_colors(self, color, outline_color=None):
+        colors = (tuple(color), tuple(outline_color) if outline_color is not None else None)
+        if colors == self.colors:
+            return
+        self.colors = colors
+
+        split = self.outline_vertex_count
+        self.vertices[split:, 4:8] = np.asarray(color, dtype=np.float32) / 255.0
+        if split and outline_color is not None:
+            self.vertices[:split, 4:8] = np.asarray(outline_color, dtype=np.float32) / 255.0
+        self.dirty = True
+
+    def prepare(self, color=(255, 255, 255, 255), outline_color=None):
+        # Envia cores, VBO e glifos pendentes; chamar antes de compilar uma display list com
+        # este texto, já que glTexSubImage2D seria gravado na lista em vez de executado
+        self.set_colors(color, outline_color)
+
+        if self.vbo is None:
+            self.vbo = int(glGenBuffers(1))
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_DYNAMIC_DRAW)
+            self.dirty = False
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            if self.dirty:
+                # Só a cor muda depois de criado (ex.: fade do título)
+                glBufferSubData(GL_ARRAY_BUFFER, 0, self.vertices.nbytes, self.vertices)
+                self.dirty = False
+
+        self.atlas.bind()
+
+    def draw(self, x, y, color=(255, 255, 255, 255), outline_color=None):
+        if self.vertex_count == 0:
+            return
+
+        self.prepare(color, outline_color)
+        glstate.enable(GL_TEXTURE_2D)
+
+        glPushMatrix()
+        glTranslatef(x, y, 0.0)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+
+        glVertexPointer(2, GL_FLOAT, TEXT_VERTEX_STRIDE, ctypes.c_void_p(0))
+        glTexCoordPointer(2, GL_FLOAT, TEXT_VERTEX_STRIDE, ctypes.c_void_p(8))
+        glColorPointer(4, GL_FLOAT, TEXT_VERTEX_STRIDE, ctypes.c_void_p(16))
+
+        glDrawArrays(GL_QUADS, 0, self.vertex_count)
+
+        glstate.count_draw()
+
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        glPopMatrix()
+
+        # O atlas fica ligado: textos seguidos da mesma fonte não trocam estado nenhum,
+        # e quem desenha sem textura depois desliga GL_TEXTURE_2D pelo glstate
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+        self.vbo = None
+        self.dirty = True
+
+
+def load_font(size, fallback="Arial"):
+    # Uma instância por tamanho: o atlas é indexado pela fonte
+    font = _font_cache.get(size)
+    if font is None:
+        try:
+            font = pygame.font.Font(None, size)
+        except Exception:
+            font = pygame.font.SysFont(fallback, size)
+        _font_cache[size] = font
+    return font
+
+def get_atlas(font):
+    atlas = _atlas_cache.get(font)
+    if atlas is None:
+        atlas = GlyphAtlas(font)
+        _atlas_cache[font] = atlas
+    return atlas
+
+def get_text_layout(font, text, outline_size=0):
+    # LRU de strings já montadas; o contorno faz parte do layout
+    key = (font, text, outline_size)
+    layout = _layout_cache.get(key)
+
+    if layout is not None and layout.atlas_height != layout.atlas.height:
+        layout.release()
+        layout = None
+
+    if layout is None:
+        layout = TextLayout(get_atlas(font), text, outline_size)
+        _layout_cache[key] = layout
+        if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            _, evicted = _layout_cache.popitem(last=False)
+            evicted.release()
+    else:
+        _layout_cache.move_to_end(key)
+    return layout
+
+def clear_text_cache():
+    # Deve ser chamado antes de destruir o contexto GL (pygame.quit)
+    for layout in _layout_cache.values():
+        layout.release()
+    _layout_cache.clear()
+
+    for atlas in _atlas_cache.values():
+        atlas.release()
+    _atlas_cache.clear()
@@ -0,0 +1,125 @@
+import math
+
+# Vetores de 3 componentes e matrizes 4x4 em Python puro: para 3 floats, o custo de cada
+# chamada do numpy é maior que a conta em si. Operadores sempre devolvem objetos novos,
+# então um Vec3 compartilhado (ex.: a base em cache da Camera) nunca muda por baixo de quem o guardou
+
+
+class Vec3:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    # Sequência de 3 floats: vale em *v, v[0], struct.pack e np.asarray(v)
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return f"Vec3({self.x!r}, {self.y!r}, {self.z!r})"
+
+    def __add__(self, other):
+        return Vec3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vec3(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        return Vec3(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Vec3(-self.x, -self.y, -self.z)
+
+    def copy(self):
+        return Vec3(self.x, self.y, self.z)
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other):
+        return Vec3(self.y * other.z - self.z * other.y,
+                    self.z * other.x - self.x * other.z,
+                    self.x * other.y - self.y * other.x)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalized(self):
+        # Vetor nulo continua nulo (mesmo comportamento que a Camera tinha com o numpy)
+        length = self.length()
+        if length <= 0.0:
+            return Vec3()
+        return Vec3(self.x / length, self.y / length, self.z / length)
+
+    def lerp(self, other, t):
+        return Vec3(self.x + (other.x - self.x) * t,
+                    self.y + (other.y - self.y) * t,
+                    self.z + (other.z - self.z) * t)
+
+
+class Mat4:
+    # 16 floats em ordem de coluna do OpenGL: glLoadMatrixf(m.values) / glMultMatrixf(m.values)
+    __slots__ = ("values",)
+
+    def __init__(self, values=None):
+        self.values = tuple(values) if values is not None else IDENTITY
+
+    @classmethod
+    def from_basis(cls, x_axis, y_axis, z_axis, origin=None):
+        # Colunas = eixos do espaço local escritos no espaço de destino, mais a translação
+        ox, oy, oz = origin if origin is not None else (0.0, 0.0, 0.0)
+        return cls((x_axis.x, x_axis.y, x_axis.z, 0.0,
+                    y_axis.x, y_axis.y, y_axis.z, 0.0,
+                    z_axis.x, z_axis.y, z_axis.z, 0.0,
+                    ox, oy, oz, 1.0))
+
+    @classmethod
+    def from_rows(cls, row0, row1, row2):
+        # Rotação com essas linhas (a transposta de from_basis)
+        return cls((row0.x, row1.x, row2.x, 0.0,
+                    row0.y, row1.y, row2.y, 0.0,
+                    row0.z, row1.z, row2.z, 0.0,
+                    0.0, 0.0, 0.0, 1.0))
+
+    def __getitem__(self, index):
+        # Índice plano, em ordem de coluna
+        return self.values[index]
+
+    def __repr__(self):
+        return f"Mat4({self.values!r})"
+
+    def transform_point(self, x, y, z):
+        m = self.values
+        return (m[0] * x + m[4] * y + m[8] * z + m[12],
+                m[1] * x + m[5] * y + m[9] * z + m[13],
+                m[2] * x + m[6] * y + m[10] * z + m[14])
+
+    def transform_vector(self, x, y, z):
+        # Sem a translação
+        m = self.values
+        return (m[0] * x + m[4] * y + m[8] * z,
+                m[1] * x + m[5] * y + m[9] * z,
+                m[2] * x + m[6] * y + m[10] * z)
+
+    def __mul__(self, other):
+        a = self.values
+        b = other.values
+        return Mat4(tuple(
+            a[row] * b[col * 4] + a[4 + row] * b[col * 4 + 1] + a[8 + row] * b[col * 4 + 2] + a[12 + row] * b[col * 4 + 3]
+            for col in range(4) for row in range(4)))
+
+
+IDENTITY = (1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            0.0, 0.0, 0.0, 1.0)